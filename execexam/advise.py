@@ -4,8 +4,6 @@ import random
 import socket
 from typing import List, Optional
 
-import openai
-import validators
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
@@ -27,6 +25,8 @@ def load_litellm() -> None:
 
 def validate_url(value: str) -> bool:
     """Validate a URL given as a string using the validators library."""
+    import validators  # noqa: PLC0415
+
     if not validators.url(value):
         return False
     return True
@@ -129,6 +129,7 @@ def fix_failures(  # noqa: PLR0913
     test_overview: str,
     failing_test_details: str,
     failing_test_code: str,
+    called_function_code: str,
     advice_method: enumerations.AdviceMethod,
     advice_model: str,
     advice_server: str,
@@ -160,6 +161,7 @@ def fix_failures(  # noqa: PLR0913
                 + f" Here is the test overview with test output and details about test assertions: {test_overview}"
                 + f" Here is a brief overview of the test failure information: {failing_test_details}"
                 + f" Here is the source code for the one or more failing test(s): {failing_test_code}"
+                + f" Here is the source code of the functions in the program under test that the failing test(s) call: {called_function_code}"
             )
 
             if advice_method == enumerations.AdviceMethod.api_key:
@@ -192,6 +194,8 @@ def fix_failures(  # noqa: PLR0913
 
             elif advice_method == enumerations.AdviceMethod.api_server:
                 # Use the OpenAI approach to submit the debugging request
+                import openai  # noqa: PLC0415
+
                 client = openai.OpenAI(
                     api_key="anything", base_url=advice_server
                 )
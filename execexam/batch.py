@@ -0,0 +1,402 @@
+"""Grade the executable examinations of many projects in worker processes."""
+
+import csv
+import gc
+import glob
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, NoReturn, Optional
+
+import pytest
+
+from . import enumerations, parallel, results, util
+from . import pytest_plugin as exec_exam_pytest_plugin
+
+# the columns of the comma-separated values of the outcomes
+CSV_COLUMNS = [
+    "project",
+    "status",
+    "exit_code",
+    "passed",
+    "failed",
+    "error",
+    "skipped",
+    "total",
+    "duration",
+    "failures",
+]
+
+
+def find_projects(projects: str) -> List[Path]:
+    """Find the project directories in a manifest file or that match a glob."""
+    manifest = Path(projects)
+    # the manifest lists one project directory on every line, ignoring
+    # blank lines and comments, where a relative project directory is
+    # relative to the directory that contains the manifest
+    if manifest.is_file():
+        project_directories = []
+        for line in manifest.read_text(encoding="utf-8").splitlines():
+            project_directory = line.strip()
+            if project_directory and not project_directory.startswith("#"):
+                project_directories.append(manifest.parent / project_directory)
+        return project_directories
+    return [
+        Path(project)
+        for project in sorted(glob.glob(projects, recursive=True))
+        if Path(project).is_dir()
+    ]
+
+
+def resolve_tests(project: Path, tests: Path) -> Path:
+    """Resolve the tests of the project, which are shared when the path is absolute."""
+    if tests.is_absolute():
+        return tests
+    return project / tests
+
+
+def grade_project(
+    project: Path, pytest_arguments: List[str], student_output: bool
+) -> Dict[str, Any]:
+    """Grade a single project and summarize the outcomes of its tests."""
+    start_time = time.perf_counter()
+    # note that the worker runs all of the project's tests since it
+    # is the only worker and that the timing report selects the hooks
+    # that collect the outcome and the duration of each of the tests
+    worker_result = parallel.run_worker(
+        0,
+        1,
+        pytest_arguments,
+        project,
+        [enumerations.ReportType.timing],
+        None,
+    )
+    duration = time.perf_counter() - start_time
+    result_report = worker_result["results"]
+    tests = result_report["tests"] if result_report is not None else []
+    exit_code = util.determine_execexam_return_code(worker_result["exit_code"])
+    # the tests of the project passed or some of them failed; otherwise,
+    # the tests could not run (e.g., a test file could not be collected
+    # because it imports a module that is missing or not valid Python,
+    # the tests were not found, or there were no tests) and thus the
+    # project was not graded, which is an error
+    status = "error"
+    if exit_code == 0:
+        status = "passed"
+    elif exit_code == 1:
+        status = "failed"
+    outcome: Dict[str, Any] = {
+        "project": str(project),
+        "status": status,
+        "exit_code": exit_code,
+        "duration": duration,
+        "summary": (
+            dict(result_report["summary"]) if result_report is not None else {}
+        ),
+        # note that the failures include the test files that could not
+        # be collected, which explain why the project was not graded
+        "failures": results.make_failures(tests),
+        "tests": [
+            {
+                "nodeid": test.nodeid,
+                "outcome": test.outcome,
+                "duration": test.duration,
+            }
+            for test in tests
+        ],
+    }
+    if status == "error":
+        outcome["message"] = (
+            "The tests could not run: pytest exited with"
+            f" {pytest.ExitCode(worker_result['exit_code']).name}"
+        )
+    # only keep the output of the tests when it will be displayed
+    # since it is often much larger than the rest of the outcome
+    if student_output:
+        outcome["output"] = worker_result["output"]
+    return outcome
+
+
+def make_error_outcome(project: Path, error: BaseException) -> Dict[str, Any]:
+    """Make the outcome of a project that could not be graded."""
+    return {
+        "project": str(project),
+        "status": "error",
+        "exit_code": None,
+        "duration": None,
+        "summary": {},
+        "failures": [],
+        "tests": [],
+        "message": repr(error),
+    }
+
+
+def grade_in_pool(  # noqa: PLR0913
+    projects: List[Path],
+    pytest_arguments: List[List[str]],
+    indices: List[int],
+    workers: int,
+    student_output: bool,
+    outcomes: List[Optional[Dict[str, Any]]],
+) -> List[int]:
+    """Grade the projects at the indices in a pool of worker processes."""
+    broken_indices = []
+    # note that every worker process is spawned for a single project so
+    # that no project can import the modules or change the state of another
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as executor:
+        futures = {
+            executor.submit(
+                grade_project,
+                projects[index],
+                pytest_arguments[index],
+                student_output,
+            ): index
+            for index in indices
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                outcomes[index] = future.result()
+            # a worker process crashed (e.g., a project's code exited the
+            # process), which stops the pool from grading all of the projects
+            # that were not yet graded, including the one that crashed it
+            except BrokenProcessPool:
+                broken_indices.append(index)
+            except Exception as error:
+                outcomes[index] = make_error_outcome(projects[index], error)
+    return sorted(broken_indices)
+
+
+def grade_in_forked_process(
+    project: Path,
+    pytest_arguments: List[str],
+    student_output: bool,
+    outcome_file: Path,
+) -> NoReturn:
+    """Grade a project in a forked process and save its outcome to the file."""
+    exit_code = 0
+    try:
+        outcome = grade_project(project, pytest_arguments, student_output)
+    except BaseException as error:
+        outcome = make_error_outcome(project, error)
+        exit_code = 1
+    try:
+        outcome_file.write_text(json.dumps(outcome), encoding="utf-8")
+    finally:
+        # exit without running the clean up of the process that forked
+        # this one (e.g., flushing its buffers) since it is still running
+        os._exit(exit_code)
+
+
+def collect_forked_outcome(
+    projects: List[Path],
+    running: Dict[int, int],
+    outcome_directory: Path,
+    outcomes: List[Optional[Dict[str, Any]]],
+) -> None:
+    """Wait for a forked process to finish and then collect its outcome."""
+    while True:
+        pid, status = os.waitpid(-1, 0)
+        if pid in running:
+            break
+    index = running.pop(pid)
+    try:
+        outcomes[index] = json.loads(
+            (outcome_directory / f"{index}.json").read_text(encoding="utf-8")
+        )
+    # the forked process crashed before it saved the outcome
+    except (OSError, ValueError):
+        outcomes[index] = make_error_outcome(
+            projects[index],
+            ChildProcessError(
+                "The forked process exited with code"
+                f" {os.waitstatus_to_exitcode(status)}"
+            ),
+        )
+
+
+def warm_fork_server(pytest_arguments: List[str]) -> None:
+    """Import execexam and grade a project with a passing test so that the forked processes share the imports."""
+    # note that pytest and its plugins import many of their modules (e.g.,
+    # the modules that rewrite the assertions and the modules that the
+    # plugins need for their summaries) only when the tests run
+    from . import main  # noqa: F401, PLC0415
+
+    exec_exam_pytest_plugin.load_pytest_plugins()
+    with tempfile.TemporaryDirectory() as directory:
+        project = Path(directory)
+        (project / "test_execexam_warm.py").write_text(
+            "def test_warm():\n    assert True\n", encoding="utf-8"
+        )
+        saved_path = list(sys.path)
+        # note that the last argument is the path of the tests
+        try:
+            grade_project(
+                project, [*pytest_arguments[:-1], str(project)], False
+            )
+        finally:
+            # forget the project of the warm up so that no forked process
+            # finds its test module, its directory, or its test reports
+            sys.path[:] = saved_path
+            sys.modules.pop("test_execexam_warm", None)
+            exec_exam_pytest_plugin.reports.clear()
+            exec_exam_pytest_plugin.passing_assertions.clear()
+            exec_exam_pytest_plugin.coverage_maps.clear()
+
+
+def grade_with_fork_server(
+    projects: List[Path],
+    pytest_arguments: List[List[str]],
+    workers: int,
+    student_output: bool,
+    outcomes: List[Optional[Dict[str, Any]]],
+) -> None:
+    """Grade every project in its own process that is forked from this one."""
+    # import the modules of execexam and the modules that every run of
+    # pytest needs, including the ones that pytest only imports while
+    # the tests run, and then move all of the existing objects to the
+    # permanent generation of the garbage collector, which means that a
+    # forked process shares these modules and that collecting its
+    # garbage does not copy the shared memory
+    if pytest_arguments:
+        warm_fork_server(pytest_arguments[0])
+    gc.freeze()
+    running: Dict[int, int] = {}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            outcome_directory = Path(directory)
+            for index, project in enumerate(projects):
+                # wait for a project to finish when all workers are busy
+                if len(running) >= workers:
+                    collect_forked_outcome(
+                        projects, running, outcome_directory, outcomes
+                    )
+                pid = os.fork()
+                if pid == 0:
+                    grade_in_forked_process(
+                        project,
+                        pytest_arguments[index],
+                        student_output,
+                        outcome_directory / f"{index}.json",
+                    )
+                running[pid] = index
+            while running:
+                collect_forked_outcome(
+                    projects, running, outcome_directory, outcomes
+                )
+    finally:
+        gc.unfreeze()
+
+
+def grade_projects(  # noqa: PLR0913
+    projects: List[Path],
+    tests: Path,
+    maxfail: int,
+    mark: Optional[str],
+    workers: int,
+    student_output: bool = False,
+    fork_server: bool = False,
+    test_timeout: Optional[float] = None,
+    cpu_limit: Optional[int] = None,
+    memory_limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Grade the projects in worker processes and return their outcomes in order."""
+    outcomes: List[Optional[Dict[str, Any]]] = [None] * len(projects)
+    pytest_arguments = [
+        util.make_pytest_arguments(
+            resolve_tests(project, tests),
+            maxfail,
+            mark,
+            test_timeout,
+            cpu_limit,
+            memory_limit,
+        )
+        for project in projects
+    ]
+    # fork the process that grades each project from this process, which
+    # already imported pytest, instead of spawning a new Python process
+    if fork_server and hasattr(os, "fork"):
+        grade_with_fork_server(
+            projects, pytest_arguments, workers, student_output, outcomes
+        )
+        return outcomes  # type: ignore
+    broken_indices = grade_in_pool(
+        projects,
+        pytest_arguments,
+        list(range(len(projects))),
+        workers,
+        student_output,
+        outcomes,
+    )
+    # grade every project that was stopped by a crashed worker process on
+    # its own so that only the project that crashes its worker has an error
+    for index in broken_indices:
+        if grade_in_pool(
+            projects, pytest_arguments, [index], 1, student_output, outcomes
+        ):
+            outcomes[index] = make_error_outcome(
+                projects[index],
+                BrokenProcessPool("The worker process stopped abruptly"),
+            )
+    return outcomes  # type: ignore
+
+
+def format_outcomes(
+    outcomes: List[Dict[str, Any]],
+    output_format: enumerations.OutputFormat,
+) -> str:
+    """Format the outcomes of all the projects as JSON or as CSV."""
+    if output_format == enumerations.OutputFormat.json:
+        summary = {
+            "projects": len(outcomes),
+            "passed": sum(
+                outcome["status"] == "passed" for outcome in outcomes
+            ),
+            "failed": sum(
+                outcome["status"] == "failed" for outcome in outcomes
+            ),
+            "error": sum(outcome["status"] == "error" for outcome in outcomes),
+        }
+        return (
+            json.dumps({"summary": summary, "projects": outcomes}, indent=2)
+            + "\n"
+        )
+    # the comma-separated values have one row for each project
+    # with the counts of the outcomes and the names of the failures
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS)
+    writer.writeheader()
+    for outcome in outcomes:
+        summary = outcome["summary"]
+        writer.writerow(
+            {
+                "project": outcome["project"],
+                "status": outcome["status"],
+                "exit_code": outcome["exit_code"],
+                "passed": summary.get("passed", 0),
+                "failed": summary.get("failed", 0),
+                "error": summary.get("error", 0),
+                "skipped": summary.get("skipped", 0),
+                "total": summary.get("total", 0),
+                "duration": (
+                    f"{outcome['duration']:.4f}"
+                    if outcome["duration"] is not None
+                    else ""
+                ),
+                "failures": ";".join(
+                    failure["nodeid"] for failure in outcome["failures"]
+                ),
+            }
+        )
+    return output.getvalue()
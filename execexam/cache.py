@@ -0,0 +1,174 @@
+"""Cache the results of running an executable examination."""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from dataclasses import asdict
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from . import enumerations
+from .pytest_plugin import ResultRecord
+
+# the name of the directory inside of the project that stores the cache
+CACHE_DIRECTORY = ".execexam_cache"
+
+# the names of the configuration files that can change how the tests run
+# or, like the configuration of coverage.py, the results of a report
+CONFIGURATION_FILES = [
+    "pytest.ini",
+    "pyproject.toml",
+    "setup.cfg",
+    "tox.ini",
+    ".coveragerc",
+]
+
+# the directories that never contain the source code of the project or tests
+SKIPPED_DIRECTORIES = ["__pycache__", "venv", "node_modules"]
+
+
+def get_execexam_version() -> str:
+    """Determine the version of execexam, which is part of the cache key."""
+    try:
+        return metadata.version("execexam")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def find_source_files(path: Path) -> Iterator[Path]:
+    """Find the Python source files and the configuration files at the path."""
+    # the path is a single file (e.g., a test file) and thus it is the only source
+    if path.is_file():
+        yield path
+        return
+    for directory, directories, files in os.walk(path):
+        # do not descend into hidden directories (e.g., .git, .venv, or
+        # the cache itself) or into directories that never contain sources
+        directories[:] = sorted(
+            name
+            for name in directories
+            if not name.startswith(".") and name not in SKIPPED_DIRECTORIES
+        )
+        for name in sorted(files):
+            if name.endswith(".py") or name in CONFIGURATION_FILES:
+                yield Path(directory) / name
+
+
+def compute_cache_key(
+    project: Path,
+    tests: Path,
+    pytest_arguments: List[str],
+    report_types: Optional[List[enumerations.ReportType]],
+    summary: bool = False,
+) -> str:
+    """Compute the key of the cache entry for the project, the tests, and the options."""
+    digest = hashlib.sha256()
+    # the version of execexam, the arguments that are given to pytest (which
+    # include the mark expression and the maximum number of failures), and
+    # the requested reports and whether the summary was needed (which
+    # determine the data that was collected) all change the results of
+    # the examination and are part of the key
+    digest.update(get_execexam_version().encode())
+    digest.update(json.dumps(pytest_arguments).encode())
+    digest.update(json.dumps(sorted(report_types or [])).encode())
+    digest.update(json.dumps(summary).encode())
+    # the contents of the project's files and the test files are part of the
+    # key, visiting every file only once when the tests are in the project
+    source_files = {
+        source_file.resolve()
+        for path in [project, tests]
+        for source_file in find_source_files(path)
+    }
+    for source_file in sorted(source_files):
+        digest.update(str(source_file).encode())
+        digest.update(hashlib.sha256(source_file.read_bytes()).digest())
+    return digest.hexdigest()
+
+
+def get_cache_directory(project: Path) -> Path:
+    """Get the directory of the cache for the project, creating it if needed."""
+    cache_directory = project / CACHE_DIRECTORY
+    if not cache_directory.exists():
+        cache_directory.mkdir(parents=True)
+        # do not let version control track any of the cache entries
+        (cache_directory / ".gitignore").write_text("*\n")
+    return cache_directory
+
+
+def load(project: Path, key: str) -> Optional[Dict[str, Any]]:
+    """Load the cache entry with the key, if it exists."""
+    entry_file = project / CACHE_DIRECTORY / f"{key}.json"
+    try:
+        entry = json.loads(entry_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    # mark the entry as the most recently used one, unless the
+    # cache cannot be changed (e.g., the project is read-only)
+    try:
+        os.utime(entry_file)
+    except OSError:
+        pass
+    # convert the result report back into its records
+    results = entry["results"]
+    if results is not None:
+        results["summary"] = Counter(results["summary"])
+        results["tests"] = [ResultRecord(**test) for test in results["tests"]]
+    return entry
+
+
+def store(  # noqa: PLR0913
+    project: Path,
+    key: str,
+    exit_code: int,
+    output: str,
+    reports: Dict[str, Dict[str, Any]],
+    results: Optional[Dict[str, Any]],
+    coverage_maps: Optional[Dict[str, Dict[str, int]]] = None,
+    max_entries: int = 32,
+    max_bytes: int = 64 * 1024 * 1024,
+) -> None:
+    """Store the results of the examination as the cache entry with the key."""
+    if results is not None:
+        results = {
+            **results,
+            "tests": [asdict(test) for test in results["tests"]],
+        }
+    entry = {
+        "exit_code": int(exit_code),
+        "output": output,
+        "reports": reports,
+        "results": results,
+        "coverage": coverage_maps or {},
+    }
+    # note that, like a cache entry that cannot be loaded, a cache entry
+    # that cannot be stored (e.g., the project is read-only or its cache
+    # directory is a file) does not stop the run and it is not cached
+    try:
+        cache_directory = get_cache_directory(project)
+        entry_file = cache_directory / f"{key}.json"
+        # write the entry to a temporary file first so that an
+        # interrupted run cannot leave behind an incomplete entry
+        temporary_file = entry_file.with_suffix(".tmp")
+        temporary_file.write_text(json.dumps(entry), encoding="utf-8")
+        temporary_file.replace(entry_file)
+        evict(cache_directory, max_entries, max_bytes)
+    except OSError:
+        return
+
+
+def evict(cache_directory: Path, max_entries: int, max_bytes: int) -> None:
+    """Evict the least recently used entries until the cache is small enough."""
+    # note that the modification time of an entry is updated when it is
+    # loaded and thus the oldest entries are the least recently used ones
+    entries = sorted(
+        cache_directory.glob("*.json"),
+        key=lambda entry_file: entry_file.stat().st_mtime,
+        reverse=True,
+    )
+    total_bytes = 0
+    for index, entry_file in enumerate(entries):
+        total_bytes += entry_file.stat().st_size
+        if index >= max_entries or total_bytes > max_bytes:
+            entry_file.unlink(missing_ok=True)
@@ -0,0 +1,183 @@
+"""Find the functions of a project that the failing tests call."""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import cache, source
+
+# the greatest number of imports that are followed to find a function,
+# which stops a package that imports a name from itself from looping
+MAX_IMPORT_DEPTH = 10
+
+# a function of the project with the path and the parsed file that define it
+ProjectFunction = Tuple[Path, source.ParsedFile, source.FunctionSource]
+
+
+def get_module_name(project: Path, source_file: Path) -> str:
+    """Get the name of the module that imports the source file from the project."""
+    parts = list(source_file.relative_to(project).with_suffix("").parts)
+    # the source of a package is in the __init__.py file of its directory
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+class CallGraph:
+    """Resolve the calls of a function to the functions of the project."""
+
+    def __init__(self, project: Path) -> None:
+        """Index the modules of the project, which is on the system path."""
+        # note that the files of the modules are only parsed when
+        # a call is resolved to them and that the parsed files are
+        # cached and thus shared with the extraction of the tests
+        self.project = project
+        self.modules: Dict[str, Path] = {}
+        for source_file in cache.find_source_files(project):
+            if source_file.suffix == ".py":
+                module_name = get_module_name(project, source_file)
+                if module_name:
+                    self.modules[module_name] = source_file
+        self.module_names = {
+            path.resolve(): module_name
+            for module_name, path in self.modules.items()
+        }
+
+    def get_module_name(self, path: Path) -> str:
+        """Get the name of the module of the file, which is empty outside of the project."""
+        return self.module_names.get(path.resolve(), "")
+
+    def resolve_relative_name(self, module_name: str, name: str) -> str:
+        """Resolve the name of a relative import in the module to a qualified name."""
+        level = len(name) - len(name.lstrip("."))
+        if level == 0:
+            return name
+        # note that a relative import in a package's __init__.py is relative
+        # to the package itself instead of the package that contains it
+        package = module_name.split(".")
+        if self.modules.get(module_name, Path()).name != "__init__.py":
+            package = package[:-1]
+        package = package[: len(package) - (level - 1)]
+        return ".".join([*package, name.lstrip(".")]).strip(".")
+
+    def find_function(
+        self, qualified_name: str, depth: int = 0
+    ) -> Optional[ProjectFunction]:
+        """Find the function of the project with the qualified name (e.g., module.function)."""
+        if depth > MAX_IMPORT_DEPTH:
+            return None
+        # find the longest name of a module of the project that starts
+        # the qualified name and then the function inside of that module
+        parts = qualified_name.split(".")
+        for split in range(len(parts) - 1, 0, -1):
+            module_name = ".".join(parts[:split])
+            path = self.modules.get(module_name)
+            if path is None:
+                continue
+            parsed_file = source.parse_file_if_possible(path)
+            if parsed_file is None:
+                return None
+            # note that calling a class calls the constructor of the class
+            function_name = ".".join(parts[split:])
+            function = parsed_file.functions.get(
+                function_name
+            ) or parsed_file.functions.get(f"{function_name}.__init__")
+            if function is not None:
+                return (path, parsed_file, function)
+            # the module can import the function from another module (e.g.,
+            # a package that exports a function from one of its modules)
+            imported_name = parsed_file.imports.get(parts[split])
+            if imported_name is not None:
+                resolved_name = self.resolve_relative_name(
+                    module_name, imported_name
+                )
+                return self.find_function(
+                    ".".join([resolved_name, *parts[split + 1 :]]), depth + 1
+                )
+            return None
+        return None
+
+    def resolve_call(
+        self,
+        path: Path,
+        parsed_file: source.ParsedFile,
+        function: source.FunctionSource,
+        call_name: str,
+    ) -> Optional[ProjectFunction]:
+        """Resolve the name that the function calls to a function of the project."""
+        module_name = self.get_module_name(path)
+        head, _, rest = call_name.partition(".")
+        # a method that calls another method of its class through self
+        if head == "self" and function.class_name is not None and rest:
+            qualified_name = f"{function.class_name}.{rest}"
+            if qualified_name in parsed_file.functions:
+                return (
+                    path,
+                    parsed_file,
+                    parsed_file.functions[qualified_name],
+                )
+            return None
+        # a name that the file imported, which can be inside of the project
+        imported_name = parsed_file.imports.get(head)
+        if imported_name is not None:
+            qualified_name = self.resolve_relative_name(
+                module_name, imported_name
+            )
+            return self.find_function(
+                f"{qualified_name}.{rest}" if rest else qualified_name
+            )
+        # a function that the file itself defines
+        called_function = parsed_file.functions.get(call_name)
+        if called_function is not None:
+            return (path, parsed_file, called_function)
+        return None
+
+    def find_called_functions(
+        self, path: Path, function_name: str
+    ) -> List[ProjectFunction]:
+        """Find the functions of the project that the function calls, directly or not."""
+        parsed_file = source.parse_file_if_possible(path)
+        if parsed_file is None:
+            return []
+        function = source.find_function(parsed_file, function_name)
+        if function is None:
+            return []
+        # visit the functions that the function calls and then the
+        # functions that they call, finding each function only once
+        # and never finding the function itself (e.g., a recursive call)
+        called_functions: List[ProjectFunction] = []
+        visited: Set[Tuple[Path, str, int]] = {
+            (path.resolve(), function.name, function.start)
+        }
+        unvisited: List[ProjectFunction] = [(path, parsed_file, function)]
+        while unvisited:
+            caller_path, caller_file, caller = unvisited.pop(0)
+            for call_name in caller.calls:
+                called = self.resolve_call(
+                    caller_path, caller_file, caller, call_name
+                )
+                if called is None:
+                    continue
+                called_path, _, called_function = called
+                key = (
+                    called_path.resolve(),
+                    called_function.name,
+                    called_function.start,
+                )
+                if key not in visited:
+                    visited.add(key)
+                    called_functions.append(called)
+                    unvisited.append(called)
+        return called_functions
+
+    def extract_called_function_sources(
+        self, path: Path, function_name: str
+    ) -> List[str]:
+        """Extract the source code of the functions of the project that the function calls."""
+        return [
+            source.get_function_source(
+                called_path, called_file, called_function
+            )
+            for called_path, called_file, called_function in self.find_called_functions(
+                path, function_name
+            )
+        ]
@@ -0,0 +1,156 @@
+"""Capture the output of the tests in a bounded buffer that spills to disk."""
+
+import codecs
+import io
+import os
+import tempfile
+from collections import deque
+from typing import Deque, Iterator, List
+
+# the number of bytes of output that are kept in memory before
+# the captured output spills to a temporary file on the disk
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+# the number of bytes at the start of the output that are kept,
+# which bounds the size of the temporary file for runaway output
+MAX_CAPTURE_BYTES = 64 * 1024 * 1024
+
+# the number of characters of output that are collected before they are
+# written to the buffer, which avoids writing each one of many short lines
+PENDING_CHARACTERS = 64 * 1024
+
+# the number of bytes of the captured output that are read at a time
+READ_CHUNK_BYTES = 1024 * 1024
+
+# the number of bytes at the end of the output that are kept after the
+# start of the output reached its limit, which keeps the summary of the
+# failing tests that pytest produces after the output of the tests
+TAIL_BYTES = 1024 * 1024
+
+
+class CaptureBuffer(io.TextIOBase):
+    """Capture text in a temporary file, keeping only its start and its end."""
+
+    def __init__(
+        self,
+        max_bytes: int = MAX_CAPTURE_BYTES,
+        memory_bytes: int = SPOOL_MEMORY_BYTES,
+        tail_bytes: int = TAIL_BYTES,
+    ) -> None:
+        """Create an empty capture buffer with the limits on its size."""
+        super().__init__()
+        self.file = tempfile.SpooledTemporaryFile(max_size=memory_bytes)
+        self.max_bytes = max_bytes
+        self.tail_bytes = tail_bytes
+        self.head_size = 0
+        self.tail: Deque[bytes] = deque()
+        self.tail_size = 0
+        self.pending: List[str] = []
+        self.pending_size = 0
+        self.total_bytes = 0
+        self.truncated_bytes = 0
+
+    @property
+    def encoding(self) -> str:  # type: ignore
+        """Return the encoding of the captured text."""
+        return "utf-8"
+
+    def writable(self) -> bool:
+        """Indicate that text can be written to the buffer."""
+        return True
+
+    def write(self, text: str) -> int:
+        """Write the text to the buffer once enough text is pending."""
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if self.pending_size >= PENDING_CHARACTERS:
+            self.write_pending()
+        return len(text)
+
+    def write_pending(self) -> None:
+        """Write the pending text to the buffer, dropping the middle of runaway output."""
+        data = "".join(self.pending).encode("utf-8", errors="replace")
+        self.pending.clear()
+        self.pending_size = 0
+        self.total_bytes += len(data)
+        # keep the start of the output in the file until it reaches its limit
+        if self.head_size < self.max_bytes:
+            head = data[: self.max_bytes - self.head_size]
+            self.file.write(head)
+            self.head_size += len(head)
+            data = data[len(head) :]
+        # keep the end of the output in memory and, when it is twice as long
+        # as its limit, drop its oldest bytes; note that this only joins the
+        # parts of the end of the output once for every limit's worth of bytes
+        if data:
+            self.tail.append(data)
+            self.tail_size += len(data)
+            if self.tail_size > 2 * self.tail_bytes:
+                self.trim_tail()
+
+    def trim_tail(self) -> None:
+        """Drop the oldest bytes of the end of the output beyond its limit."""
+        if self.tail_size > self.tail_bytes:
+            tail = b"".join(self.tail)[-self.tail_bytes :]
+            self.truncated_bytes += self.tail_size - len(tail)
+            self.tail = deque([tail])
+            self.tail_size = len(tail)
+
+    def get_truncation_notice(self) -> str:
+        """Get the line that replaces the output that was not kept."""
+        return (
+            f"WARNING: execexam truncated {self.truncated_bytes} of the"
+            f" {self.total_bytes} bytes of test output\n"
+        )
+
+    def getvalue(self) -> str:
+        """Get the captured text, with a notice in place of any dropped output."""
+        self.write_pending()
+        self.trim_tail()
+        self.file.seek(0)
+        value = self.file.read().decode("utf-8", errors="replace")
+        self.file.seek(0, os.SEEK_END)
+        if self.truncated_bytes:
+            value += self.get_truncation_notice()
+        if self.tail:
+            value += b"".join(self.tail).decode("utf-8", errors="replace")
+        return value
+
+    def iter_lines(self) -> Iterator[str]:
+        """Iterate through the lines of the captured text without their ends."""
+        self.write_pending()
+        self.trim_tail()
+        # read the file a chunk at a time instead of reading all of it and
+        # then return to its end so that writing appends to it; note that
+        # the decoder keeps the bytes of a character that a chunk splits
+        # and that the last line of a chunk continues in the next chunk
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        remainder = ""
+        self.file.seek(0)
+        try:
+            while chunk := self.file.read(READ_CHUNK_BYTES):
+                lines = (remainder + decoder.decode(chunk)).split("\n")
+                remainder = lines.pop()
+                for line in lines:
+                    yield line.rstrip("\r")
+        finally:
+            self.file.seek(0, os.SEEK_END)
+        # the last line of the start of the output continues with the notice
+        # of any dropped output and then with the end of the output, just as
+        # in the captured text, instead of ending where the start was cut;
+        # note that the end of the output is bounded and already in memory
+        remainder += decoder.decode(b"", final=True)
+        if self.truncated_bytes:
+            remainder += self.get_truncation_notice()
+        remainder += b"".join(self.tail).decode("utf-8", errors="replace")
+        lines = remainder.split("\n")
+        # text that ends with a newline does not have a line after it
+        if lines[-1] == "":
+            lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+
+    def close(self) -> None:
+        """Close the buffer and remove its temporary file."""
+        self.file.close()
+        super().close()
@@ -0,0 +1,44 @@
+"""Load the configuration of an executable examination from its pyproject.toml file."""
+
+import tomllib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# the file of the project that contains the configuration of the
+# examination in its [tool.execexam] table (e.g., the trace labels)
+CONFIGURATION_FILE = "pyproject.toml"
+
+
+def load_configuration(project: Path) -> Dict[str, Any]:
+    """Load the [tool.execexam] table of the project's configuration file, if there is one."""
+    # note that a project without a configuration file or with a
+    # file that is not valid TOML uses the defaults of every option
+    configuration_file = project / CONFIGURATION_FILE
+    try:
+        with configuration_file.open("rb") as file:
+            configuration = tomllib.load(file)
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+    execexam_configuration = configuration.get("tool", {}).get("execexam", {})
+    if not isinstance(execexam_configuration, dict):
+        return {}
+    return execexam_configuration
+
+
+def get_trace_labels(
+    command_line_labels: Optional[List[str]],
+    configuration: Dict[str, Any],
+    default_labels: List[str],
+) -> List[str]:
+    """Get the labels of the lines of the test output, preferring the command-line over the configuration."""
+    if command_line_labels:
+        return list(command_line_labels)
+    # the labels in the configuration must be a list of strings
+    configured_labels = configuration.get("trace-labels")
+    if (
+        isinstance(configured_labels, list)
+        and configured_labels
+        and all(isinstance(label, str) for label in configured_labels)
+    ):
+        return configured_labels
+    return list(default_labels)
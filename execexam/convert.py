@@ -1,6 +1,7 @@
 """Perform data conversions."""
 
 from pathlib import Path
+from typing import Iterable, List
 
 
 def path_to_string(path_name: Path, levels: int = 4) -> str:
@@ -16,3 +17,43 @@ def path_to_string(path_name: Path, levels: int = 4) -> str:
         return Path("<...>", *parts[start_index:]).as_posix()
     else:
         return path_name.as_posix()
+
+
+def lines_to_bitmap(lines: Iterable[int]) -> int:
+    """Convert the line numbers to a bitmap that has a bit set for each line."""
+    bitmap = 0
+    for line in lines:
+        bitmap |= 1 << line
+    return bitmap
+
+
+def bitmap_to_lines(bitmap: int) -> List[int]:
+    """Convert the bitmap of line numbers to a sorted list of the line numbers."""
+    lines = []
+    # strip the lowest set bit of the bitmap until no bits remain,
+    # which visits every set bit without checking each one of the
+    # (possibly many) unset bits for the lines that did not run
+    while bitmap:
+        lowest_bit = bitmap & -bitmap
+        line = lowest_bit.bit_length() - 1
+        lines.append(line)
+        bitmap ^= lowest_bit
+    return lines
+
+
+def lines_to_ranges(lines: List[int]) -> str:
+    """Convert the sorted line numbers to a string of ranges (e.g., 1-3, 7)."""
+    ranges = []
+    start = end = None
+    for line in lines:
+        # this line continues the current range
+        if end is not None and line == end + 1:
+            end = line
+            continue
+        # this line starts a new range and thus the current one is complete
+        if start is not None:
+            ranges.append(f"{start}-{end}" if start != end else f"{start}")
+        start = end = line
+    if start is not None:
+        ranges.append(f"{start}-{end}" if start != end else f"{start}")
+    return ", ".join(ranges)
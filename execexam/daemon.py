@@ -0,0 +1,342 @@
+"""Run executable examinations in a daemon that keeps its modules loaded."""
+
+import json
+import linecache
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import traceback
+from enum import Enum
+from pathlib import Path
+from types import ModuleType
+from typing import Any, List, Protocol, Set
+
+import click
+import typer
+from rich.console import Console
+
+from . import debug as debugger
+
+# the name of the default socket of the daemon inside of a directory
+# that only the user who runs the daemon can access
+SOCKET_NAME = "execexam.sock"
+
+# the parameters of the run command that only the client uses
+# and that are thus not forwarded to the daemon
+CLIENT_PARAMETERS = ["tldr", "via_daemon", "daemon_socket"]
+
+
+def get_socket_directory() -> Path:
+    """Get the directory of the default socket, which only the user can access."""
+    # prefer the runtime directory of the user, which is private to the user
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_directory and Path(runtime_directory).is_dir():
+        return Path(runtime_directory)
+    # otherwise, create a temporary directory that only the user can access
+    # and that is named after the user's ID, which, unlike the user's
+    # name, is also available when the user is not in the password file
+    user_id = os.getuid()
+    socket_directory = Path(tempfile.gettempdir()) / f"execexam-{user_id}"
+    socket_directory.mkdir(mode=0o700, exist_ok=True)
+    # note that another user could have created the directory first
+    # since its name is predictable and thus the daemon would be exposed
+    directory_status = socket_directory.stat()
+    if directory_status.st_uid != user_id or directory_status.st_mode & 0o077:
+        raise click.ClickException(
+            f"The directory {socket_directory} of the daemon's socket"
+            " must only be accessible by its owner"
+        )
+    return socket_directory
+
+
+def get_default_socket() -> Path:
+    """Get the default socket of the daemon, which is specific to the user."""
+    return get_socket_directory() / SOCKET_NAME
+
+
+class MessageStream(Protocol):
+    """A binary stream of the socket, like the file that the socket makes."""
+
+    def write(self, data: bytes, /) -> int:
+        """Write the bytes to the stream."""
+        ...
+
+    def flush(self) -> None:
+        """Flush the bytes that were written to the stream."""
+        ...
+
+
+def send_message(stream: MessageStream, **fields: Any) -> None:
+    """Send a message to the other end of the socket as a line of JSON."""
+    stream.write(json.dumps(fields).encode() + b"\n")
+    stream.flush()
+
+
+class OutputStream:
+    """Stream the output of the console to the client that sent the request."""
+
+    def __init__(self, stream: MessageStream) -> None:
+        """Create an output stream that sends the text to the client."""
+        self.stream = stream
+        self.connected = True
+
+    def write(self, text: str) -> int:
+        """Send the text to the client, unless it already disconnected."""
+        if self.connected and text:
+            try:
+                send_message(self.stream, output=text)
+            except OSError:
+                self.connected = False
+        return len(text)
+
+    def flush(self) -> None:
+        """Flush the output, which is already sent as it is written."""
+
+
+def convert_argument(value: Any) -> str:
+    """Convert the value of a parameter to a command-line argument."""
+    if isinstance(value, Enum):
+        return str(value.value)
+    return str(value)
+
+
+def make_run_arguments(context: click.Context) -> List[str]:
+    """Make the command-line arguments that repeat the run command's parameters."""
+    arguments = []
+    for parameter in context.command.params:
+        value = context.params.get(parameter.name)  # type: ignore
+        if parameter.name in CLIENT_PARAMETERS or value is None:
+            continue
+        # the project and the tests are the arguments of the command
+        if isinstance(parameter, click.Argument):
+            arguments.append(convert_argument(value))
+        # a boolean option is either the option itself or its negation
+        elif isinstance(parameter, click.Option) and parameter.is_flag:
+            if value:
+                arguments.append(parameter.opts[0])
+            elif parameter.secondary_opts:
+                arguments.append(parameter.secondary_opts[0])
+        # an option that can be given multiple times (e.g., the reports)
+        elif isinstance(parameter, click.Option) and parameter.multiple:
+            for item in value:
+                arguments.extend([parameter.opts[0], convert_argument(item)])
+        elif isinstance(parameter, click.Option):
+            arguments.extend([parameter.opts[0], convert_argument(value)])
+    return arguments
+
+
+def request_run(
+    socket_path: Path, arguments: List[str], console: Console
+) -> int:
+    """Request a run from the daemon and display its output as it arrives."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(str(socket_path))
+        stream = client.makefile("rwb")
+        # send the arguments, the environment, and the details about the
+        # terminal so that the daemon runs the tests (e.g., with the API
+        # keys that the advice needs) and renders the output in the same
+        # way as this process would instead of as the daemon's shell would
+        send_message(
+            stream,
+            arguments=arguments,
+            directory=os.getcwd(),
+            environment=dict(os.environ),
+            terminal=console.is_terminal,
+            color_system=console.color_system,
+            width=console.width,
+        )
+        for line in stream:
+            message = json.loads(line)
+            if "output" in message:
+                console.file.write(message["output"])
+                console.file.flush()
+            else:
+                return message["exit_code"]
+    # the daemon stopped before it sent the exit code
+    return 1
+
+
+def get_module_locations(module: ModuleType) -> List[Path]:
+    """Get the file and the directories of the module."""
+    locations = []
+    module_file = getattr(module, "__file__", None)
+    if module_file is not None:
+        locations.append(Path(module_file))
+    # note that a namespace package does not have a file but it does
+    # have the directories in which its modules are found
+    locations.extend(Path(path) for path in getattr(module, "__path__", []))
+    return locations
+
+
+def reset_state(
+    saved_path: List[str], saved_modules: Set[str], directory: Path
+) -> None:
+    """Reset the state of the daemon to the state before the last request."""
+    from . import pytest_plugin as exec_exam_pytest_plugin  # noqa: PLC0415
+    from . import source  # noqa: PLC0415
+
+    # find the directories of the project and the tests, which are
+    # the directories that the request added to the system path and
+    # the directory in which the request was made
+    directories = [directory.resolve()] + [
+        Path(entry).resolve() for entry in sys.path if entry not in saved_path
+    ]
+    # remove the modules that the request imported from the project and the
+    # tests so that the next request imports their latest source code; note
+    # that the modules of the libraries (e.g., the plugins of pytest)
+    # that the request imported are kept since they do not change
+    for name in set(sys.modules) - saved_modules:
+        module = sys.modules.get(name)
+        if module is not None and any(
+            location.resolve().is_relative_to(project_directory)
+            for location in get_module_locations(module)
+            for project_directory in directories
+        ):
+            del sys.modules[name]
+    sys.path[:] = saved_path
+    # clear the details about the tests and the debugging messages
+    exec_exam_pytest_plugin.reports.clear()
+    exec_exam_pytest_plugin.passing_assertions.clear()
+    exec_exam_pytest_plugin.coverage_maps.clear()
+    debugger.reset()
+    # clear the parsed files and the lines of the files that the reports
+    # read so that they do not grow with every request to the daemon
+    source.parsed_files.clear()
+    source.line_indexes.clear()
+    linecache.clearcache()
+
+
+def run_request(request: Any, stream: MessageStream) -> int:
+    """Run the run command with the arguments of the request."""
+    from . import main  # noqa: PLC0415
+
+    saved_path = list(sys.path)
+    saved_modules = set(sys.modules)
+    saved_directory = os.getcwd()
+    saved_environment = dict(os.environ)
+    saved_console = main.console
+    # render the output with a console that has the same terminal
+    # details as the client's console and that streams it to the client
+    output_stream = OutputStream(stream)
+    main.console = Console(
+        file=output_stream,  # type: ignore
+        force_terminal=request["terminal"],
+        color_system=request["color_system"],
+        width=request["width"],
+    )
+    run_command = typer.main.get_command(main.cli).commands["run"]  # type: ignore
+    exit_code = 0
+    try:
+        os.chdir(request["directory"])
+        # run the tests in the client's environment and with the entries
+        # of its PYTHONPATH, which the daemon only read when it started,
+        # at the start of the system path
+        os.environ.clear()
+        os.environ.update(request["environment"])
+        sys.path[0:0] = [
+            entry
+            for entry in request["environment"]
+            .get("PYTHONPATH", "")
+            .split(os.pathsep)
+            if entry
+        ]
+        result = run_command.main(
+            request["arguments"],
+            prog_name="execexam run",
+            standalone_mode=False,
+        )
+        if isinstance(result, int):
+            exit_code = result
+    # the run command finishes by exiting with its return code
+    except SystemExit as error:
+        if isinstance(error.code, int):
+            exit_code = error.code
+        elif error.code is not None:
+            exit_code = 1
+    # the arguments of the request were not valid
+    except click.ClickException as error:
+        error.show(file=output_stream)  # type: ignore
+        exit_code = error.exit_code
+    # the run command crashed and thus the client receives the traceback
+    # while the daemon continues to serve the requests that follow
+    except Exception:
+        output_stream.write(traceback.format_exc())
+        exit_code = 1
+    finally:
+        # note that the run command only restores the standard output
+        # and error when it does not crash while running the tests
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        reset_state(saved_path, saved_modules, Path(request["directory"]))
+        os.chdir(saved_directory)
+        os.environ.clear()
+        os.environ.update(saved_environment)
+        main.console = saved_console
+    return exit_code
+
+
+class RunRequestHandler(socketserver.StreamRequestHandler):
+    """Handle a request to run an executable examination."""
+
+    def handle(self) -> None:
+        """Run the requested examination and send its exit code."""
+        request = json.loads(self.rfile.readline())
+        exit_code = run_request(request, self.wfile)
+        try:
+            send_message(self.wfile, exit_code=exit_code)
+        except OSError:
+            pass
+
+
+def load_modules(litellm: bool) -> None:
+    """Load the modules that every run of an examination needs."""
+    from . import advise  # noqa: PLC0415
+    from . import pytest_plugin as exec_exam_pytest_plugin  # noqa: PLC0415
+
+    # note that importing the litellm module is slow
+    # and thus it is only loaded when it was requested
+    exec_exam_pytest_plugin.load_pytest_plugins()
+    if litellm:
+        advise.load_litellm()
+
+
+def is_daemon_running(socket_path: Path) -> bool:
+    """Determine if a daemon is accepting connections on the socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(str(socket_path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path: Path, litellm: bool) -> None:
+    """Serve the requests to run examinations until the daemon is interrupted."""
+    load_modules(litellm)
+    # remove the socket of a daemon that did not stop cleanly
+    if socket_path.exists():
+        if is_daemon_running(socket_path):
+            raise click.ClickException(
+                f"A daemon is already running on {socket_path}"
+            )
+        socket_path.unlink()
+    # only allow the user who started the daemon to connect to it
+    # since the daemon runs the tests that the requests specify
+    previous_umask = os.umask(0o077)
+    try:
+        server = socketserver.UnixStreamServer(
+            str(socket_path), RunRequestHandler
+        )
+    finally:
+        os.umask(previous_umask)
+    # note that the server handles a single request at a time since
+    # the requests share the state of the pytest plugin and the system path
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
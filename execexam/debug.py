@@ -1,12 +1,40 @@
 """Utility functions to record and produce debugging logs."""
 
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import List
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
 
 # list of debugging messages
 messages: List[str] = []
 
 
+@dataclass(slots=True)
+class DebugEvent:
+    """An event with its monotonic timestamp, duration, thread, and fields."""
+
+    name: str
+    timestamp: float
+    duration: float
+    thread_id: int
+    thread_name: str
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+# list of the recorded debugging events, which is only
+# added to when recording was started (e.g., for a trace);
+# note that appending to a list is safe across threads
+events: List[DebugEvent] = []
+
+# whether or not the debugging events are being recorded
+recording = False
+
+
 class Debug(str, Enum):
     """An enumeration of the various debugging messages."""
 
@@ -24,6 +52,9 @@ class Debug(str, Enum):
     )
     started_litellm_thread = "[green]\u2714 Correctly started LiteLLM thread."
     stopped_litellm_thread = "[green]\u2714 Correctly stopped LiteLLM thread."
+    reused_cached_results = (
+        "[green]\u2714 Reused the cached results of an identical test run."
+    )
     started_capturing_output = (
         "[green]\u2714 Started to capture standard output and error."
     )
@@ -32,10 +63,107 @@ class Debug(str, Enum):
     )
 
 
-def debug(allow: bool, message: str) -> None:
-    """Record a debugging message."""
+# the name of each debugging message, which is the
+# name of the event that records the message
+message_names = {message.value: message.name for message in Debug}
+
+
+def debug(allow: bool, message: str, **fields: Any) -> None:
+    """Record a debugging message and, when recording, its event."""
     if allow:
         messages.append(message)
+    if recording:
+        record_event(
+            message_names.get(message, message),
+            time.perf_counter(),
+            0.0,
+            fields,
+        )
+
+
+def start_recording() -> None:
+    """Start to record the debugging events."""
+    global recording  # noqa: PLW0603
+    recording = True
+
+
+def reset() -> None:
+    """Remove the debugging messages and events and stop recording the events."""
+    global recording  # noqa: PLW0603
+    recording = False
+    messages.clear()
+    events.clear()
+
+
+def record_event(
+    name: str, timestamp: float, duration: float, fields: Dict[str, Any]
+) -> None:
+    """Record an event that happened in the current thread."""
+    thread = threading.current_thread()
+    events.append(
+        DebugEvent(
+            name, timestamp, duration, thread.ident or 0, thread.name, fields
+        )
+    )
+
+
+@contextmanager
+def span(name: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """Record an event that lasts for the context, when recording."""
+    # note that the fields are yielded so that the code inside of the
+    # context can add to them (e.g., the number of tests that it ran)
+    start = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        if recording:
+            record_event(name, start, time.perf_counter() - start, fields)
+
+
+def make_chrome_trace(trace_events: List[DebugEvent]) -> Dict[str, Any]:
+    """Make a trace in the Chrome trace-event format from the events."""
+    # the timestamps and durations of the format are in microseconds
+    # and an event with a duration is a complete event (i.e., "X")
+    # while a debugging message is an instant event (i.e., "i");
+    # the metadata events name the threads in the trace viewer
+    process_id = os.getpid()
+    thread_names = {
+        event.thread_id: event.thread_name for event in trace_events
+    }
+    chrome_events: List[Dict[str, Any]] = [
+        {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": process_id,
+            "tid": thread_id,
+            "args": {"name": thread_name},
+        }
+        for thread_id, thread_name in thread_names.items()
+    ]
+    for event in trace_events:
+        chrome_event: Dict[str, Any] = {
+            "name": event.name,
+            "cat": "execexam",
+            "ph": "X" if event.duration > 0 else "i",
+            "ts": event.timestamp * 1_000_000,
+            "pid": process_id,
+            "tid": event.thread_id,
+            "args": event.fields,
+        }
+        if event.duration > 0:
+            chrome_event["dur"] = event.duration * 1_000_000
+        else:
+            chrome_event["s"] = "t"
+        chrome_events.append(chrome_event)
+    return {"traceEvents": chrome_events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(trace_file: Path) -> None:
+    """Write the recorded events to the file in the Chrome trace-event format."""
+    trace_file.write_text(
+        json.dumps(make_chrome_trace(list(events)), default=str),
+        encoding="utf-8",
+    )
 
 
 def has_debugging_messages() -> bool:
@@ -37,35 +37,91 @@ def display_tldr(console: Console) -> None:
     )
     commands = {
         "mark": {
-            "command": "execexam <path-to-project> <path-to-tests> --mark mark_type",
+            "command": "execexam run <path-to-project> <path-to-tests> --mark mark_type",
             "description": "Run tests with specific markers.",
         },
         "maxfail": {
-            "command": "execexam <path-to-project> <path-to-tests> --maxfail number",
+            "command": "execexam run <path-to-project> <path-to-tests> --maxfail number",
             "description": "Set maximum number of test failures before stopping test execution (default: 10)",
         },
         "report": {
-            "command": "execexam <path-to-project> <path-to-tests> --report report_type/all",
+            "command": "execexam run <path-to-project> <path-to-tests> --report report_type/all",
             "description": "Generate the specified type(s) of reports after the exam. Use 'all' to generate all available report types.",
         },
         "advice-method": {
-            "command": "execexam --advice-method <method> --advice-model <model> --advice-server <server>",
+            "command": "execexam run --advice-method <method> --advice-model <model> --advice-server <server>",
             "description": "Specify the LLM model and advice method to use Coding Mentor. Consult documentation for available models and methods.",
         },
         "debug": {
-            "command": "execexam <path-to-project> <path-to-tests> --debug/--no-debug",
+            "command": "execexam run <path-to-project> <path-to-tests> --debug/--no-debug",
             "description": "Enable or disable debug mode to collect additional debugging information during execution.",
         },
         "fancy": {
-            "command": "execexam <path-to-project> <path-to-tests> --fancy/--no-fancy",
+            "command": "execexam run <path-to-project> <path-to-tests> --fancy/--no-fancy",
             "description": "Toggle fancy output formatting. Disable for simpler output in plain-text environments.",
         },
         "verbose": {
-            "command": "execexam <path-to-project> <path-to-tests> --verbose/--no-verbose",
+            "command": "execexam run <path-to-project> <path-to-tests> --verbose/--no-verbose",
             "description": "Enable or disable verbose output to see more detailed logs of the program's execution.",
         },
+        "coverage": {
+            "command": "execexam run <path-to-project> <path-to-tests> --report coverage",
+            "description": "Display the lines of the project that each test executed.",
+        },
+        "workers": {
+            "command": "execexam run <path-to-project> <path-to-tests> --workers number",
+            "description": "Split the test files across the number of worker processes that run the tests, where each worker stops after --maxfail failures and prints its own summary (default: 1).",
+        },
+        "slowest": {
+            "command": "execexam run <path-to-project> <path-to-tests> --report timing --slowest number",
+            "description": "Display the slowest tests and the time spent in each test phase (default: 10 tests).",
+        },
+        "context": {
+            "command": "execexam run <path-to-project> <path-to-tests> --report context --context-lines number",
+            "description": "Display the lines around the crash site of each failing test and around the failing line of the project (default: 3 lines).",
+        },
+        "trace-labels": {
+            "command": "execexam run <path-to-project> <path-to-tests> --report trace --trace-labels FAILED --trace-labels ERROR",
+            "description": "Keep the lines of the test output that contain any one of the labels in the trace; a trace-labels list in the [tool.execexam] table of pyproject.toml also sets them.",
+        },
+        "events-file": {
+            "command": "execexam run <path-to-project> <path-to-tests> --events-file events.ndjson",
+            "description": "Stream the test events as JSON lines to a file or pipe while the tests run.",
+        },
+        "cache": {
+            "command": "execexam run <path-to-project> <path-to-tests> --cache/--no-cache",
+            "description": "Reuse the results of an earlier run when the project, the tests, and the options have not changed.",
+        },
+        "affected": {
+            "command": "execexam run <path-to-project> <path-to-tests> --affected",
+            "description": "Only run the tests that failed or that ran lines of the project that changed since the last run.",
+        },
+        "json": {
+            "command": "execexam run <path-to-project> <path-to-tests> --report failure --output-format json --output-file results.json",
+            "description": "Save the summary, the return code, and the requested reports as a JSON document with a versioned schema instead of displaying them.",
+        },
+        "limits": {
+            "command": "execexam run <path-to-project> <path-to-tests> --test-timeout 5 --cpu-limit 10 --memory-limit 512",
+            "description": "Fail a test that runs for too long, uses too much CPU time, or allocates too much memory, and then run the next test; a timeout mark overrides the timeout for a test and the memory limit only applies while no other thread runs (e.g., while LiteLLM loads for advice).",
+        },
+        "debug-trace": {
+            "command": "execexam run <path-to-project> <path-to-tests> --debug-trace trace.json",
+            "description": "Save the timed events of the run, including its phases and the thread that loads litellm, in the Chrome trace-event format for viewing in Perfetto.",
+        },
+        "serve": {
+            "command": "execexam serve --socket path",
+            "description": "Start a daemon that keeps execexam's modules loaded to serve the runs that use --via-daemon.",
+        },
+        "via-daemon": {
+            "command": "execexam run <path-to-project> <path-to-tests> --via-daemon",
+            "description": "Run the tests in the daemon started by execexam serve, running them without it if it is not running.",
+        },
+        "batch": {
+            "command": "execexam batch 'submissions/*' tests --output-format csv --output-file grades.csv",
+            "description": "Grade every project that matches the glob (or is listed in a manifest file) in parallel and save the outcomes as JSON or CSV.",
+        },
         "syntax-theme": {
-            "command": "execexam <path-to-project> <path-to-tests> --syntax-theme theme_name",
+            "command": "execexam run <path-to-project> <path-to-tests> --syntax-theme theme_name",
             "description": "Choose syntax highlighting theme for code output (options: ansi_dark, ansi_light)",
         },
     }
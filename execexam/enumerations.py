@@ -10,6 +10,20 @@ class AdviceMethod(str, Enum):
     api_server = "apiserver"
 
 
+class OutputFormat(str, Enum):
+    """An enumeration of the formats for the outcomes of grading many projects."""
+
+    json = "json"
+    csv = "csv"
+
+
+class ResultFormat(str, Enum):
+    """An enumeration of the formats for the results of running an examination."""
+
+    text = "text"
+    json = "json"
+
+
 class Theme(str, Enum):
     """An enumeration of the themes for syntax highlighting in rich."""
 
@@ -29,3 +43,6 @@ class ReportType(str, Enum):
     testfailures = "failure"
     testtrace = "trace"
     testadvice = "advice"
+    timing = "timing"
+    coverage = "coverage"
+    context = "context"
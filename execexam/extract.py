@@ -1,9 +1,15 @@
 """Extract contents from data structures."""
 
+import re
+from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from . import convert
+from rich.markup import escape
+
+from . import convert, source
+from .pytest_plugin import ResultRecord
 
 
 def is_failing_test_details_empty(details: str) -> bool:
@@ -58,123 +64,361 @@ def extract_test_assertion_details(test_details: Dict[Any, Any]) -> str:
     return "".join(output)
 
 
+def extract_test_assertion_summary(test_details: Dict[Any, Any]) -> str:
+    """Extract the details of an aggregated assertion as a single summary line."""
+    # note that an aggregated assertion records how many times the
+    # assertion on a line passed along with its first and last example
+    return (
+        f"  - {test_details['Status']}: Line {test_details['Line']}"
+        f" ({test_details['Count']}x), Code: {test_details['Code']},"
+        f" First: {test_details['First']}, Last: {test_details['Last']}\n"
+    )
+
+
 def extract_test_assertion_details_list(details: List[Dict[Any, Any]]) -> str:
     """Extract the details of a list of dictionaries and return it as a string."""
     output = []
     # iterate through the list of dictionaries and add each dictionary
     # to the running string that conatins test assertion details
     for current_dict in details:
-        output.append(extract_test_assertion_details(current_dict))
+        # the assertion was aggregated across all of the times that
+        # it passed and thus it is summarized on a single line
+        if "Count" in current_dict:
+            output.append(extract_test_assertion_summary(current_dict))
+        else:
+            output.append(extract_test_assertion_details(current_dict))
     return "".join(output)
 
 
-def extract_test_assertions_details(test_reports: List[dict[str, Any]]):
-    """Extract the details of test assertions."""
-    # create an empty list that will store details about
-    # each test case that was execued and each of
-    # the assertions that was run for that test case
-    test_report_string = ""
-    # iterate through the list of test reports
-    # where each report is a dictionary that includes
-    # the name of the test and the assertions that it ran
+def iter_test_assertions_details(
+    test_reports: Iterable[Dict[str, Any]],
+) -> Iterator[str]:
+    """Iterate through the details of each test and the assertions that it ran."""
+    # iterate through the test reports in the order in which
+    # the tests were run where each report is a dictionary that
+    # includes the name of the test and the assertions that it ran
     for test_report in test_reports:
         # get the name of the test
         test_name = test_report["nodeid"]
         # extract only the name of the test file and the test name,
         # basically all of the content after the final slash
         display_test_name = test_name.rsplit("/", 1)[-1]
-        test_report_string += f"\n{display_test_name}\n"
+        yield f"\n{display_test_name}\n"
         # there is data about the assertions for this
         # test and thus it should be extracted and reported
         if "assertions" in test_report:
-            test_report_string += extract_test_assertion_details_list(
+            yield extract_test_assertion_details_list(
                 test_report["assertions"]
             )
-    # return the string that contains all of the test assertion details
-    return test_report_string
 
 
-def extract_failing_test_details(
-    details: dict[Any, Any],
-) -> Tuple[str, List[Dict[str, Path]]]:
-    """Extract the details of a failing test."""
-    # extract the tests from the details
-    tests = details["tests"]
-    # create an empty string that starts with a newline;
-    # the goal of the for loop is to incrementally build
-    # of a string that contains all deteails about failing tests
-    failing_details_str = "\n"
-    # create an initial path for the file containing the failing test
-    failing_test_paths = []
-    # incrementally build up results for all of the failing tests
+def extract_test_assertions_details(test_reports: Iterable[Dict[str, Any]]):
+    """Extract the details of test assertions."""
+    # join the details of all of the tests once instead of
+    # adding the details of each test to a growing string
+    return "".join(iter_test_assertions_details(test_reports))
+
+
+@dataclass(slots=True)
+class FailingTest:
+    """The name, the path, and the details about the crash of a failing test."""
+
+    nodeid: str
+    test_name: str
+    test_path: Path
+    lineno: Optional[int]
+    message: Optional[str]
+
+
+def iter_failing_tests(details: Dict[Any, Any]) -> Iterator[FailingTest]:
+    """Iterate through the failing tests in the details of a test run."""
+    # extract the root of the report, which corresponds
+    # to the filesystem on which the tests were run
+    failing_test_path_root = Path(details["root"])
+    # extract the tests from the details; note that each
+    # test is a record that the execexam plugin collected
+    tests: List[ResultRecord] = details["tests"]
+    # create the path of each file once for all of its failing tests
+    failing_test_paths: Dict[str, Path] = {}
     for test in tests:
-        if test["outcome"] == "failed":
-            current_test_failing_dict = {}
-            # convert the dictionary of failing details to a string
-            # and add it to the failing_details_str
-            failing_details = test
-            # get the nodeid of the failing test
-            failing_test_nodeid = failing_details["nodeid"]
-            failing_details_str += f"  Name: {failing_test_nodeid}\n"
-            # get the call information of the failing test
-            failing_test_call = failing_details["call"]
-            # get the crash information of the failing test's call
-            failing_test_crash = failing_test_call["crash"]
-            # extract the root of the report, which corresponds
-            # to the filesystem on which the tests were run
-            failing_test_path_root = details["root"]
+        if test.outcome == "failed":
             # extract the name of the file that contains the test
             # from the name of the individual test case itself
-            failing_test_nodeid_split = failing_test_nodeid.split("::")
-            # create a complete path to the file that contains the failing test file
-            failing_test_path = (
-                Path(failing_test_path_root) / failing_test_nodeid_split[0]
+            failing_test_nodeid_split = test.nodeid.split("::")
+            # create a complete path to the file that contains the failing test
+            failing_test_file = failing_test_nodeid_split[0]
+            failing_test_path = failing_test_paths.get(failing_test_file)
+            if failing_test_path is None:
+                failing_test_path = failing_test_path_root / failing_test_file
+                failing_test_paths[failing_test_file] = failing_test_path
+            yield FailingTest(
+                test.nodeid,
+                # extract the name of the function from the nodeid
+                failing_test_nodeid_split[-1],
+                failing_test_path,
+                # get the crash information of the failing test's call
+                test.lineno,
+                test.message,
             )
-            # extract the name of the function from the nodeid
-            failing_test_name = failing_test_nodeid_split[-1]
-            # assign the details about the failing test to the dictionary
-            current_test_failing_dict["test_name"] = failing_test_name
-            current_test_failing_dict["test_path"] = failing_test_path
-            failing_test_paths.append(current_test_failing_dict)
-            # creation additional diagnotics about the failing test
-            # for further display in the console in a text-based fashion
+
+
+def iter_failing_test_details(
+    failing_tests: Iterable[FailingTest],
+) -> Iterator[str]:
+    """Iterate through the lines of the details about the failing tests."""
+    # elide the path of each file once for all of its failing tests
+    failing_test_path_strs: Dict[Path, str] = {}
+    for failing_test in failing_tests:
+        # creation additional diagnotics about the failing test
+        # for further display in the console in a text-based fashion
+        failing_test_path_str = failing_test_path_strs.get(
+            failing_test.test_path
+        )
+        if failing_test_path_str is None:
             failing_test_path_str = convert.path_to_string(
-                failing_test_path, 4
+                failing_test.test_path, 4
             )
-            failing_test_lineno = failing_test_crash["lineno"]
-            failing_test_message = failing_test_crash["message"]
-            # assemble all of the failing test details into the string
-            failing_details_str += f"  Path: {failing_test_path_str}\n"
-            failing_details_str += f"  Line number: {failing_test_lineno}\n"
-            failing_details_str += f"  Message: {failing_test_message}\n"
+            failing_test_path_strs[failing_test.test_path] = (
+                failing_test_path_str
+            )
+        # assemble all of the failing test details into the lines
+        yield f"  Name: {failing_test.nodeid}\n"
+        yield f"  Path: {failing_test_path_str}\n"
+        yield f"  Line number: {failing_test.lineno}\n"
+        yield f"  Message: {failing_test.message}\n"
+
+
+def extract_failing_test_details(
+    details: dict[Any, Any],
+) -> Tuple[str, List[Dict[str, Path]]]:
+    """Extract the details of a failing test."""
+    failing_tests = list(iter_failing_tests(details))
+    # create the string that starts with a newline and that
+    # contains all of the details about the failing tests
+    failing_details_str = "\n" + "".join(
+        iter_failing_test_details(failing_tests)
+    )
+    # create the name and the path of the file of each failing test
+    failing_test_paths: List[Dict[str, Any]] = [
+        {
+            "test_name": failing_test.test_name,
+            "test_path": failing_test.test_path,
+        }
+        for failing_test in failing_tests
+    ]
     # return the string that contains all of the failing test details
     return (failing_details_str, failing_test_paths)
 
 
-def extract_test_output(keep_line_label: str, output: str) -> str:
-    """Filter the output of the test run to keep only the lines that contain the label."""
-    # create an empty string that will store the filtered output
-    filtered_output = ""
+def extract_test_timing_details(
+    details: dict[Any, Any], slowest: int = 10
+) -> str:
+    """Extract the slowest tests and the total time of each test phase."""
+    # extract the tests from the details; note that each test
+    # is a record that includes the duration of each of its phases
+    tests: List[ResultRecord] = details["tests"]
+    # create an empty list that will store the lines of the details
+    timing_details = ["\n"]
+    # display the slowest tests with the duration of each phase
+    timing_details.append(
+        f"  Slowest {slowest} test(s) (setup + call + teardown):\n"
+    )
+    slowest_tests = sorted(tests, key=lambda test: test.duration, reverse=True)
+    for test in slowest_tests[:slowest]:
+        timing_details.append(
+            f"  - {test.duration:.4f}s {test.nodeid}"
+            f" ({test.setup:.4f}s + {test.call:.4f}s + {test.teardown:.4f}s)\n"
+        )
+    # display the total time that all of the tests spent in each phase
+    timing_details.append("  Total time per phase:\n")
+    for phase in ["setup", "call", "teardown"]:
+        phase_total = sum(getattr(test, phase) for test in tests)
+        timing_details.append(f"  - {phase}: {phase_total:.4f}s\n")
+    overall_total = sum(test.duration for test in tests)
+    timing_details.append(f"  - total: {overall_total:.4f}s\n")
+    return "".join(timing_details)
+
+
+def extract_phase_timing_details(run_phases: List[Dict[str, Any]]) -> str:
+    """Extract a table of the start and the duration of each phase of the run."""
+    # note that the phases are in the order in which they started and that
+    # a phase can be inside of another one (e.g., pytest collects the tests
+    # during the phase that runs pytest) and thus their durations overlap
+    phase_details = ["\n", f"  {'Phase':<28} {'Start':>10} {'Duration':>10}\n"]
+    for run_phase in run_phases:
+        phase_details.append(
+            f"  {run_phase['name']:<28} {run_phase['start']:9.4f}s"
+            f" {run_phase['duration']:9.4f}s\n"
+        )
+    return "".join(phase_details)
+
+
+def extract_test_coverage_details(
+    coverage_maps: Dict[str, Dict[str, int]],
+) -> str:
+    """Extract the lines of each file of the project that each test covered."""
+    coverage_details = []
+    for test_name, covered_files in coverage_maps.items():
+        # extract only the name of the test file and the test name,
+        # basically all of the content after the final slash
+        display_test_name = test_name.rsplit("/", 1)[-1]
+        coverage_details.append(f"\n{display_test_name}\n")
+        # display the ranges of the lines that were covered in each file
+        for covered_file, bitmap in covered_files.items():
+            covered_lines = convert.lines_to_ranges(
+                convert.bitmap_to_lines(bitmap)
+            )
+            coverage_details.append(f"  - {covered_file}: {covered_lines}\n")
+    return "".join(coverage_details)
+
+
+def select_context_frames(
+    frames: List[Tuple[str, int]], project: Optional[Path]
+) -> List[Tuple[str, str, int]]:
+    """Select the frame of the test, the failing frame in the project, and the crash site."""
+    if not frames:
+        return []
+    # the frames start at the test and end at the crash site, which
+    # can be inside of a library; the failing frame in the project is
+    # the deepest frame in a file of the project other than the test
+    test_path = frames[0][0]
+    project_frames = []
+    if project is not None:
+        resolved_project = project.resolve()
+        project_frames = [
+            frame
+            for frame in frames
+            if frame[0] != test_path
+            and Path(frame[0]).resolve().is_relative_to(resolved_project)
+        ]
+    selected_frames = [("test", *frames[0])]
+    if project_frames:
+        selected_frames.append(("project", *project_frames[-1]))
+    selected_frames.append(("crash site", *frames[-1]))
+    # note that the crash site is often the frame of the test or the
+    # failing frame in the project and thus it appears once with both roles
+    frame_roles: Dict[Tuple[str, int], List[str]] = {}
+    for role, path, lineno in selected_frames:
+        frame_roles.setdefault((path, lineno), []).append(role)
+    return [
+        (" and ".join(roles).capitalize(), path, lineno)
+        for (path, lineno), roles in frame_roles.items()
+    ]
+
+
+def extract_crash_context_details(
+    details: Dict[str, Any], project: Optional[Path], context_lines: int
+) -> str:
+    """Extract the lines around the crash site of each failing test."""
+    context_details = []
+    for test in details["tests"]:
+        if test.outcome != "failed" or not test.frames:
+            continue
+        context_details.append(f"\n  Name: {escape(test.nodeid)}\n")
+        for role, path, lineno in select_context_frames(test.frames, project):
+            context_details.append(
+                f"  {role}: {convert.path_to_string(Path(path), 4)}:{lineno}\n"
+            )
+            # read the lines from the index of the lines of the file
+            # so that the crash sites in a file only read it once
+            numbered_lines = source.get_context_lines(
+                Path(path), lineno, context_lines
+            )
+            width = len(str(numbered_lines[-1][0])) if numbered_lines else 0
+            for number, line in numbered_lines:
+                marker = ">" if number == lineno else " "
+                # note that the code can look like markup (e.g., a[i])
+                context_details.append(
+                    f"  {marker} {number:>{width}} | {escape(line)}\n"
+                )
+    return "".join(context_details)
+
+
+def iter_test_output(
+    keep_line_label: str, output: Union[str, Iterable[str]]
+) -> Iterator[str]:
+    """Iterate through the lines of the output of the test run that contain the label."""
+    # the output is either the text of the output or its lines, which
+    # can be streamed from the captured output instead of copied and split
+    lines = output.splitlines() if isinstance(output, str) else output
     # iterate through the lines in the output
-    for line in output.splitlines():
-        # if the line contains the label, add it to the filtered output
+    for line in lines:
+        # if the line contains the label, keep it
         if keep_line_label in line:
-            filtered_output += line + "\n"
-    # return the filtered output
-    return filtered_output
+            yield line
+
+
+def extract_test_output(keep_line_label: str, output: str) -> str:
+    """Filter the output of the test run to keep only the lines that contain the label."""
+    # join the filtered lines once instead of adding each
+    # one of them to a growing string of the filtered output
+    return "".join(
+        line + "\n" for line in iter_test_output(keep_line_label, output)
+    )
+
+
+class LabelMatcher:
+    """Match the lines that contain any one of the labels with a single compiled pattern."""
+
+    def __init__(self, labels: Iterable[str], count: bool = False) -> None:
+        """Compile the pattern that matches the labels and, optionally, count the matches of each one."""
+        self.labels = list(labels)
+        # note that the labels are literal text instead of regular
+        # expressions and that no line matches when there are no labels
+        if self.labels:
+            self.pattern = re.compile(
+                "|".join(re.escape(label) for label in self.labels)
+            )
+        else:
+            self.pattern = re.compile("(?!)")
+        self.count = count
+        self.counts: Counter[str] = Counter(dict.fromkeys(self.labels, 0))
+
+    def matches(self, line: str) -> bool:
+        """Determine whether or not the line contains any one of the labels."""
+        if self.pattern.search(line) is None:
+            return False
+        # count the line once for each one of the labels that it contains,
+        # including a label inside of another one (e.g., ERROR inside of
+        # COLLECTERROR), which the pattern's single match at each position
+        # would miss; note that this only checks the lines that matched
+        if self.count:
+            self.counts.update(label for label in self.labels if label in line)
+        return True
+
+
+def iter_test_output_multiple_labels(
+    keep_line_labels: Union[List[str], LabelMatcher],
+    output: Union[str, Iterable[str]],
+) -> Iterator[str]:
+    """Iterate through the lines of the output of the test run that contain any one of the labels."""
+    # the output is either the text of the output or its lines, which
+    # can be streamed from the captured output instead of copied and split
+    lines = output.splitlines() if isinstance(output, str) else output
+    # match all of the labels with a single compiled pattern instead of
+    # searching for each one of the labels in each one of the lines
+    matcher = (
+        keep_line_labels
+        if isinstance(keep_line_labels, LabelMatcher)
+        else LabelMatcher(keep_line_labels)
+    )
+    # note that the pattern's search directly filters the lines
+    # when the matcher does not count the matches of each label
+    if not matcher.count:
+        yield from filter(matcher.pattern.search, lines)
+        return
+    for line in lines:
+        if matcher.matches(line):
+            yield line
 
 
 def extract_test_output_multiple_labels(
-    keep_line_labels: List[str], output: str
+    keep_line_labels: Union[List[str], LabelMatcher],
+    output: Union[str, Iterable[str]],
 ) -> str:
     """Filter the output of the test run to keep only the lines that contain the label."""
-    # create an empty string that will store the filtered output
-    filtered_output = ""
-    # iterate through the lines in the output
-    for line in output.splitlines():
-        # if the line contains any one of the the labels,
-        # then add it to the filtered output
-        if any(label in line for label in keep_line_labels):
-            filtered_output += line + "\n"
-    # return the filtered output
-    return filtered_output
+    # join the filtered lines once to create the filtered output
+    return "".join(
+        line + "\n"
+        for line in iter_test_output_multiple_labels(keep_line_labels, output)
+    )
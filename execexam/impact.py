@@ -0,0 +1,251 @@
+"""Select the tests of an executable examination that are affected by changes."""
+
+import ast
+import difflib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from . import cache, convert
+
+# the directory inside of the cache that stores the snapshot; note
+# that the snapshot is not stored next to the cache entries so that
+# it is never evicted when the cache becomes too large
+SNAPSHOT_DIRECTORY = "impact"
+
+# the name of the file that stores the snapshot
+SNAPSHOT_FILE = "snapshot.json"
+
+
+@dataclass(slots=True)
+class SourceChange:
+    """The lines of a source file that changed since the snapshot."""
+
+    # the lines of the old source that were replaced or deleted
+    changed: int = 0
+    # the lines of the old source that surround the inserted lines
+    neighbours: int = 0
+    # the lines of the new source that were inserted or that replaced lines
+    inserted: int = 0
+    # the new line number of each of the old lines that did not change
+    line_map: Dict[int, int] = field(default_factory=dict)
+
+
+def get_source_name(project: Path, source_file: Path) -> str:
+    """Get the name of the source file, relative to the project if it is inside of it."""
+    resolved_project = project.resolve()
+    resolved_file = source_file.resolve()
+    if resolved_file.is_relative_to(resolved_project):
+        return resolved_file.relative_to(resolved_project).as_posix()
+    return str(resolved_file)
+
+
+def read_sources(project: Path, tests: Path) -> Dict[str, str]:
+    """Read the source and configuration files of the project and the tests."""
+    return {
+        get_source_name(project, source_file): source_file.read_text(
+            encoding="utf-8", errors="replace"
+        )
+        for path in [project, tests]
+        for source_file in cache.find_source_files(path)
+    }
+
+
+def find_module_level_lines(text: str) -> int:
+    """Find the lines of the source code that run when the module is imported."""
+    try:
+        tree = ast.parse(text)
+    except SyntaxError:
+        # note that every bit of negative one is set and thus the
+        # module that cannot be parsed has all of its lines included
+        return -1
+    lines: List[int] = []
+    bodies = [tree.body]
+    while bodies:
+        for node in bodies.pop():
+            # the decorators and the signature of a function or a class
+            # run when the module is imported, but the body of a function
+            # only runs when it is called; note that the body of a class
+            # runs when the module is imported and thus it is also visited
+            if isinstance(
+                node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+            ):
+                start = min(
+                    [node.lineno]
+                    + [decorator.lineno for decorator in node.decorator_list]
+                )
+                lines.extend(
+                    range(start, max(node.body[0].lineno, node.lineno + 1))
+                )
+                if isinstance(node, ast.ClassDef):
+                    bodies.append(node.body)
+            # every other statement runs when the module is imported
+            else:
+                lines.extend(range(node.lineno, node.end_lineno + 1))  # type: ignore
+    return convert.lines_to_bitmap(lines)
+
+
+def compare_sources(old_text: str, new_text: str) -> SourceChange:
+    """Compare the old and the new source code of a file line by line."""
+    source_change = SourceChange()
+    matcher = difflib.SequenceMatcher(
+        None, old_text.splitlines(), new_text.splitlines(), autojunk=False
+    )
+    # note that the line numbers of the matcher start at zero while
+    # the line numbers of the source code and the coverage start at one
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        if tag == "equal":
+            for offset in range(old_end - old_start):
+                source_change.line_map[old_start + offset + 1] = (
+                    new_start + offset + 1
+                )
+            continue
+        source_change.changed |= convert.lines_to_bitmap(
+            range(old_start + 1, old_end + 1)
+        )
+        source_change.inserted |= convert.lines_to_bitmap(
+            range(new_start + 1, new_end + 1)
+        )
+        # the lines were only inserted and thus the tests that ran
+        # the lines before or after them may run the new lines too
+        if old_start == old_end:
+            source_change.neighbours |= convert.lines_to_bitmap(
+                [old_start, old_start + 1]
+            )
+    return source_change
+
+
+def find_source_changes(
+    old_sources: Dict[str, str], sources: Dict[str, str]
+) -> Optional[Dict[str, SourceChange]]:
+    """Find the changes to the source files, or None if every test is affected."""
+    source_changes: Dict[str, SourceChange] = {}
+    for name in sorted(set(old_sources) | set(sources)):
+        old_text = old_sources.get(name)
+        new_text = sources.get(name)
+        if old_text == new_text:
+            continue
+        # a new file was not run by any of the tests before and thus it
+        # can only affect the tests that run the changed code that uses it
+        if old_text is None:
+            continue
+        # a change to a configuration file, a conftest.py file, or a file
+        # that is outside of the project (e.g., the tests), and the deletion
+        # of a file can affect any test since its lines are not covered
+        if (
+            new_text is None
+            or not name.endswith(".py")
+            or Path(name).name == "conftest.py"
+            or Path(name).is_absolute()
+        ):
+            return None
+        # a change to the lines that run when the module is imported
+        # (e.g., the imports or the signature of a function) can affect
+        # any test that uses the module, even without covering the lines
+        source_change = compare_sources(old_text, new_text)
+        if source_change.changed & find_module_level_lines(
+            old_text
+        ) or source_change.inserted & find_module_level_lines(new_text):
+            return None
+        source_changes[name] = source_change
+    return source_changes
+
+
+def is_test_affected(
+    covered_files: Dict[str, int], source_changes: Dict[str, SourceChange]
+) -> bool:
+    """Determine if the test covered any of the lines that changed."""
+    for covered_file, bitmap in covered_files.items():
+        source_change = source_changes.get(covered_file)
+        if source_change is not None and bitmap & (
+            source_change.changed | source_change.neighbours
+        ):
+            return True
+    return False
+
+
+def find_unaffected_tests(
+    snapshot: Dict[str, Any], source_changes: Dict[str, SourceChange]
+) -> Set[str]:
+    """Find the tests that passed and did not cover any of the changed lines."""
+    # note that a test that did not pass is always run again
+    # since its failure is not fixed unless the test runs again
+    return {
+        nodeid
+        for nodeid, covered_files in snapshot["coverage"].items()
+        if snapshot["outcomes"].get(nodeid) == "passed"
+        and not is_test_affected(covered_files, source_changes)
+    }
+
+
+def remap_bitmap(bitmap: int, line_map: Dict[int, int]) -> int:
+    """Move the lines of the bitmap to their new line numbers."""
+    return convert.lines_to_bitmap(
+        line_map[line]
+        for line in convert.bitmap_to_lines(bitmap)
+        if line in line_map
+    )
+
+
+def update_snapshot(  # noqa: PLR0913
+    snapshot: Optional[Dict[str, Any]],
+    source_changes: Optional[Dict[str, SourceChange]],
+    sources: Dict[str, str],
+    unaffected_tests: Set[str],
+    coverage_maps: Dict[str, Dict[str, int]],
+    results: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Update the snapshot with the sources and the tests that ran."""
+    coverage: Dict[str, Dict[str, int]] = {}
+    outcomes: Dict[str, str] = {}
+    # keep the coverage of the unaffected tests that did not run,
+    # moving their covered lines to the line numbers of the new sources
+    if snapshot is not None and source_changes is not None:
+        for nodeid in unaffected_tests - set(coverage_maps):
+            coverage[nodeid] = {
+                covered_file: (
+                    remap_bitmap(bitmap, source_changes[covered_file].line_map)
+                    if covered_file in source_changes
+                    else bitmap
+                )
+                for covered_file, bitmap in snapshot["coverage"][
+                    nodeid
+                ].items()
+            }
+            outcomes[nodeid] = snapshot["outcomes"][nodeid]
+    # record the coverage and the outcomes of the tests that ran
+    coverage.update(coverage_maps)
+    if results is not None:
+        outcomes.update(
+            {test.nodeid: test.outcome for test in results["tests"]}
+        )
+    return {"sources": sources, "coverage": coverage, "outcomes": outcomes}
+
+
+def load_snapshot(project: Path) -> Optional[Dict[str, Any]]:
+    """Load the snapshot of the project's last run, if it exists."""
+    snapshot_file = (
+        project / cache.CACHE_DIRECTORY / SNAPSHOT_DIRECTORY / SNAPSHOT_FILE
+    )
+    try:
+        return json.loads(snapshot_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def save_snapshot(project: Path, snapshot: Dict[str, Any]) -> None:
+    """Save the snapshot of the project's last run, if it can be written."""
+    # note that, like a snapshot that cannot be loaded, a snapshot that
+    # cannot be saved (e.g., the project is read-only) does not stop the run
+    try:
+        snapshot_directory = (
+            cache.get_cache_directory(project) / SNAPSHOT_DIRECTORY
+        )
+        snapshot_directory.mkdir(exist_ok=True)
+        snapshot_file = snapshot_directory / SNAPSHOT_FILE
+        temporary_file = snapshot_file.with_suffix(".tmp")
+        temporary_file.write_text(json.dumps(snapshot), encoding="utf-8")
+        temporary_file.replace(snapshot_file)
+    except OSError:
+        return
@@ -1,8 +1,6 @@
 """Run an executable examination."""
 
-import io
 import os
-import subprocess
 import sys
 import threading
 import time
@@ -10,15 +8,13 @@ import warnings
 from pathlib import Path
 from typing import List, Optional
 
-import pytest
+import click
 import typer
-from pytest_jsonreport.plugin import JSONReport  # type: ignore
 from rich.console import Console
 from typing_extensions import Annotated
 
-from . import advise, display, enumerations, extract, util
+from . import advise, daemon, display, enumerations, phases
 from . import debug as debugger
-from . import pytest_plugin as exec_exam_pytest_plugin
 
 # suppress the warnings that are produced by the Pydantic library;
 # note that this is needed because one of execexam's dependencies
@@ -31,10 +27,9 @@ cli = typer.Typer(no_args_is_help=True)
 # create a default console
 console = Console()
 
-# create the skip list for data not needed
-skip = ["keywords", "setup", "teardown"]
-
-# create a variable of the main pytest issues
+# create a variable of the main pytest issues, which are the labels
+# of the lines of the test output in the trace unless other labels
+# are on the command-line or in the configuration of the examination
 pytest_labels = ["FAILED", "ERROR", "WARNING", "COLLECTERROR"]
 
 
@@ -45,8 +40,20 @@ def tldr_callback(value: bool) -> None:
         raise typer.Exit()
 
 
+def load_litellm_with_trace() -> None:
+    """Load the litellm module inside of a debugging span."""
+    with debugger.span("load litellm"):
+        advise.load_litellm()
+
+
+def write_debug_trace(debug_trace: Optional[Path]) -> None:
+    """Write the debugging events to the trace file, if one was requested."""
+    if debug_trace is not None:
+        debugger.write_chrome_trace(debug_trace)
+
+
 @cli.command()
-def run(  # noqa: PLR0913, PLR0915
+def run(  # noqa: PLR0912, PLR0913, PLR0915
     project: Path = typer.Argument(
         ...,
         help="Project directory containing questions and tests",
@@ -79,16 +86,72 @@ def run(  # noqa: PLR0913, PLR0915
     ),
     advice_server: str = typer.Option(None, help="URL of the LiteLLM server"),
     debug: bool = typer.Option(False, help="Collect debugging information"),
+    debug_trace: Path = typer.Option(
+        None, help="File for the debugging events in the Chrome trace format"
+    ),
     fancy: bool = typer.Option(True, help="Display fancy output"),
     syntax_theme: enumerations.Theme = typer.Option(
         enumerations.Theme.ansi_dark, help="Syntax highlighting theme"
     ),
+    workers: int = typer.Option(
+        1,
+        help="Number of worker processes that run the tests, each with its own maxfail",
+    ),
+    slowest: int = typer.Option(
+        10, help="Number of slowest tests in the timing report"
+    ),
+    context_lines: int = typer.Option(
+        3, help="Number of lines around each crash site in the context report"
+    ),
+    trace_labels: List[str] = typer.Option(
+        None, help="Label of the lines of the test output in the trace"
+    ),
+    events_file: Path = typer.Option(
+        None, help="File or pipe for streaming the test events as JSON lines"
+    ),
+    use_cache: bool = typer.Option(
+        False, "--cache/--no-cache", help="Reuse the results of identical runs"
+    ),
+    affected: bool = typer.Option(
+        False, help="Only run the tests affected by changes since the last run"
+    ),
+    via_daemon: bool = typer.Option(
+        False, help="Run the tests in the daemon started by execexam serve"
+    ),
+    daemon_socket: Path = typer.Option(
+        None,
+        help="Socket of the execexam daemon (default: in a directory private to the user)",
+    ),
+    test_timeout: float = typer.Option(
+        None, help="Fail a test when it runs for longer than the seconds"
+    ),
+    cpu_limit: int = typer.Option(
+        None, help="Fail a test when it uses more than the seconds of CPU time"
+    ),
+    memory_limit: int = typer.Option(
+        None,
+        help="Fail a test when it allocates more than the megabytes, unless another thread runs (e.g., loading LiteLLM for advice)",
+    ),
+    output_format: enumerations.ResultFormat = typer.Option(
+        enumerations.ResultFormat.text,
+        help="Format of the results, where json only contains the requested reports",
+    ),
+    output_file: Path = typer.Option(
+        None, help="File for the JSON results instead of the standard output"
+    ),
 ) -> None:
     """Run an executable exam and produce the requested report(s)."""
+    # capture the command-line parameters before this function defines
+    # any of its other variables so that only they are displayed
+    parameters = dict(locals())
     # indicate that the program's exit code is zero
     # to show that the program completed successfully;
     # attempt to prove otherwise by running all the checks
     return_code = 0
+    # record the debugging events of this run, including the events
+    # in the thread that loads litellm, when a trace was requested
+    if debug_trace is not None:
+        debugger.start_recording()
     # confirm that the advice model is provided when
     # the report includes the advice report type or
     # when the report includes all of the report types
@@ -100,151 +163,379 @@ def run(  # noqa: PLR0913, PLR0915
     # load the litellm module in a separate thread when advice
     # was requested for this run of the program
     debugger.debug(debug, debugger.Debug.parameter_check_passed.value)
-    litellm_thread = threading.Thread(target=advise.load_litellm)
+    litellm_thread = threading.Thread(
+        target=load_litellm_with_trace, name="litellm-loader"
+    )
     # if --tldr was specified, then display the TLDR summary
     # of the commands and then exit the program
     if tldr:
         display.display_tldr(console)
         raise typer.Exit()
+    # if --via-daemon was specified, then send the parameters to the daemon
+    # that already loaded execexam's modules and display its output;
+    # note that the tests run in this process when there is no daemon
+    if via_daemon:
+        try:
+            # note that the default socket is only found when it is needed
+            # since finding it can create its directory
+            if daemon_socket is None:
+                daemon_socket = daemon.get_default_socket()
+            daemon_return_code = daemon.request_run(
+                daemon_socket,
+                daemon.make_run_arguments(click.get_current_context()),
+                console,
+            )
+        except OSError:
+            console.print(
+                f"[yellow]No daemon is running on {daemon_socket};"
+                " running the tests without it.[/yellow]\n"
+            )
+        else:
+            sys.exit(daemon_return_code)
+    # time each phase of the run of the examination, starting with
+    # importing the modules that run the tests, for the timing report
+    timer = phases.PhaseTimer()
+    # import the modules that run the tests only when this command
+    # runs the tests in this process so that displaying the help or the
+    # TLDR summary and sending the run to the daemon are fast
+    with timer.phase("import modules"):
+        import pytest  # noqa: PLC0415
+
+        from . import (  # noqa: PLC0415
+            cache,
+            capture,
+            config,
+            extract,
+            impact,
+            parallel,
+            producers,
+            results,
+            util,
+        )
+        from . import pytest_plugin as exec_exam_pytest_plugin  # noqa: PLC0415
+    # the results are written as a JSON document instead of being displayed
+    # and thus none of the reports are rendered and there is no advice
+    json_results = output_format == enumerations.ResultFormat.json
+    # create the matcher of the labels of the lines of the test output
+    # that the trace contains, which also counts the lines of each label
+    # for the results document; note that the labels on the command-line
+    # replace the ones in the [tool.execexam] table of pyproject.toml
+    trace_label_matcher = extract.LabelMatcher(
+        config.get_trace_labels(
+            trace_labels, config.load_configuration(project), pytest_labels
+        ),
+        count=json_results,
+    )
     # if execexam was configured to produce the report for advice
     # or if it was configured to produce all of the possible reports,
     # then start the litellm thread that provides the advice
     display_report_type = enumerations.ReportType.testadvice
-    if report is not None and (
-        display_report_type in report or enumerations.ReportType.all in report
+    if (
+        not json_results
+        and report is not None
+        and (
+            display_report_type in report
+            or enumerations.ReportType.all in report
+        )
     ):
         litellm_thread.start()
         debugger.debug(debug, debugger.Debug.started_litellm_thread.value)
     # add the project directory to the system path
     sys.path.append(str(project))
-    # create the plugin that will collect all data
-    # about the test runs and report it as a JSON object;
-    # note that this approach avoids the need to write
-    # a custom pytest plugin for the executable examination
-    json_report_plugin = JSONReport()
+    # create the plugin that will collect the outcomes of the
+    # tests and the details about where the failing tests crashed
+    result_collector = exec_exam_pytest_plugin.ResultCollector()
+    # select the plugins that pytest should use so that the hooks
+    # that collect data for a report only run when that report was
+    # requested; note that the execexam plugin is always needed since
+    # it controls the order in which the tests are run
+    plugins = [
+        exec_exam_pytest_plugin,
+        *exec_exam_pytest_plugin.select_plugins(
+            report, result_collector, project, affected, json_results
+        ),
+        exec_exam_pytest_plugin.PhaseRecorder(timer),
+    ]
+    # when only the affected tests should run, compare the sources with
+    # the snapshot of the last run and deselect the tests that passed
+    # and did not cover any of the changed lines; note that every test
+    # runs when there is no snapshot or when a change can affect any test
+    affected_selector = None
+    if affected:
+        with timer.phase("select affected tests"):
+            sources = impact.read_sources(project, tests)
+            snapshot = impact.load_snapshot(project)
+            source_changes = None
+            unaffected_tests = set()
+            if snapshot is not None:
+                source_changes = impact.find_source_changes(
+                    snapshot["sources"], sources
+                )
+                if source_changes is not None:
+                    unaffected_tests = impact.find_unaffected_tests(
+                        snapshot, source_changes
+                    )
+        affected_selector = exec_exam_pytest_plugin.AffectedSelector(
+            unaffected_tests
+        )
+        plugins.append(affected_selector)
+    # stream the events of the test run to the file when one was
+    # specified so that the test run can be followed while it runs
+    if events_file is not None:
+        plugins.append(exec_exam_pytest_plugin.EventSink(events_file))
     # display basic diagnostic information about command-line's arguments;
-    # extract the local parameters and then make a displayable string of them
-    args = locals()
-    colon_separated_diagnostics = display.make_colon_separated_string(args)
+    # make a displayable string of the parameters captured at the start
+    colon_separated_diagnostics = display.make_colon_separated_string(
+        parameters
+    )
     # --> SETUP
     syntax = False
     newline = True
-    display.display_content(
-        console,
-        enumerations.ReportType.setup,
-        report,
-        colon_separated_diagnostics,
-        "Parameter Information",
-        fancy,
-        syntax,
-        syntax_theme,
-        "python",
-        newline,
-    )
+    if not json_results:
+        display.display_content(
+            console,
+            enumerations.ReportType.setup,
+            report,
+            colon_separated_diagnostics,
+            "Parameter Information",
+            fancy,
+            syntax,
+            syntax_theme,
+            "python",
+            newline,
+        )
     # run pytest for either:
     # - a single test file that was specified in tests
     # - a directory of test files that was specified in tests
     # note that this relies on pytest correctly discovering
     # all of the test files and running their test cases
-    # redirect stdout and stderr to /dev/null
-    captured_output = io.StringIO()
+    # redirect stdout and stderr to a buffer that bounds the size
+    # of the captured output and that spills it to a temporary file
+    captured_output = capture.CaptureBuffer()
     sys.stdout = captured_output
     sys.stderr = captured_output
     debugger.debug(debug, debugger.Debug.started_capturing_output.value)
     # run pytest in a fashion that will not
     # produce any output to the console
     found_marks_str = mark
-    # there were test marks on the command-line and
-    # thus they should be run for the specified tests
-    # (note that marks can control which tests are run)
+    pytest_arguments = util.make_pytest_arguments(
+        tests, maxfail, found_marks_str, test_timeout, cpu_limit, memory_limit
+    )
     pytest_exit_code = 0
+    start_time = time.perf_counter()
+    # when the cache is enabled, look for the results of an earlier run
+    # of the same project and tests with the same options; note that the
+    # key does not include the number of workers since the merged results
+    # of the workers are the same as those of a single process; note
+    # that the cache is not used when only the affected tests run since
+    # their results are not the results of all of the tests or when the
+    # events of the tests are streamed since replaying the results does
+    # not run the tests and thus would not produce any of their events
+    cache_key = None
+    cache_entry = None
+    try:
+        if use_cache and not affected and events_file is None:
+            with timer.phase("check cache"):
+                cache_key = cache.compute_cache_key(
+                    project, tests, pytest_arguments, report, json_results
+                )
+                cache_entry = cache.load(project, cache_key)
+        # the results of an identical run are in the cache and thus they
+        # are replayed instead of running the tests again
+        if cache_entry is not None:
+            pytest_exit_code = cache_entry["exit_code"]
+            captured_output.write(cache_entry["output"])
+            exec_exam_pytest_plugin.reports.update(cache_entry["reports"])
+            exec_exam_pytest_plugin.coverage_maps.update(
+                cache_entry["coverage"]
+            )
+            result_collector.report = cache_entry["results"]
+            debugger.debug(debug, debugger.Debug.reused_cached_results.value)
+        # there are multiple workers and thus the tests are split
+        # across worker processes whose outputs and reports are merged
+        elif workers > 1:
+            with timer.phase("run workers"):
+                pytest_exit_code, worker_output = parallel.run_workers(
+                    workers,
+                    pytest_arguments,
+                    project,
+                    report,
+                    result_collector,
+                    events_file,
+                    affected_selector,
+                    json_results,
+                )
+            captured_output.write(worker_output)
+        # there is a single worker and thus the tests run in this process
+        else:
+            with timer.phase("run pytest"):
+                pytest_exit_code = pytest.main(
+                    pytest_arguments, plugins=plugins
+                )
+    finally:
+        # restore stdout and stderr, even when running the tests crashed,
+        # so that the execexam program continues to produce output,
+        # including the details about the crash, in the console
+        sys.stdout = sys.__stdout__
+        sys.stderr = sys.__stderr__
+        debugger.debug(debug, debugger.Debug.stopped_capturing_output.value)
+    duration = time.perf_counter() - start_time
+    # store the results of the run so that an identical run can reuse them
+    if cache_key is not None and cache_entry is None:
+        with timer.phase("store cache"):
+            cache.store(
+                project,
+                cache_key,
+                pytest_exit_code,
+                captured_output.getvalue(),
+                exec_exam_pytest_plugin.reports,
+                result_collector.report,
+                exec_exam_pytest_plugin.coverage_maps,
+            )
+    # every one of the tests passed before and was not affected by the
+    # changes and thus the tests still pass even though none of them ran
+    if (
+        affected_selector is not None
+        and unaffected_tests
+        and pytest_exit_code == pytest.ExitCode.NO_TESTS_COLLECTED
+        and result_collector.report is not None
+        and result_collector.report["summary"].get("deselected", 0) > 0
+    ):
+        pytest_exit_code = pytest.ExitCode.OK
+    # save the snapshot of the sources and of the lines that each
+    # test covered so that the next run can select the affected tests
+    if affected_selector is not None:
+        with timer.phase("save snapshot"):
+            impact.save_snapshot(
+                project,
+                impact.update_snapshot(
+                    snapshot,
+                    source_changes,
+                    sources,
+                    unaffected_tests,
+                    exec_exam_pytest_plugin.coverage_maps,
+                    result_collector.report,
+                ),
+            )
     if found_marks_str:
-        pytest_exit_code = pytest.main(
-            [
-                "-q",
-                "-ra",
-                "-s",
-                "-p",
-                "no:logging",
-                "-p",
-                "no:warnings",
-                "--tb=no",
-                "--json-report-file=none",
-                f"--maxfail={maxfail}",
-                "-m",
-                found_marks_str,
-                os.path.join(tests),
-            ],
-            plugins=[json_report_plugin, exec_exam_pytest_plugin],
-        )
         debugger.debug(debug, debugger.Debug.pytest_passed_with_marks.value)
-    # there were no test marks specified on the command-line
-    # and thus all of the tests should be run based on the specified
-    # test file or test directory, which this provides to pytest
     else:
-        pytest_exit_code = pytest.main(
-            [
-                "-q",
-                "-ra",
-                "-s",
-                "-p",
-                "no:logging",
-                "-p",
-                "no:warnings",
-                "--tb=no",
-                f"--maxfail={maxfail}",
-                "--json-report-file=none",
-                os.path.join(tests),
-            ],
-            plugins=[json_report_plugin, exec_exam_pytest_plugin],
-        )
         debugger.debug(debug, debugger.Debug.pytest_passed_without_marks.value)
-    # restore stdout and stderr; this will allow
-    # the execexam program to continue to produce
-    # output in the console
-    sys.stdout = sys.__stdout__
-    sys.stderr = sys.__stderr__
-    debugger.debug(debug, debugger.Debug.stopped_capturing_output.value)
     # determine the return code for the execexam command
     # based on the exit code that was produced by pytest
     return_code = util.determine_execexam_return_code(pytest_exit_code)
-    # extract the data that was created by the internal
-    # execexam pytest plugin for further diagnostic display
-    execexam_report = exec_exam_pytest_plugin.reports
-    # extract the details about the test assertions
-    # that come from the pytest plugin that execexam uses
-    exec_exam_test_assertion_details = extract.extract_test_assertions_details(
-        execexam_report
-    )
-    # --> display details about the test runs
-    _ = extract.extract_test_run_details(json_report_plugin.report)  # type: ignore
-    # filter the test output and decide if an
-    # extra newline is or is not needed
-    filtered_test_output = extract.extract_test_output_multiple_labels(
-        pytest_labels,
-        captured_output.getvalue(),
+    # write the results of the requested reports as a JSON document
+    # and then exit without displaying any of the reports
+    if json_results:
+        with timer.phase("produce results"):
+            # filter the output before making the document so that the
+            # matcher counted the lines of each one of the labels; note
+            # that only the trace contains the output and thus the output
+            # is not read at all when the trace was not requested
+            filtered_test_output = ""
+            if util.is_report_requested(
+                report, enumerations.ReportType.testtrace
+            ):
+                filtered_test_output = (
+                    extract.extract_test_output_multiple_labels(
+                        trace_label_matcher, captured_output.iter_lines()
+                    )
+                )
+            document = results.make_results_document(
+                project,
+                tests,
+                report,
+                return_code,
+                pytest_exit_code,
+                duration,
+                result_collector.report,
+                exec_exam_pytest_plugin.reports,
+                exec_exam_pytest_plugin.coverage_maps,
+                filtered_test_output,
+                # note that the phase that produces the results is
+                # not in the results since it has not yet finished
+                timer.to_list(),
+                dict(trace_label_matcher.counts),
+            )
+        results.write_results_document(
+            document,
+            output_file,
+            console.file,  # type: ignore
+        )
+        captured_output.close()
+        write_debug_trace(debug_trace)
+        sys.exit(return_code)
+    # create the producer of the content of the reports, which only
+    # extracts the details that a report needs when it is displayed
+    # and thus does not do any work for the reports that were not requested
+    producer = producers.ReportProducer(
+        captured_output,
+        result_collector.report,
+        exec_exam_pytest_plugin.reports,
+        exec_exam_pytest_plugin.coverage_maps,
+        slowest,
+        trace_label_matcher,
+        project,
+        context_lines,
     )
-    # add an extra newline to the filtered output
-    # since there is a failing test case to display
-    if filtered_test_output != "":
-        filtered_test_output = "\n" + filtered_test_output
     # indicate that the material that will be displayed
     # is not source code and thus does not need syntax highlighting
     # --> TRACE
     syntax = False
     newline = True
-    display.display_content(
-        console,
-        enumerations.ReportType.testtrace,
-        report,
-        filtered_test_output + exec_exam_test_assertion_details,
-        "Test Trace",
-        fancy,
-        syntax,
-        syntax_theme,
-        "python",
-        newline,
-    )
+    if util.is_report_requested(report, enumerations.ReportType.testtrace):
+        with timer.phase("report trace"):
+            display.display_content(
+                console,
+                enumerations.ReportType.testtrace,
+                report,
+                producer.trace,
+                "Test Trace",
+                fancy,
+                syntax,
+                syntax_theme,
+                "python",
+                newline,
+            )
+    # display the slowest tests and the time spent in each test
+    # phase when the durations were collected for the timing report
+    # --> TIMING
+    if (
+        util.is_report_requested(report, enumerations.ReportType.timing)
+        and producer.timing is not None
+    ):
+        syntax = False
+        newline = True
+        with timer.phase("report timing"):
+            display.display_content(
+                console,
+                enumerations.ReportType.timing,
+                report,
+                producer.timing,
+                "Test Timing",
+                fancy,
+                syntax,
+                syntax_theme,
+                "python",
+                newline,
+            )
+    # --> COVERAGE
+    syntax = False
+    newline = True
+    if util.is_report_requested(report, enumerations.ReportType.coverage):
+        with timer.phase("report coverage"):
+            display.display_content(
+                console,
+                enumerations.ReportType.coverage,
+                report,
+                producer.coverage,
+                "Test Coverage",
+                fancy,
+                syntax,
+                syntax_theme,
+                "python",
+                newline,
+            )
     # display details about the failing tests,
     # if they exist. Note that there can be:
     # - zero failing tests
@@ -254,61 +545,64 @@ def run(  # noqa: PLR0913, PLR0915
     # collected by the execexam pytest plugin and
     # there is no need for the developer of the
     # examination to collect and report this data
-    (
-        failing_test_details,
-        failing_test_path_dicts,
-    ) = extract.extract_failing_test_details(json_report_plugin.report)  # type: ignore
-    failing_test_code_overall = ""
-    # there was at least one failing test case
-    if not extract.is_failing_test_details_empty(failing_test_details):
-        # display additional helpful information about the failing
-        # test cases; this is the error message that would appear
-        # when standardly running the test suite with pytest
-        # --> FAILURE
+    # display additional helpful information about the failing
+    # test cases; this is the error message that would appear
+    # when standardly running the test suite with pytest
+    # --> FAILURE
+    if (
+        util.is_report_requested(report, enumerations.ReportType.testfailures)
+        and producer.has_failing_tests
+    ):
         syntax = False
         newline = True
-        display.display_content(
-            console,
-            enumerations.ReportType.testfailures,
-            report,
-            failing_test_details,
-            "Test Failure(s)",
-            fancy,
-            syntax,
-            syntax_theme,
-            "Python",
-            newline,
-        )
-        # display the source code for the failing test cases
-        for failing_test_path_dict in failing_test_path_dicts:
-            test_name = failing_test_path_dict["test_name"]
-            failing_test_path = failing_test_path_dict["test_path"]
-            # build the command for running symbex; this tool can
-            # perform static analysis of Python source code and
-            # extract the code of a function inside of a file
-            command = f"symbex {test_name} -f {failing_test_path}"
-            # run the symbex command and collect its output
-            process = subprocess.run(
-                command,
-                shell=True,
-                check=True,
-                text=True,
-                capture_output=True,
+        with timer.phase("report failures"):
+            display.display_content(
+                console,
+                enumerations.ReportType.testfailures,
+                report,
+                producer.failing_details,
+                "Test Failure(s)",
+                fancy,
+                syntax,
+                syntax_theme,
+                "Python",
+                newline,
             )
-            # delete an extra blank line from the end of the file
-            # if there are two blank lines in a row
-            sanitized_output = process.stdout.rstrip() + "\n"
-            failing_test_code_overall += sanitized_output
-            # display the source code of the failing test
-            # --> CODE
-            syntax = True
-            newline = True
+    # display the source code of each one of the failing tests
+    # --> CODE
+    if util.is_report_requested(report, enumerations.ReportType.testcodes):
+        with timer.phase("report failing test code"):
+            for failing_test_code in producer.failing_test_codes:
+                syntax = True
+                newline = True
+                display.display_content(
+                    console,
+                    enumerations.ReportType.testcodes,
+                    report,
+                    failing_test_code,
+                    "Failing Test",
+                    fancy,
+                    syntax,
+                    syntax_theme,
+                    "Python",
+                    newline,
+                )
+    # display the lines around the crash site of each failing test,
+    # both in the test and in the project's function that failed
+    # --> CONTEXT
+    if (
+        util.is_report_requested(report, enumerations.ReportType.context)
+        and producer.has_failing_tests
+    ):
+        syntax = False
+        newline = True
+        with timer.phase("report context"):
             display.display_content(
                 console,
-                enumerations.ReportType.testcodes,
+                enumerations.ReportType.context,
                 report,
-                sanitized_output,
-                "Failing Test",
+                producer.context,
+                "Crash Context",
                 fancy,
                 syntax,
                 syntax_theme,
@@ -328,7 +622,10 @@ def run(  # noqa: PLR0913, PLR0915
         # (if there were test failures) or the program can stop running
         # (if there were no test failures and thus advice is not needed)
         console.print()
-        with console.status("[bold green] Loading ExecExam's Coding Mentor"):
+        with (
+            timer.phase("wait for litellm"),
+            console.status("[bold green] Loading ExecExam's Coding Mentor"),
+        ):
             while litellm_thread.is_alive():
                 time.sleep(0.1)
         # return control to the main thread now that the
@@ -341,19 +638,21 @@ def run(  # noqa: PLR0913, PLR0915
         # is at least one mistake in the examination for
         # which advice should be sought from the LLM
         if return_code != 0:
-            advise.fix_failures(
-                console,
-                filtered_test_output,
-                exec_exam_test_assertion_details,
-                filtered_test_output + exec_exam_test_assertion_details,
-                failing_test_details,
-                failing_test_code_overall,
-                advice_method,
-                advice_model,
-                advice_server,
-                syntax_theme,
-                fancy,
-            )
+            with timer.phase("request advice"):
+                advise.fix_failures(
+                    console,
+                    producer.filtered_output,
+                    producer.assertion_details,
+                    producer.trace,
+                    producer.failing_details,
+                    producer.failing_test_code,
+                    producer.called_function_code,
+                    advice_method,
+                    advice_model,
+                    advice_server,
+                    syntax_theme,
+                    fancy,
+                )
             debugger.debug(debug, debugger.Debug.get_advice_with_llm.value)
         # there were no test failures and thus there is no need
         # to seek advice from the LLM-based mentoring system;
@@ -375,6 +674,25 @@ def run(  # noqa: PLR0913, PLR0915
                 "Python",
                 newline,
             )
+    # display the wall-clock time of each phase of this run, which
+    # shows where the time that execexam took, beyond the time for
+    # running the tests, was spent (e.g., collecting the tests)
+    # --> TIMING
+    if util.is_report_requested(report, enumerations.ReportType.timing):
+        syntax = False
+        newline = True
+        display.display_content(
+            console,
+            enumerations.ReportType.timing,
+            report,
+            extract.extract_phase_timing_details(timer.to_list()),
+            "Run Phases",
+            fancy,
+            syntax,
+            syntax_theme,
+            "python",
+            newline,
+        )
     # display the debugging messages
     debugging_messages_exist = debugger.has_debugging_messages()
     if debugging_messages_exist:
@@ -411,6 +729,112 @@ def run(  # noqa: PLR0913, PLR0915
         "Python",
         newline,
     )
+    # remove the captured output of the tests now that every
+    # report that needed it was produced
+    captured_output.close()
+    write_debug_trace(debug_trace)
     # return the code for the overall success of the program
     # to communicate to the operating system the examination's status
     sys.exit(return_code)
+
+
+@cli.command()
+def serve(
+    socket_path: Path = typer.Option(
+        None,
+        "--socket",
+        help="Socket of the execexam daemon (default: in a directory private to the user)",
+    ),
+    litellm: bool = typer.Option(
+        False, help="Load LiteLLM before the first request for advice"
+    ),
+) -> None:
+    """Start a daemon that runs exams for execexam run --via-daemon."""
+    if socket_path is None:
+        socket_path = daemon.get_default_socket()
+    console.print(f"Serving execexam run requests on {socket_path}")
+    daemon.serve(socket_path, litellm)
+
+
+@cli.command(name="batch")
+def grade_batch(  # noqa: PLR0913
+    projects: str = typer.Argument(
+        ...,
+        help="Glob of the project directories or a manifest file listing them",
+    ),
+    tests: Path = typer.Argument(
+        ...,
+        help="Test file or test directory, inside of each project unless absolute",
+    ),
+    output_file: Path = typer.Option(
+        None, help="File for the outcomes instead of the standard output"
+    ),
+    output_format: enumerations.OutputFormat = typer.Option(
+        enumerations.OutputFormat.json, help="Format of the outcomes"
+    ),
+    workers: int = typer.Option(
+        os.cpu_count() or 1, help="Number of projects graded at the same time"
+    ),
+    mark: str = typer.Option(None, help="Run tests with specified mark(s)"),
+    maxfail: int = typer.Option(
+        10, help="Maximum test failures before stopping"
+    ),
+    student_output: bool = typer.Option(
+        False, help="Display the outcome and test output of each project"
+    ),
+    fork_server: bool = typer.Option(
+        sys.platform == "linux",
+        help="Fork each project's process instead of starting a new one",
+    ),
+    test_timeout: float = typer.Option(
+        None, help="Fail a test when it runs for longer than the seconds"
+    ),
+    cpu_limit: int = typer.Option(
+        None, help="Fail a test when it uses more than the seconds of CPU time"
+    ),
+    memory_limit: int = typer.Option(
+        None, help="Fail a test when it allocates more than the megabytes"
+    ),
+) -> None:
+    """Grade the executable exams of many projects and produce their outcomes."""
+    from . import batch  # noqa: PLC0415
+
+    project_directories = batch.find_projects(projects)
+    if not project_directories:
+        console.print(f"[red]No project directories were found for {projects}")
+        raise typer.Exit(code=4)
+
+    outcomes = batch.grade_projects(
+        project_directories,
+        tests,
+        maxfail,
+        mark,
+        max(workers, 1),
+        student_output,
+        fork_server,
+        test_timeout,
+        cpu_limit,
+        memory_limit,
+    )
+    # display the outcome and the test output of each project only
+    # when it was requested since the output of hundreds of projects
+    # slows down the grading and hides the outcomes of the projects
+    if student_output:
+        for outcome in outcomes:
+            console.print(
+                f"{outcome['status']}: {outcome['project']}",
+                markup=False,
+                highlight=False,
+            )
+            console.out(outcome.get("output", ""), highlight=False)
+    formatted_outcomes = batch.format_outcomes(outcomes, output_format)
+    # write the outcomes of all of the projects to the file or,
+    # when there is no file, to the standard output without any styling
+    if output_file is not None:
+        output_file.write_text(formatted_outcomes, encoding="utf-8")
+    else:
+        typer.echo(formatted_outcomes, nl=False)
+    # indicate an error when one of the projects could not be graded;
+    # note that projects with failing tests were still graded correctly
+    if any(outcome["status"] == "error" for outcome in outcomes):
+        raise typer.Exit(code=3)
@@ -0,0 +1,315 @@
+"""Run the tests of an executable examination in parallel worker processes."""
+
+import multiprocessing
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pytest
+
+from . import capture, enumerations
+from . import pytest_plugin as exec_exam_pytest_plugin
+
+
+def run_worker(  # noqa: PLR0913
+    worker_index: int,
+    workers: int,
+    pytest_arguments: List[str],
+    project: Path,
+    report_types: Optional[List[enumerations.ReportType]],
+    events_file: Optional[Path],
+    affected_selector: Optional[
+        exec_exam_pytest_plugin.AffectedSelector
+    ] = None,
+    summary: bool = False,
+) -> Dict[str, Any]:
+    """Run the tests that belong to one worker and return its results."""
+    # add the project directory to the system path of this worker
+    sys.path.append(str(project))
+    # create the plugins in the same fashion as a single process
+    # would and add the plugin that only keeps the worker's tests
+    result_collector = exec_exam_pytest_plugin.ResultCollector()
+    worker_partition = exec_exam_pytest_plugin.WorkerPartition(
+        worker_index, workers
+    )
+    plugins = [
+        exec_exam_pytest_plugin,
+        *exec_exam_pytest_plugin.select_plugins(
+            report_types,
+            result_collector,
+            project,
+            affected_selector is not None,
+            summary,
+        ),
+        worker_partition,
+    ]
+    if affected_selector is not None:
+        plugins.append(affected_selector)
+    if events_file is not None:
+        plugins.append(
+            exec_exam_pytest_plugin.EventSink(events_file, append=True)
+        )
+    # capture the output of the worker's tests so that
+    # it can be returned to and displayed by the parent
+    captured_output = capture.CaptureBuffer()
+    sys.stdout = captured_output
+    sys.stderr = captured_output
+    exit_code = pytest.main(pytest_arguments, plugins=plugins)
+    sys.stdout = sys.__stdout__
+    sys.stderr = sys.__stderr__
+    output = captured_output.getvalue()
+    captured_output.close()
+    return {
+        "exit_code": int(exit_code),
+        "output": output,
+        "reports": exec_exam_pytest_plugin.reports,
+        "results": result_collector.report,
+        "coverage": exec_exam_pytest_plugin.coverage_maps,
+        "order": worker_partition.order,
+    }
+
+
+def merge_exit_codes(exit_codes: List[int]) -> int:
+    """Merge the exit codes of all the workers into a single exit code."""
+    # a worker that did not run any tests does not change the exit code
+    # unless no worker ran any tests; otherwise, the most severe one of
+    # the exit codes (e.g., a failing test or an internal error) is used
+    run_exit_codes = [
+        exit_code
+        for exit_code in exit_codes
+        if exit_code != pytest.ExitCode.NO_TESTS_COLLECTED
+    ]
+    if not run_exit_codes:
+        return int(pytest.ExitCode.NO_TESTS_COLLECTED)
+    return max(run_exit_codes)
+
+
+def merge_result_reports(
+    result_reports: List[Dict[str, Any]], order: Dict[str, int]
+) -> Dict[str, Any]:
+    """Merge the result reports of all the workers in the original test order."""
+    # note that every worker collects all of the test files and thus
+    # every worker records the same error for a file that it cannot collect
+    tests = list(
+        {
+            test.nodeid: test
+            for report in result_reports
+            for test in report["tests"]
+        }.values()
+    )
+    tests.sort(key=lambda test: order.get(test.nodeid, len(order)))
+    summary: Counter[str] = Counter(test.outcome for test in tests)
+    summary["total"] = sum(summary.values())
+    # every worker deselects the same tests by their marks and then
+    # only counts the collected tests that are in its own partition
+    deselected = result_reports[0]["summary"].get("deselected", 0)
+    summary["collected"] = deselected + sum(
+        report["summary"]["collected"] - deselected
+        for report in result_reports
+    )
+    if deselected:
+        summary["deselected"] = deselected
+    return {
+        "root": result_reports[0]["root"],
+        "summary": summary,
+        "tests": tests,
+    }
+
+
+def run_worker_pool(
+    worker_indices: List[int], workers: int, worker_arguments: Tuple[Any, ...]
+) -> Dict[int, Union[Dict[str, Any], Exception]]:
+    """Run the workers with the indices in a pool of processes and return their results or errors."""
+    worker_outcomes: Dict[int, Union[Dict[str, Any], Exception]] = {}
+    # note that the worker processes are spawned instead of forked so
+    # that each one of them imports the project and the tests anew
+    with ProcessPoolExecutor(
+        max_workers=len(worker_indices),
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        futures = {
+            executor.submit(
+                run_worker, worker_index, workers, *worker_arguments
+            ): worker_index
+            for worker_index in worker_indices
+        }
+        for future in as_completed(futures):
+            try:
+                worker_outcomes[futures[future]] = future.result()
+            # a worker process crashed (e.g., a test exited the process),
+            # which stops every worker of the pool that did not yet finish
+            except Exception as error:
+                worker_outcomes[futures[future]] = error
+    return worker_outcomes
+
+
+def make_lost_worker_result(
+    worker_index: int,
+    workers: int,
+    error: Exception,
+    worker_results: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Make the results of a worker that crashed, where each of its tests is an error."""
+    # every worker that finished collected all of the tests and thus
+    # the tests of the worker that crashed are the ones that the same
+    # assignment of the dependency groups gives to the crashed worker
+    order: Dict[str, int] = {}
+    for worker_result in worker_results:
+        order.update(worker_result["order"])
+    assignment = exec_exam_pytest_plugin.assign_dependency_groups(
+        sorted(order, key=order.__getitem__), workers
+    )
+    message = f"The worker process that ran the test crashed: {error!r}"
+    tests = [
+        exec_exam_pytest_plugin.ResultRecord(nodeid, "error", message=message)
+        for nodeid in order
+        if assignment[nodeid.split("::")[0]] == worker_index
+    ]
+    # note that the results of a worker that finished provide the
+    # root and the deselected tests, which are the same for every worker
+    results = next(
+        (
+            worker_result["results"]
+            for worker_result in worker_results
+            if worker_result["results"] is not None
+        ),
+        None,
+    )
+    summary: Counter[str] = Counter(test.outcome for test in tests)
+    summary["total"] = len(tests)
+    deselected = results["summary"].get("deselected", 0) if results else 0
+    summary["collected"] = len(tests) + deselected
+    if deselected:
+        summary["deselected"] = deselected
+    return {
+        "exit_code": int(pytest.ExitCode.TESTS_FAILED),
+        "output": "".join(
+            f"ERROR {test.nodeid} - {message}\n" for test in tests
+        ),
+        "reports": {},
+        "results": {
+            "root": results["root"],
+            "summary": summary,
+            "tests": tests,
+        }
+        if results is not None
+        else None,
+        "coverage": {},
+        "order": {},
+    }
+
+
+def run_workers(  # noqa: PLR0913
+    workers: int,
+    pytest_arguments: List[str],
+    project: Path,
+    report_types: Optional[List[enumerations.ReportType]],
+    result_collector: exec_exam_pytest_plugin.ResultCollector,
+    events_file: Optional[Path],
+    affected_selector: Optional[
+        exec_exam_pytest_plugin.AffectedSelector
+    ] = None,
+    summary: bool = False,
+) -> Tuple[int, str]:
+    """Run the tests in worker processes and merge the results of the workers."""
+    # create an empty file for the events that all of the
+    # worker processes will then append their events to
+    if events_file is not None:
+        events_file.write_text("")
+    worker_arguments = (
+        pytest_arguments,
+        project,
+        report_types,
+        events_file,
+        affected_selector,
+        summary,
+    )
+    worker_outcomes = run_worker_pool(
+        list(range(workers)), workers, worker_arguments
+    )
+    # a worker that crashed also stopped the workers that did not yet
+    # finish and thus each one of them runs again on its own so that
+    # only the worker that crashes its process loses its results; note
+    # that the events of a worker that runs again are in the file twice
+    for worker_index, worker_outcome in list(worker_outcomes.items()):
+        if isinstance(worker_outcome, BrokenProcessPool):
+            worker_outcomes.update(
+                run_worker_pool([worker_index], workers, worker_arguments)
+            )
+    worker_results = [
+        worker_outcome
+        for _, worker_outcome in sorted(worker_outcomes.items())
+        if isinstance(worker_outcome, dict)
+    ]
+    # the tests of a worker that crashed again are errors, unless no
+    # worker finished and thus none of the tests are known to this process
+    lost_workers = [
+        (worker_index, worker_outcome)
+        for worker_index, worker_outcome in sorted(worker_outcomes.items())
+        if isinstance(worker_outcome, Exception)
+    ]
+    if lost_workers and not worker_results:
+        return (
+            int(pytest.ExitCode.INTERNAL_ERROR),
+            "".join(
+                f"INTERNALERROR execexam worker {worker_index}"
+                f" crashed: {error!r}\n"
+                for worker_index, error in lost_workers
+            ),
+        )
+    worker_results.extend(
+        [
+            make_lost_worker_result(
+                worker_index, workers, error, worker_results
+            )
+            for worker_index, error in lost_workers
+        ]
+    )
+    # combine the order of the tests from all of the workers; note that
+    # every worker collected all of the tests and thus the order is the same
+    order: Dict[str, int] = {}
+    for worker_result in worker_results:
+        order.update(worker_result["order"])
+    # merge the reports of the execexam plugin in the original order
+    # of the tests so that the trace looks like it came from one process
+    reports = [
+        report
+        for worker_result in worker_results
+        for report in worker_result["reports"].values()
+    ]
+    reports.sort(key=lambda report: order.get(report["nodeid"], len(order)))
+    exec_exam_pytest_plugin.reports.clear()
+    for report in reports:
+        exec_exam_pytest_plugin.reports[report["nodeid"]] = report
+    # merge the lines that the tests covered in the same order
+    coverage_maps = sorted(
+        (
+            coverage_map
+            for worker_result in worker_results
+            for coverage_map in worker_result["coverage"].items()
+        ),
+        key=lambda coverage_map: order.get(coverage_map[0], len(order)),
+    )
+    exec_exam_pytest_plugin.coverage_maps.clear()
+    exec_exam_pytest_plugin.coverage_maps.update(coverage_maps)
+    # merge the results of the tests when they were collected
+    result_reports = [
+        worker_result["results"]
+        for worker_result in worker_results
+        if worker_result["results"] is not None
+    ]
+    if result_reports:
+        result_collector.report = merge_result_reports(result_reports, order)
+    exit_code = merge_exit_codes(
+        [worker_result["exit_code"] for worker_result in worker_results]
+    )
+    # note that the workers run at the same time and thus each one of them
+    # stops after its own maximum number of failures and that the output
+    # contains the summary that pytest printed for each one of the workers
+    output = "".join(
+        worker_result["output"] for worker_result in worker_results
+    )
+    return (exit_code, output)
@@ -0,0 +1,50 @@
+"""Record the wall-clock time of each phase of a run of an examination."""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+from . import debug
+
+
+@dataclass(slots=True)
+class PhaseSpan:
+    """A phase of the run with its start, relative to the start of the run, and its duration."""
+
+    name: str
+    start: float
+    duration: float
+
+
+class PhaseTimer:
+    """Time the phases of a run of an examination."""
+
+    def __init__(self) -> None:
+        """Create a timer whose run starts now."""
+        self.start = time.perf_counter()
+        self.spans: List[PhaseSpan] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time the phase that runs inside of the context."""
+        # note that a phase is also an event of the debugging trace
+        start = time.perf_counter()
+        try:
+            with debug.span(name):
+                yield
+        finally:
+            # note that a phase that fails is still recorded
+            # since its time is part of the time of the run
+            self.spans.append(
+                PhaseSpan(
+                    name, start - self.start, time.perf_counter() - start
+                )
+            )
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """Convert the spans, in the order in which they started, to dictionaries."""
+        return [
+            {"name": span.name, "start": span.start, "duration": span.duration}
+            for span in sorted(self.spans, key=lambda span: span.start)
+        ]
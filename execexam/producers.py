@@ -0,0 +1,164 @@
+"""Produce the content of the reports only when a report needs it."""
+
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from . import callgraph, extract, source
+from .capture import CaptureBuffer
+
+
+class ReportProducer:
+    """Produce the content of each report from the results of a test run."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        captured_output: CaptureBuffer,
+        results: Optional[Dict[str, Any]],
+        reports: Dict[str, Dict[str, Any]],
+        coverage_maps: Dict[str, Dict[str, int]],
+        slowest: int,
+        pytest_labels: Union[List[str], extract.LabelMatcher],
+        project: Optional[Path] = None,
+        context_lines: int = 3,
+    ) -> None:
+        """Create a producer that has not yet produced the content of any report."""
+        self.captured_output = captured_output
+        self.results = results
+        self.reports = reports
+        self.coverage_maps = coverage_maps
+        self.slowest = slowest
+        self.pytest_labels = pytest_labels
+        self.project = project
+        self.context_lines = context_lines
+
+    @cached_property
+    def assertion_details(self) -> str:
+        """Produce the details about the assertions of each test."""
+        # note that the reports are keyed by nodeid and that the
+        # values appear in the order in which the tests were run
+        return extract.extract_test_assertions_details(self.reports.values())
+
+    @cached_property
+    def filtered_output(self) -> str:
+        """Produce the lines of the test output that describe the issues."""
+        filtered_output = extract.extract_test_output_multiple_labels(
+            self.pytest_labels, self.captured_output.iter_lines()
+        )
+        # add an extra newline to the filtered output
+        # since there is a failing test case to display
+        if filtered_output != "":
+            filtered_output = "\n" + filtered_output
+        return filtered_output
+
+    @cached_property
+    def trace(self) -> str:
+        """Produce the content of the test trace."""
+        return self.filtered_output + self.assertion_details
+
+    @cached_property
+    def timing(self) -> Optional[str]:
+        """Produce the slowest tests and the time of each phase, if collected."""
+        if self.results is None:
+            return None
+        return extract.extract_test_timing_details(self.results, self.slowest)
+
+    @cached_property
+    def coverage(self) -> str:
+        """Produce the lines that each test covered."""
+        return extract.extract_test_coverage_details(self.coverage_maps)
+
+    @cached_property
+    def context(self) -> str:
+        """Produce the lines around the crash site of each failing test."""
+        if self.results is None:
+            return ""
+        return extract.extract_crash_context_details(
+            self.results, self.project, self.context_lines
+        )
+
+    @cached_property
+    def failing_tests(self) -> Tuple[str, List[Dict[str, Path]]]:
+        """Produce the details and the paths of the failing tests."""
+        # note that there are no details about the failing tests when
+        # the results were not collected for the requested reports
+        if self.results is None:
+            return ("\n", [])
+        return extract.extract_failing_test_details(self.results)
+
+    @cached_property
+    def failing_details(self) -> str:
+        """Produce the details about the failing tests."""
+        return self.failing_tests[0]
+
+    @cached_property
+    def has_failing_tests(self) -> bool:
+        """Determine whether or not there is at least one failing test."""
+        return not extract.is_failing_test_details_empty(self.failing_details)
+
+    @cached_property
+    def call_graph(self) -> Optional[callgraph.CallGraph]:
+        """Produce the index of the modules of the project, if there is a project."""
+        if self.project is None:
+            return None
+        return callgraph.CallGraph(self.project)
+
+    @cached_property
+    def failing_test_sources(self) -> List[Tuple[str, List[str]]]:
+        """Produce the source code of each failing test and of the project functions that it calls."""
+        failing_test_sources: List[Tuple[str, List[str]]] = []
+        if not self.has_failing_tests:
+            return failing_test_sources
+        for failing_test_path_dict in self.failing_tests[1]:
+            test_name = str(failing_test_path_dict["test_name"])
+            failing_test_path = failing_test_path_dict["test_path"]
+            # extract the source code of the test function from its file,
+            # which is parsed once for all of the failing tests in it
+            failing_test_code = source.extract_function_source(
+                failing_test_path, test_name
+            )
+            # extract the source code of the functions of the project that
+            # the test calls, which likely contain the mistake that made the
+            # test fail; note that each file is only parsed once
+            called_function_codes: List[str] = []
+            if self.call_graph is not None:
+                called_function_codes = (
+                    self.call_graph.extract_called_function_sources(
+                        failing_test_path, test_name
+                    )
+                )
+            # delete an extra blank line from the end of the file
+            # if there are two blank lines in a row
+            failing_test_sources.append(
+                (
+                    failing_test_code.rstrip() + "\n",
+                    [code.rstrip() + "\n" for code in called_function_codes],
+                )
+            )
+        return failing_test_sources
+
+    @cached_property
+    def failing_test_codes(self) -> List[str]:
+        """Produce the source code of each failing test followed by the project functions that it calls."""
+        return [
+            "\n".join([failing_test_code, *called_function_codes])
+            for failing_test_code, called_function_codes in (
+                self.failing_test_sources
+            )
+        ]
+
+    @cached_property
+    def failing_test_code(self) -> str:
+        """Produce the source code of all the failing tests."""
+        return "".join(
+            failing_test_code
+            for failing_test_code, _ in self.failing_test_sources
+        )
+
+    @cached_property
+    def called_function_code(self) -> str:
+        """Produce the source code of the project functions that the failing tests call, once each."""
+        called_function_codes: Dict[str, None] = {}
+        for _, codes in self.failing_test_sources:
+            called_function_codes.update(dict.fromkeys(codes))
+        return "".join(called_function_codes)
@@ -1,24 +1,108 @@
 """This module contains the pytest plugin for the execexam package."""
 
-from typing import Any, List, Tuple
+import importlib
+import json
+import math
+import os
+import signal
+import threading
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass, field
+from importlib import metadata
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
+import coverage
 import pytest
-from _pytest.config import Config
+from _pytest.config import Config, default_plugins
 from _pytest.nodes import Item
 
-# create the report list of
-# dictionaries that are organized by nodeid
-reports: List[dict[str, Any]] = []
+from . import convert, enumerations, phases, util
 
-# No longer used but may be needed {{{
+# the resource module is only available on Unix-like systems and thus
+# the limits on the CPU time and the memory of a test are not available
+# on other systems (e.g., Windows), while the timeout still is if the
+# system supports the signal for an alarm
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None  # type: ignore
+
+# create the report dictionary of dictionaries that is keyed
+# by the nodeid of each test; note that a dictionary preserves
+# insertion order and thus the reports are still organized in
+# the order in which the tests were run, while the hooks can
+# find the report for a specific test without a linear scan
+reports: Dict[str, Dict[str, Any]] = {}
+
+# create the dictionary that indexes the aggregated details about
+# passing assertions by the nodeid of the test and the line number
+# of the assertion; note that this is only used when the plugin
+# runs in the mode that aggregates passing assertions
+passing_assertions: Dict[str, Dict[int, Dict[str, Any]]] = {}
+
+# indicate whether or not the passing assertions for the same line
+# of a test are aggregated into a single summary of the assertion
+aggregate_assertions: bool = False
 
-# internal_coverage = coverage.Coverage()
+# create the dictionary that stores the lines that each test covered,
+# keyed by the nodeid of the test and then by the path of the file
+# relative to the project; note that the covered lines of a file are
+# a bitmap that has the bit for each of the executed lines set
+coverage_maps: Dict[str, Dict[str, int]] = {}
 
-# }}}
+
+def pytest_addoption(parser: pytest.Parser):
+    """Define the configuration options that control the plugin."""
+    # note that this option can be set in the configuration file
+    # of a test suite that uses the pytest_assertion_pass hook and
+    # runs the same assertion many times (e.g., in a loop or when
+    # using Hypothesis) so that the memory that is needed to record
+    # its passing assertions does not grow with the number of calls
+    parser.addini(
+        "execexam_aggregate_assertions",
+        type="bool",
+        default=False,
+        help="Aggregate the passing assertions for each line of a test.",
+    )
+    # note that these options limit the resources of every test and that
+    # the timeout mark of a test overrides the timeout for that test
+    parser.addoption(
+        "--execexam-timeout",
+        type=float,
+        default=None,
+        help="Fail a test when it runs for longer than the seconds.",
+    )
+    parser.addoption(
+        "--execexam-cpu-limit",
+        type=int,
+        default=None,
+        help="Fail a test when it uses more than the seconds of CPU time.",
+    )
+    parser.addoption(
+        "--execexam-memory-limit",
+        type=int,
+        default=None,
+        help="Fail a test when it allocates more than the megabytes of memory,"
+        " unless another thread runs in the process.",
+    )
 
 
 def pytest_configure(config: Config):
     """Define the order marker that can control test order in the test suites."""
+    global aggregate_assertions  # noqa: PLW0603
     # note that if the plugin did not define the order
     # marker then this would lead to warnings when execexam
     # runs a provided test suite that uses this marker;
@@ -27,6 +111,22 @@ def pytest_configure(config: Config):
     config.addinivalue_line(
         "markers", "order(number): Mark test to run in a specific order"
     )
+    config.addinivalue_line(
+        "markers",
+        "timeout(seconds): Fail the test when it runs for longer than the seconds",
+    )
+    # determine whether or not the passing assertions are aggregated
+    aggregate_assertions = config.getini("execexam_aggregate_assertions")
+    # limit the resources that each test can use; note that the limiter is
+    # always registered since any test can have a timeout mark
+    config.pluginmanager.register(
+        ResourceLimiter(
+            config.getoption("execexam_timeout", None),
+            config.getoption("execexam_cpu_limit", None),
+            config.getoption("execexam_memory_limit", None),
+        ),
+        "execexam-resource-limiter",
+    )
 
 
 def extract_single_line(text: str) -> str:
@@ -52,10 +152,16 @@ def extract_exception_details(call: pytest.CallInfo) -> Tuple[int, str, str]:
     message = ""
     # dealing with a pytest.CallInfo that is an exception and it can
     # first be processed generally and then, if possible, as an AssertionError
-    if call.excinfo is not None and isinstance(call.excinfo.value, Exception):
+    if call.excinfo is not None and isinstance(
+        call.excinfo.value, (Exception, LimitExceeded)
+    ):
         # extract the line number
         last_traceback_entry = call.excinfo.traceback[-1]
         lineno = last_traceback_entry.lineno + 1
+        # the plugin interrupted a test that exceeded one of its limits
+        # and thus the line is the last one that ran outside of the plugin
+        if isinstance(call.excinfo.value, LimitExceeded):
+            lineno = find_interrupted_line(call.excinfo.value) or lineno
         # transform the exception into a string
         exception_output = str(call.excinfo.value)
         # specifically dealing with an AssertionError and thus
@@ -95,34 +201,20 @@ def pytest_collection_modifyitems(items: List[Item]):
     )
 
 
-def pytest_runtest_call(item: Item):
-    """Called before the test function is called."""
-    # save the name of the test
-    test_name = item.nodeid
-    # save the full path of the test file
-    test_file_name_path = item.fspath
-    _ = (test_name, test_file_name_path)
-    # start the coverage collection
-    # sys.settrace(trace_calls)
-
-
-def pytest_runtest_protocol(item: Item, nextitem: Item):  # type: ignore
+def record_test_run(item: Item) -> None:
     """Track when a test case is run."""
     global reports  # noqa: PLW0602
-    # reference the nextitem parameter
-    # that is not used by the hook
-    _ = nextitem
     # create a new dictionary for the report
-    # and add it to the report list
-    reports.append({"nodeid": item.nodeid})
+    # and add it to the reports under its nodeid
+    reports[item.nodeid] = {"nodeid": item.nodeid}
+    # create a new index for the aggregated passing assertions
+    # that will be recorded for this specific test
+    passing_assertions[item.nodeid] = {}
 
 
-def pytest_exception_interact(node: Item, call: pytest.CallInfo, report: Any):
+def record_exception(node: Item, call: pytest.CallInfo) -> None:
     """Interacts with exceptions."""
     global reports  # noqa: PLW0602
-    # reference the report parameter
-    # that is not used by the hook
-    _ = report
     # extract the details about the exception that was thrown
     exception_info = call.excinfo
     # set the details about the exception to be the empty string
@@ -132,48 +224,35 @@ def pytest_exception_interact(node: Item, call: pytest.CallInfo, report: Any):
         traceback_text = exception_info.exconly()
     # there was an assertion error and thus
     # the plugin must extract details about what failed
-    if isinstance(call.excinfo.value, Exception):  # type: ignore
-        # create an empty dictionary for the test report
-        current_test_report = {}
-        # find the test report for this specific test that
-        # has a passing assertion
-        for current_report in reports:
-            # found the test report for this specific test
-            # based on what matches according to the nodeid
-            if current_report["nodeid"] == node.nodeid:
-                current_test_report = current_report
+    if isinstance(call.excinfo.value, (Exception, LimitExceeded)):  # type: ignore
+        # find the test report for this specific test
+        # based on what matches according to the nodeid
+        current_test_report = reports.get(node.nodeid)
         # extract the details about the exception
         (lineno, expl, orig) = extract_exception_details(call)
         # one of the test reports was found
         # and thus we can store information about this assertion
-        if current_test_report != {}:
+        if current_test_report is not None:
             # create an empty dictionary for the data about
             # the assertions for this failing test
             current_assertion_dict = {}
-            # indicate that the assertion failed
-            current_assertion_dict["Status"] = "Failed"
-            # there is no data about assertions for this test
-            if current_test_report.get("assertions") is None:
-                # add the needed fields about the assertion
-                current_assertion_dict["Line"] = str(lineno)
-                current_assertion_dict["Exact"] = extract_single_line(expl)
-                current_assertion_dict["Message"] = orig
-                # create a new list and add the dictionary with
-                # the details about this assertion to the new list
-                assertions_dictionary_list = [current_assertion_dict]
-                current_test_report["assertions"] = assertions_dictionary_list
-            # there is already data about assertions for this test
-            else:
-                # add the needed fields about the assertion
-                current_assertion_dict["Line"] = str(lineno)
-                current_assertion_dict["Exact"] = extract_single_line(expl)
-                current_assertion_dict["Message"] = orig
-                # there is an existing list of assertion dictionaries
-                # for this test case and thus we must add a new dictionary
-                # to the list that already exists with assertion information
-                current_test_report["assertions"].append(
-                    current_assertion_dict
-                )
+            # indicate that the assertion failed or that the test
+            # exceeded one of the limits on its resources
+            current_assertion_dict["Status"] = getattr(
+                call.excinfo.value,  # type: ignore
+                "status",
+                "Failed",
+            )
+            # add the needed fields about the assertion
+            current_assertion_dict["Line"] = str(lineno)
+            current_assertion_dict["Exact"] = extract_single_line(expl)
+            current_assertion_dict["Message"] = orig
+            # add the dictionary with the details about this assertion
+            # to the list of assertions for this test, creating the
+            # list when there is not yet any data about its assertions
+            current_test_report.setdefault("assertions", []).append(
+                current_assertion_dict
+            )
         # there was no information about this exception; this would normally
         # occur when there is an underlying problem with running this specific
         # test because otherwise a different hook would have already added
@@ -181,12 +260,16 @@ def pytest_exception_interact(node: Item, call: pytest.CallInfo, report: Any):
         # to record all of the information about this test in a new report
         else:
             # create a new dictionary for the failing test case
-            new_failing_test_report = {}
+            new_failing_test_report: Dict[str, Any] = {}
             new_failing_test_report["nodeid"] = node.nodeid
             # create an empty dictionary for the data about
             # the assertions for this failing test
             current_assertion_dict = {}
-            current_assertion_dict["Status"] = "Failed"
+            current_assertion_dict["Status"] = getattr(
+                call.excinfo.value,  # type: ignore
+                "status",
+                "Failed",
+            )
             current_assertion_dict["Message"] = traceback_text
             # store the details about this test failure's assertions
             # inside of the assertion dictionary; note that this is
@@ -194,12 +277,12 @@ def pytest_exception_interact(node: Item, call: pytest.CallInfo, report: Any):
             # there are actually no assertions being recorded --- it is
             # only the fact that the test failed and then the traceback
             # of the exception that was raised when running the test
-            new_failing_test_report["assertions"] = [current_assertion_dict]  # type: ignore
-            # add the new failing test report to the list of reports
-            reports.append(new_failing_test_report)
+            new_failing_test_report["assertions"] = [current_assertion_dict]
+            # add the new failing test report to the reports
+            reports[node.nodeid] = new_failing_test_report
 
 
-def pytest_assertion_pass(
+def record_assertion_pass(
     item: Any, lineno: int, orig: str, expl: str
 ) -> None:
     """Extract and save information about a passing assertion."""
@@ -208,43 +291,768 @@ def pytest_assertion_pass(
     # enables the pytest assertion_pass_hook;
     # reference: https://docs.pytest.org/en/stable/reference/reference.html
     global reports  # noqa: PLW0602
-    # create an empty dictionary for the test report
-    current_test_report = {}
     # find the test report for this specific test that
-    # has a passing assertion
-    for current_report in reports:
-        # found the test report for this specific test
-        # based on what matches according to the nodeid
-        if current_report["nodeid"] == item.nodeid:
-            current_test_report = current_report
+    # has a passing assertion based on its nodeid
+    current_test_report = reports.get(item.nodeid)
     # one of the test reports was found
     # and thus we can store information about this assertion
-    if current_test_report != {}:
+    if current_test_report is not None:
+        # the passing assertions are aggregated and thus only
+        # the summary of the assertion on this line is updated
+        if aggregate_assertions:
+            aggregate_assertion_pass(current_test_report, lineno, orig, expl)
+            return
         # create a dictionary to store details
         # about the passing assertion for this test
         current_assertion_dict = {}
         # indicate that the assertion passed
         current_assertion_dict["Status"] = "Passed"
-        # there is no data about assertions for this test
-        if current_test_report.get("assertions") is None:
-            # create an empty dictionary for the data about
-            current_assertion_dict["Line"] = str(lineno)
-            current_assertion_dict["Code"] = orig
-            current_assertion_dict["Exact"] = extract_single_line(expl)
-            # create a new list and add the dictionary with
-            # the details about this assertion to the new list
-            assertions_dictionary_list = [current_assertion_dict]
-            current_test_report["assertions"] = assertions_dictionary_list
-        # there is already data about assertions for this test
-        else:
-            # create an empty dictionary for the data about
-            # this assertion and then add the needed fields
-            current_assertion_dict["Line"] = str(lineno)
-            current_assertion_dict["Code"] = orig
-            current_assertion_dict["Exact"] = extract_single_line(expl)
-            # there is an existing list of assertion dictionaries
-            # for this test case and thus we must add a new one to it
-            current_test_report["assertions"].append(current_assertion_dict)
+        # add the needed fields about the assertion
+        current_assertion_dict["Line"] = str(lineno)
+        current_assertion_dict["Code"] = orig
+        current_assertion_dict["Exact"] = extract_single_line(expl)
+        # add the dictionary with the details about this assertion
+        # to the list of assertions for this test, creating the
+        # list when there is not yet any data about its assertions
+        current_test_report.setdefault("assertions", []).append(
+            current_assertion_dict
+        )
+
+
+def aggregate_assertion_pass(
+    test_report: Dict[str, Any], lineno: int, orig: str, expl: str
+) -> None:
+    """Aggregate a passing assertion into the summary for its line of the test."""
+    # find the index of the aggregated assertions for this test,
+    # creating it if the test report was not made by this plugin
+    test_passing_assertions = passing_assertions.setdefault(
+        test_report["nodeid"], {}
+    )
+    current_assertion_dict = test_passing_assertions.get(lineno)
+    # this is the first time that the assertion on this line
+    # passed and thus the summary of the assertion must be
+    # created and added to the list of assertions for the test;
+    # note that the first example is kept for the whole test
+    if current_assertion_dict is None:
+        exact = extract_single_line(expl)
+        current_assertion_dict = {
+            "Status": "Passed",
+            "Line": str(lineno),
+            "Code": orig,
+            "Count": 1,
+            "First": exact,
+            "Last": exact,
+        }
+        test_passing_assertions[lineno] = current_assertion_dict
+        test_report.setdefault("assertions", []).append(current_assertion_dict)
+    # the assertion on this line already passed and thus only
+    # the number of passes and the last example are updated
+    else:
+        current_assertion_dict["Count"] += 1
+        current_assertion_dict["Last"] = extract_single_line(expl)
+
+
+class TraceRecorder:
+    """Record the tests that run and the exceptions that they raise for the test trace."""
+
+    def pytest_runtest_protocol(self, item: Item, nextitem: Item):  # type: ignore
+        """Track when a test case is run."""
+        # reference the nextitem parameter
+        # that is not used by the hook
+        _ = nextitem
+        record_test_run(item)
+
+    def pytest_exception_interact(
+        self, node: Item, call: pytest.CallInfo, report: Any
+    ):
+        """Interacts with exceptions."""
+        # reference the report parameter
+        # that is not used by the hook
+        _ = report
+        record_exception(node, call)
+
+
+class AssertionPassRecorder:
+    """Record the passing assertions for the test trace."""
+
+    def pytest_assertion_pass(
+        self, item: Any, lineno: int, orig: str, expl: str
+    ) -> None:
+        """Extract and save information about a passing assertion."""
+        record_assertion_pass(item, lineno, orig, expl)
+
+
+@dataclass(slots=True)
+class ResultRecord:
+    """The outcome of a test and the details about where its call crashed."""
+
+    nodeid: str
+    outcome: str = "passed"
+    lineno: Optional[int] = None
+    message: Optional[str] = None
+    setup: float = 0.0
+    call: float = 0.0
+    teardown: float = 0.0
+    # the path and the line of each frame of the traceback of the crash,
+    # starting at the frame of the test and ending at the crash site
+    frames: List[Tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        """Calculate the total duration of all the phases of the test."""
+        return self.setup + self.call + self.teardown
+
+
+class ResultCollector:
+    """Collect the outcome of every test and a summary of the test run."""
+
+    def __init__(self) -> None:
+        """Create a collector that does not yet have any results."""
+        # the report is only available after the session finishes
+        # and it contains the summary of the outcomes, the root
+        # directory of the test run, and the records of the tests
+        self.report: Optional[Dict[str, Any]] = None
+        self.results: Dict[str, ResultRecord] = {}
+        self.deselected = 0
+        self.config: Optional[Config] = None
+
+    def pytest_configure(self, config: Config) -> None:
+        """Save the configuration that determines the status of a test."""
+        self.config = config
+
+    def pytest_deselected(self, items: List[Item]) -> None:
+        """Count the tests that were deselected and thus will not run."""
+        self.deselected += len(items)
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        """Record a test file that could not be collected as an error."""
+        if not report.failed:
+            return
+        # a test file that could not be collected (e.g., it imports a module
+        # of the project that does not exist or that is not valid Python)
+        # does not have any tests and thus it is the error; note that the
+        # last line of the details of the error names its exception
+        lines = report.longreprtext.strip().splitlines()
+        self.results[report.nodeid] = ResultRecord(
+            report.nodeid,
+            "error",
+            message=lines[-1].removeprefix("E").strip() if lines else None,
+        )
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Record the outcome of a phase of a test."""
+        # find the record for this test or create one for it
+        # since this is the first phase of the test that ran
+        result = self.results.get(report.nodeid)
+        if result is None:
+            result = ResultRecord(report.nodeid)
+            self.results[report.nodeid] = result
+        # determine the outcome of this phase in the same fashion
+        # as pytest (e.g., a failing setup is an "error" and an
+        # expected failure is "xfailed") and then update the overall
+        # outcome of the test when this phase did not pass
+        outcome = self.config.hook.pytest_report_teststatus(  # type: ignore
+            report=report, config=self.config
+        )[0]
+        if outcome not in ("passed", ""):
+            result.outcome = outcome
+        # record the duration of this phase of the test, which
+        # is either the setup, the call, or the teardown
+        setattr(result, report.when, report.duration)  # type: ignore
+        # record where the call of the test crashed, if it did
+        if report.when == "call":
+            crash = getattr(report.longrepr, "reprcrash", None)
+            if crash is not None:
+                result.lineno = crash.lineno
+                result.message = crash.message
+
+    def pytest_exception_interact(
+        self, node: Item, call: pytest.CallInfo, report: pytest.TestReport
+    ) -> None:
+        """Record the frames of the traceback of the exception that crashed the call of a test."""
+        result = self.results.get(report.nodeid)
+        if result is None or report.when != "call" or call.excinfo is None:
+            return
+        # skip the frames of pytest that called the test; note that a
+        # test that was interrupted (e.g., by a timeout) has the frames
+        # of the line that it was running when it was interrupted
+        frames = [
+            (str(entry.path), entry.lineno + 1)
+            for entry in call.excinfo.traceback
+        ]
+        test_path = str(node.path)
+        for index, (path, _) in enumerate(frames):
+            if path == test_path:
+                result.frames = frames[index:]
+                return
+        result.frames = frames
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Create the report that summarizes the test run."""
+        # count the outcomes of the tests; note that the number of
+        # deselected tests is added to the number of collected tests
+        # because pytest does not count them as collected tests
+        summary: Counter[str] = Counter(
+            result.outcome for result in self.results.values()
+        )
+        summary["total"] = sum(summary.values())
+        summary["collected"] = session.testscollected + self.deselected
+        if self.deselected:
+            summary["deselected"] = self.deselected
+        self.report = {
+            "root": str(session.config.rootpath),
+            "summary": summary,
+            "tests": list(self.results.values()),
+        }
+
+
+class EventSink:
+    """Stream the events of a test run as newline-delimited JSON."""
+
+    def __init__(
+        self, path: Path, batch_size: int = 100, append: bool = False
+    ) -> None:
+        """Create a sink that writes the events to the file or pipe at the path."""
+        self.path = path
+        self.batch_size = batch_size
+        # note that the sinks of the worker processes append to
+        # the same file and write each batch in a single call
+        self.append = append
+        # the events are buffered as lines of JSON and then
+        # written and flushed together once there is a batch
+        self.buffer: List[str] = []
+        self.outcomes: Dict[str, str] = {}
+        self.file: Optional[IO[str]] = None
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Buffer an event and write the buffer when it contains a full batch."""
+        fields = {"event": event, "time": time.time(), **fields}
+        self.buffer.append(json.dumps(fields, default=str) + "\n")
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all of the buffered events to the file."""
+        if self.file is not None and self.buffer:
+            self.file.write("".join(self.buffer))
+            self.file.flush()
+        self.buffer.clear()
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Open the file and record that the test run started."""
+        # note that the path can also be a named pipe that a
+        # dashboard is reading while the tests are running
+        self.file = open(
+            self.path, "a" if self.append else "w", encoding="utf-8"
+        )
+        self.emit("session-start", root=str(session.config.rootpath))
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        """Record that a test started to run."""
+        self.emit("test-start", nodeid=nodeid)
+
+    def pytest_assertion_pass(
+        self, item: Any, lineno: int, orig: str, expl: str
+    ) -> None:
+        """Record that an assertion in a test passed."""
+        _ = expl
+        self.emit(
+            "assertion",
+            nodeid=item.nodeid,
+            line=lineno,
+            status="Passed",
+            code=orig,
+        )
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """Record a failure in a phase of a test and remember its outcome."""
+        if report.failed:
+            crash = getattr(report.longrepr, "reprcrash", None)
+            self.emit(
+                "failure",
+                nodeid=report.nodeid,
+                when=report.when,
+                line=getattr(crash, "lineno", None),
+                message=getattr(crash, "message", str(report.longrepr)),
+            )
+        # keep the first outcome of the test that did not pass
+        if self.outcomes.get(report.nodeid, "passed") == "passed":
+            self.outcomes[report.nodeid] = report.outcome
+
+    def pytest_runtest_logfinish(self, nodeid: str) -> None:
+        """Record that a test finished running along with its outcome."""
+        self.emit(
+            "test-finish", nodeid=nodeid, outcome=self.outcomes.pop(nodeid, "")
+        )
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(
+        self, session: pytest.Session, exitstatus: int
+    ) -> None:
+        """Record that the test run finished and then close the file."""
+        _ = session
+        self.emit("session-finish", exitstatus=int(exitstatus))
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def assign_dependency_groups(
+    nodeids: List[str], workers: int
+) -> Dict[str, int]:
+    """Assign each dependency group of tests to one of the workers."""
+    # a dependency group contains all of the tests in the same test
+    # file because these tests can share state and their order, as
+    # given by the 'order' mark, must be respected when they run
+    group_sizes: Counter[str] = Counter(
+        nodeid.split("::")[0] for nodeid in nodeids
+    )
+    # assign the largest groups first, each to the worker that
+    # currently has the fewest tests; note that sorting by the name
+    # of the group as well as its size ensures that every worker
+    # computes the same assignment for the same collected tests
+    worker_sizes = [0] * workers
+    assignment: Dict[str, int] = {}
+    for group, size in sorted(
+        group_sizes.items(),
+        key=lambda group_size: (-group_size[1], group_size[0]),
+    ):
+        worker = worker_sizes.index(min(worker_sizes))
+        assignment[group] = worker
+        worker_sizes[worker] += size
+    return assignment
+
+
+class WorkerPartition:
+    """Keep only the tests that one of several worker processes should run."""
+
+    def __init__(self, worker_index: int, workers: int) -> None:
+        """Create a partition for the worker with the index out of all the workers."""
+        self.worker_index = worker_index
+        self.workers = workers
+        # the position of every collected test in the order in which
+        # the tests would run in a single process, which is needed to
+        # merge the reports of all the workers in the original order
+        self.order: Dict[str, int] = {}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, items: List[Item]) -> None:
+        """Remove the tests that belong to the dependency groups of other workers."""
+        # note that this hook runs after the tests were sorted by their
+        # 'order' mark and after the tests were selected by their marks
+        self.order = {item.nodeid: index for index, item in enumerate(items)}
+        assignment = assign_dependency_groups(
+            [item.nodeid for item in items], self.workers
+        )
+        items[:] = [
+            item
+            for item in items
+            if assignment[item.nodeid.split("::")[0]] == self.worker_index
+        ]
+
+
+# the configuration files of coverage.py in the order in which it searches
+# for them and the text that starts its settings in each one of them
+COVERAGE_CONFIGURATION_FILES = [
+    (".coveragerc", ""),
+    ("setup.cfg", "[coverage:"),
+    ("tox.ini", "[coverage:"),
+    ("pyproject.toml", "[tool.coverage"),
+]
+
+
+def find_coverage_configuration(project: Path) -> Union[str, bool]:
+    """Find the project's configuration file with settings for coverage.py, if there is one."""
+    # note that coverage.py only searches the current directory, which
+    # is not always the directory of the project that the tests measure
+    for file_name, settings_start in COVERAGE_CONFIGURATION_FILES:
+        configuration_file = project / file_name
+        try:
+            text = configuration_file.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            continue
+        if settings_start in text:
+            return str(configuration_file)
+    return False
+
+
+class CoverageRecorder:
+    """Record the lines of the project that each test executed."""
+
+    def __init__(self, project: Path) -> None:
+        """Create a recorder that measures the source code of the project."""
+        self.project = project.resolve()
+        # measure the project's code but not its hidden directories
+        # or virtual environments (e.g., .git, .venv, and venv); note that
+        # the data is only stored in memory and that the other settings
+        # in the project's configuration of coverage.py (e.g., its core
+        # or the lines that it excludes) change how the coverage is measured
+        self.coverage = coverage.Coverage(
+            data_file=None,
+            source=[str(self.project)],
+            omit=[
+                str(self.project / ".*" / "*"),
+                str(self.project / "**" / "venv" / "*"),
+            ],
+            config_file=find_coverage_configuration(self.project),
+        )
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """Start measuring the coverage before the tests are collected."""
+        self.coverage.start()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: Item, nextitem: Item):  # type: ignore
+        """Attribute the lines that run during a test to the test's context."""
+        # reference the nextitem parameter
+        # that is not used by the hook
+        _ = nextitem
+        # add the test to the coverage maps so that they are in the
+        # order in which the tests ran; note that the dynamic context
+        # covers all of the setup, call, and teardown of the test
+        coverage_maps[item.nodeid] = {}
+        self.coverage.switch_context(item.nodeid)
+        yield
+        self.coverage.switch_context("")
+
+    def pytest_sessionfinish(self, session: pytest.Session) -> None:
+        """Stop measuring the coverage and store the lines covered by each test."""
+        self.coverage.stop()
+        data = self.coverage.get_data()
+        for measured_file in data.measured_files():
+            # find the tests that executed each line of the file, ignoring
+            # the lines that ran outside of a test (e.g., module imports)
+            lines: Dict[str, List[int]] = {}
+            contexts_by_lineno = data.contexts_by_lineno(measured_file)
+            for lineno, contexts in contexts_by_lineno.items():
+                for context in contexts:
+                    if context in coverage_maps:
+                        lines.setdefault(context, []).append(lineno)
+            # store the lines of the file that each test covered
+            # with a path that is relative to the project
+            relative_file = (
+                Path(measured_file).relative_to(self.project).as_posix()
+            )
+            for nodeid, covered_lines in lines.items():
+                coverage_maps[nodeid][relative_file] = convert.lines_to_bitmap(
+                    covered_lines
+                )
+        self.coverage.erase()
+
+
+class AffectedSelector:
+    """Deselect the tests that are not affected by the changes to the project."""
+
+    def __init__(self, unaffected_tests: Set[str]) -> None:
+        """Create a selector that deselects the unaffected tests."""
+        self.unaffected_tests = unaffected_tests
+
+    def pytest_collection_modifyitems(
+        self, config: Config, items: List[Item]
+    ) -> None:
+        """Deselect the tests that passed and did not cover any changed lines."""
+        # note that this hook does not run last so that, when the tests are
+        # split across workers, every worker deselects the same tests before
+        # the worker's partition of the tests is selected
+        deselected = [
+            item for item in items if item.nodeid in self.unaffected_tests
+        ]
+        if deselected:
+            items[:] = [
+                item
+                for item in items
+                if item.nodeid not in self.unaffected_tests
+            ]
+            config.hook.pytest_deselected(items=deselected)
+
+
+class PhaseRecorder:
+    """Record the time that pytest takes to collect the tests and to run them."""
+
+    def __init__(self, timer: phases.PhaseTimer) -> None:
+        """Create a recorder that adds the phases to the timer."""
+        self.timer = timer
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_collection(
+        self, session: pytest.Session
+    ) -> Generator[None, Any, Any]:
+        """Time the collection of the tests."""
+        with self.timer.phase("collect tests"):
+            return (yield)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtestloop(
+        self, session: pytest.Session
+    ) -> Generator[None, Any, Any]:
+        """Time the run of all the tests."""
+        with self.timer.phase("run tests"):
+            return (yield)
+
+
+class LimitExceeded(BaseException):
+    """A test exceeded one of the limits on the resources that it can use."""
+
+    # note that, like the outcomes of pytest, the error is not an Exception
+    # and thus a test that catches every Exception (e.g., in a loop that
+    # retries) cannot catch the error and keep running past its limit
+
+    # the status of the test's failure in the reports
+    status = "Failed"
+
+
+class TimeoutExceeded(LimitExceeded):
+    """A test ran for longer than its timeout or used too much CPU time."""
+
+    status = "Timeout"
+
+
+class MemoryLimitExceeded(LimitExceeded):
+    """A test allocated more memory than the memory limit."""
+
+    status = "MemoryLimit"
+
+
+def find_interrupted_line(error: LimitExceeded) -> Optional[int]:
+    """Find the line that was running when the test exceeded its limit."""
+    # note that a memory limit is detected from the memory error that
+    # was raised by the allocation of the test and that caused the error
+    original_error = error.__cause__ or error
+    lines = [
+        lineno
+        for frame, lineno in traceback.walk_tb(original_error.__traceback__)
+        if frame.f_code.co_filename != __file__
+    ]
+    return lines[-1] if lines else None
+
+
+def raise_timeout(signum: int, frame: Any) -> None:
+    """Stop the test that is running when it exceeds its time limit."""
+    # reference the frame parameter
+    # that is not used by the handler
+    _ = frame
+    # hide this handler from the traceback so that pytest reports
+    # the line of the test that was running as where the test crashed
+    __tracebackhide__ = True
+    if signum == signal.SIGALRM:
+        raise TimeoutExceeded("The test ran for longer than its timeout")
+    raise TimeoutExceeded("The test used more than its limit of CPU time")
+
+
+def get_address_space_size() -> Optional[int]:
+    """Get the size, in bytes, of the address space of this process."""
+    # note that only Linux reports the size of the address space
+    # and that a limit on its size is not enforced by other systems
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as statm:
+            pages = int(statm.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+class ResourceLimiter:
+    """Limit the time, the CPU time, and the memory that each test can use."""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        cpu_limit: Optional[int] = None,
+        memory_limit: Optional[int] = None,
+    ) -> None:
+        """Create a limiter with the limits, in seconds and megabytes, for every test."""
+        self.timeout = timeout
+        self.cpu_limit = cpu_limit
+        self.memory_limit = memory_limit
+
+    def get_timeout(self, item: Item) -> Optional[float]:
+        """Get the timeout of the test, which its timeout mark can override."""
+        marker = item.get_closest_marker("timeout")
+        if marker is not None:
+            seconds = marker.kwargs.get(
+                "seconds", marker.args[0] if marker.args else None
+            )
+            return float(seconds) if seconds is not None else None
+        return self.timeout
+
+    def run_with_limits(self, item: Item) -> Generator[None, Any, Any]:
+        """Run a phase of the test while its limits apply."""
+        timeout = self.get_timeout(item)
+        # the alarm can only interrupt the test in the main thread
+        use_alarm = (
+            bool(timeout)
+            and hasattr(signal, "setitimer")
+            and threading.current_thread() is threading.main_thread()
+        )
+        cpu_limit = self.cpu_limit if resource is not None else None
+        # note that the limit on the address space is a limit of the whole
+        # process and thus it only applies when no other thread runs in the
+        # process (e.g., the thread that loads LiteLLM for the advice), whose
+        # allocations would fail or count against the test's memory
+        address_space_size = (
+            get_address_space_size()
+            if self.memory_limit
+            and resource is not None
+            and threading.active_count() == 1
+            else None
+        )
+        # no limit applies to this test and thus it runs on its own
+        if not (use_alarm or cpu_limit or address_space_size):
+            return (yield)
+        previous_handlers = {}
+        previous_limits = {}
+        try:
+            # interrupt the test once its timeout passes
+            if use_alarm:
+                previous_handlers[signal.SIGALRM] = signal.signal(
+                    signal.SIGALRM, raise_timeout
+                )
+                signal.setitimer(signal.ITIMER_REAL, timeout)  # type: ignore
+            # interrupt the test once the process used the test's CPU time;
+            # note that the limit is the total CPU time of the process
+            if cpu_limit:
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                previous_limits[resource.RLIMIT_CPU] = resource.getrlimit(
+                    resource.RLIMIT_CPU
+                )
+                previous_handlers[signal.SIGXCPU] = signal.signal(
+                    signal.SIGXCPU, raise_timeout
+                )
+                self.set_soft_limit(
+                    resource.RLIMIT_CPU,
+                    math.ceil(usage.ru_utime + usage.ru_stime) + cpu_limit,
+                )
+            # make an allocation fail once the test allocated the memory
+            # beyond what the process already uses before the test runs
+            if address_space_size:
+                previous_limits[resource.RLIMIT_AS] = resource.getrlimit(
+                    resource.RLIMIT_AS
+                )
+                self.set_soft_limit(
+                    resource.RLIMIT_AS,
+                    address_space_size + self.memory_limit * 1024 * 1024,  # type: ignore
+                )
+            return (yield)
+        except MemoryError as error:
+            if address_space_size:
+                # keep the traceback of the allocation so that pytest
+                # reports its line as where the test crashed
+                raise MemoryLimitExceeded(
+                    "The test allocated more than its limit of"
+                    f" {self.memory_limit} megabytes"
+                ).with_traceback(error.__traceback__) from error
+            raise
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            for limit, (soft, hard) in previous_limits.items():
+                resource.setrlimit(limit, (soft, hard))
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def set_soft_limit(self, limit: int, value: int) -> None:
+        """Lower the soft limit on the resource, which cannot exceed its hard limit."""
+        soft, hard = resource.getrlimit(limit)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        if soft == resource.RLIM_INFINITY or value < soft:
+            resource.setrlimit(limit, (value, hard))
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_setup(self, item: Item) -> Generator[None, Any, Any]:
+        """Limit the resources of the setup of the test."""
+        return (yield from self.run_with_limits(item))
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item: Item) -> Generator[None, Any, Any]:
+        """Limit the resources of the call of the test."""
+        return (yield from self.run_with_limits(item))
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_teardown(
+        self, item: Item, nextitem: Optional[Item]
+    ) -> Generator[None, Any, Any]:
+        """Limit the resources of the teardown of the test."""
+        # reference the nextitem parameter
+        # that is not used by the hook
+        _ = nextitem
+        return (yield from self.run_with_limits(item))
+
+
+def load_pytest_plugins() -> None:
+    """Import the modules of pytest's plugins before pytest needs them."""
+    # note that pytest only imports its default plugins and the plugins
+    # of the installed packages (e.g., hypothesis) when it runs and that
+    # importing them first means that every run of pytest, including the
+    # runs in the processes that are forked from this one, can reuse them
+    for plugin in default_plugins:
+        importlib.import_module(f"_pytest.{plugin}")
+    if not os.environ.get("PYTEST_DISABLE_PLUGIN_AUTOLOAD"):
+        for entry_point in metadata.entry_points(group="pytest11"):
+            try:
+                entry_point.load()
+            # pytest reports the plugins that cannot be loaded when it runs
+            except Exception:
+                continue
+
+
+def select_plugins(
+    report_types: Optional[List[enumerations.ReportType]],
+    result_collector: ResultCollector,
+    project: Optional[Path] = None,
+    affected: bool = False,
+    summary: bool = False,
+) -> List[object]:
+    """Select the hooks that are needed to produce the requested reports."""
+    # note that pytest only calls the hooks of the plugins that are
+    # registered and that it only invokes the pytest_assertion_pass
+    # hook, which runs for every passing assertion, when at least one
+    # plugin implements it; this means that selecting the plugins
+    # avoids all of the work that a report that was not requested needs
+    plugins: List[object] = []
+    # the failures, the code of the failing tests, the advice, and the
+    # context all need the outcomes of the tests and where they crashed,
+    # while the timing needs the durations of the tests' phases
+    if util.is_report_requested(
+        report_types,
+        enumerations.ReportType.testfailures,
+        enumerations.ReportType.testcodes,
+        enumerations.ReportType.testadvice,
+        enumerations.ReportType.timing,
+        enumerations.ReportType.context,
+    ):
+        plugins.append(result_collector)
+    # selecting the affected tests needs the outcomes of the tests
+    # and the lines that they covered for the next run of the tests,
+    # while the results document always contains the summary
+    elif affected or summary:
+        plugins.append(result_collector)
+    # the test trace and the advice both use the details about the
+    # tests that were run and the exceptions that they raised
+    if util.is_report_requested(
+        report_types,
+        enumerations.ReportType.testtrace,
+        enumerations.ReportType.testadvice,
+    ):
+        plugins.append(TraceRecorder())
+    # only the test trace displays the details about passing assertions
+    if util.is_report_requested(
+        report_types, enumerations.ReportType.testtrace
+    ):
+        plugins.append(AssertionPassRecorder())
+    # only the coverage report and the selection of the affected tests
+    # need the lines that each test executed, which also requires
+    # knowing which code is the project's
+    if project is not None and (
+        affected
+        or util.is_report_requested(
+            report_types, enumerations.ReportType.coverage
+        )
+    ):
+        plugins.append(CoverageRecorder(project))
+    return plugins
 
 
 # No longer used but may be needed {{{
@@ -267,33 +1075,4 @@ def pytest_assertion_pass(
 #         called = (func_name, func_filename)
 #         _ = called
 
-# def pytest_runtest_teardown(item: Item, nextitem: Item):
-#     """Called after the test function has been called."""
-# Stop the coverage collection
-# Stop the trace
-# sys.settrace(None)
-
-
-#     internal_coverage.stop()
-#     internal_coverage.save()
-#     # Get the coverage data
-#     cov_data = internal_coverage.get_data()
-#     # Analyze the coverage data
-#     for filename in cov_data.measured_files():
-#         # Get the analysis for the file
-#         analysis = internal_coverage._analyze(filename)
-#         # Get the list of executed lines
-#         executed_lines = analysis.executed
-#         # Get the list of statements (lines that could have been executed)
-#         statements = analysis.statements
-#         # Get the list of missing lines (statements that were not executed)
-#         missing_lines = analysis.missing
-#         print(f"Test: {item.nodeid}")
-#         print(f"File: {filename}")
-#         print(f"Executed lines: {executed_lines}")
-#         print(f"Statements: {statements}")
-#         print(f"Missing lines: {missing_lines}")
-#     # Clear the coverage data for the next test
-#     internal_coverage.erase()
-
 #     }}}
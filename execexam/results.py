@@ -0,0 +1,233 @@
+"""Produce the results of an executable examination as a JSON document."""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from . import convert, enumerations, util
+from .pytest_plugin import ResultRecord
+
+# the version of the schema of the results document, which changes
+# when a field is removed or changes its meaning and thus a program
+# that reads the results can check that it understands the document
+SCHEMA_VERSION = 1
+
+# the JSON schema of the results document; note that the optional fields
+# are only in the document when the report that contains them was requested
+RESULTS_SCHEMA: Dict[str, Any] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "title": "execexam results",
+    "type": "object",
+    "required": [
+        "schema_version",
+        "project",
+        "tests",
+        "return_code",
+        "pytest_exit_code",
+        "duration",
+        "summary",
+    ],
+    "properties": {
+        "schema_version": {"const": SCHEMA_VERSION},
+        "project": {"type": "string"},
+        "tests": {"type": "string"},
+        "return_code": {
+            "type": "integer",
+            "description": "The exit code of execexam, which is zero when all tests passed",
+        },
+        "pytest_exit_code": {"type": "integer"},
+        "duration": {
+            "type": "number",
+            "description": "The seconds that it took to run the tests",
+        },
+        "summary": {
+            "type": "object",
+            "description": "The number of tests with each outcome (e.g., passed and failed) and the total and collected counts",
+            "additionalProperties": {"type": "integer"},
+        },
+        "trace": {
+            "type": "object",
+            "description": "Included for the trace report",
+            "properties": {
+                "output": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The lines of the output of pytest with a failure, error, or warning",
+                },
+                "label_counts": {
+                    "type": "object",
+                    "description": "The number of lines of the output that contain each one of the trace labels",
+                    "additionalProperties": {"type": "integer"},
+                },
+                "reports": {
+                    "type": "array",
+                    "description": "The tests in the order in which they ran, each with a nodeid and its assertions",
+                    "items": {
+                        "type": "object",
+                        "required": ["nodeid"],
+                        "properties": {
+                            "nodeid": {"type": "string"},
+                            "assertions": {
+                                "type": "array",
+                                "items": {"type": "object"},
+                            },
+                        },
+                    },
+                },
+            },
+        },
+        "failures": {
+            "type": "array",
+            "description": "Included for the failure report",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "nodeid": {"type": "string"},
+                    "outcome": {"type": "string"},
+                    "lineno": {"type": ["integer", "null"]},
+                    "message": {"type": ["string", "null"]},
+                },
+            },
+        },
+        "timing": {
+            "type": "object",
+            "description": "Included for the timing report",
+            "properties": {
+                "tests": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "nodeid": {"type": "string"},
+                            "setup": {"type": "number"},
+                            "call": {"type": "number"},
+                            "teardown": {"type": "number"},
+                            "duration": {"type": "number"},
+                        },
+                    },
+                },
+                "phases": {
+                    "type": "object",
+                    "additionalProperties": {"type": "number"},
+                },
+                "run_phases": {
+                    "type": "array",
+                    "description": "The phases of the run of execexam with their start, relative to the start of the run, and duration in seconds",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string"},
+                            "start": {"type": "number"},
+                            "duration": {"type": "number"},
+                        },
+                    },
+                },
+            },
+        },
+        "coverage": {
+            "type": "object",
+            "description": "Included for the coverage report, with the ranges of the lines that each test covered in each file",
+            "additionalProperties": {
+                "type": "object",
+                "additionalProperties": {"type": "string"},
+            },
+        },
+    },
+}
+
+
+def make_failures(tests: List[ResultRecord]) -> List[Dict[str, Any]]:
+    """Make the details of the tests that did not pass, including the files that could not be collected."""
+    return [
+        {
+            "nodeid": test.nodeid,
+            "outcome": test.outcome,
+            "lineno": test.lineno,
+            "message": test.message,
+        }
+        for test in tests
+        if test.outcome not in ("passed", "skipped", "xfailed")
+    ]
+
+
+def make_results_document(  # noqa: PLR0913
+    project: Path,
+    tests: Path,
+    report_types: Optional[List[enumerations.ReportType]],
+    return_code: int,
+    pytest_exit_code: int,
+    duration: float,
+    results: Optional[Dict[str, Any]],
+    reports: Dict[str, Dict[str, Any]],
+    coverage_maps: Dict[str, Dict[str, int]],
+    filtered_test_output: str,
+    run_phases: Optional[List[Dict[str, Any]]] = None,
+    label_counts: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Make the document with the results of the requested reports."""
+    test_results = results["tests"] if results is not None else []
+    document: Dict[str, Any] = {
+        "schema_version": SCHEMA_VERSION,
+        "project": str(project),
+        "tests": str(tests),
+        "return_code": return_code,
+        "pytest_exit_code": int(pytest_exit_code),
+        "duration": duration,
+        "summary": dict(results["summary"]) if results is not None else {},
+    }
+    # only the results of the requested reports are in the document
+    if util.is_report_requested(
+        report_types, enumerations.ReportType.testtrace
+    ):
+        document["trace"] = {
+            "output": filtered_test_output.splitlines(),
+            "label_counts": label_counts or {},
+            "reports": list(reports.values()),
+        }
+    if util.is_report_requested(
+        report_types, enumerations.ReportType.testfailures
+    ):
+        document["failures"] = make_failures(test_results)
+    if util.is_report_requested(report_types, enumerations.ReportType.timing):
+        document["timing"] = {
+            "tests": [
+                {
+                    "nodeid": test.nodeid,
+                    "setup": test.setup,
+                    "call": test.call,
+                    "teardown": test.teardown,
+                    "duration": test.duration,
+                }
+                for test in test_results
+            ],
+            "phases": {
+                phase: sum(getattr(test, phase) for test in test_results)
+                for phase in ["setup", "call", "teardown", "duration"]
+            },
+            "run_phases": run_phases or [],
+        }
+    if util.is_report_requested(
+        report_types, enumerations.ReportType.coverage
+    ):
+        document["coverage"] = {
+            nodeid: {
+                file_name: convert.lines_to_ranges(
+                    convert.bitmap_to_lines(bitmap)
+                )
+                for file_name, bitmap in file_bitmaps.items()
+            }
+            for nodeid, file_bitmaps in coverage_maps.items()
+        }
+    return document
+
+
+def write_results_document(
+    document: Dict[str, Any], output_file: Optional[Path], stream: TextIO
+) -> None:
+    """Write the results document to the output file or else to the stream."""
+    text = json.dumps(document, indent=2, default=str) + "\n"
+    if output_file is not None:
+        output_file.write_text(text, encoding="utf-8")
+    else:
+        stream.write(text)
+        stream.flush()
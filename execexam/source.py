@@ -0,0 +1,320 @@
+"""Extract the source code of the functions and the lines of a Python file."""
+
+import ast
+import hashlib
+import linecache
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+
+@dataclass(slots=True)
+class FunctionSource:
+    """The lines of a function, from its first decorator to its last line."""
+
+    name: str
+    class_name: Optional[str]
+    start: int
+    end: int
+    # the dotted names that the function calls (e.g., module.function)
+    calls: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ParsedFile:
+    """The lines of a parsed file and its functions, keyed by qualified name."""
+
+    modified: int
+    digest: str
+    lines: List[str]
+    functions: Dict[str, FunctionSource]
+    # the qualified name of each imported name, where the name of a
+    # relative import starts with a dot for each level (e.g., .module.name)
+    imports: Dict[str, str] = field(default_factory=dict)
+
+
+# the parsed files keyed by their path; note that a file is parsed
+# again when both the time at which it was last modified and the hash
+# of its contents change and thus the failing tests of a file and
+# the functions that they call are extracted after parsing it only once
+parsed_files: Dict[Path, ParsedFile] = {}
+
+
+def get_call_name(node: ast.expr) -> Optional[str]:
+    """Get the dotted name of the called function (e.g., module.function)."""
+    # a method of an object that a class creates (e.g., Square().area)
+    # is named after the class (e.g., Square.area); note that a call of
+    # the result of any other expression (e.g., items[0]) does not have a name
+    parts: List[str] = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Call):
+        class_name = get_call_name(node.func)
+        if class_name is None:
+            return None
+        parts.append(class_name)
+    elif isinstance(node, ast.Name):
+        parts.append(node.id)
+    else:
+        return None
+    return ".".join(reversed(parts))
+
+
+def find_calls(
+    node: Union[ast.FunctionDef, ast.AsyncFunctionDef],
+) -> List[str]:
+    """Find the names of the functions called in the body of the function, in order."""
+    # note that the calls in the decorators (e.g., the marks of a
+    # test) are not calls that the function makes when it runs
+    children = [
+        child for statement in node.body for child in ast.walk(statement)
+    ]
+    # find the variables that store an object that a class creates
+    # (e.g., square = Square()) so that the calls of its methods
+    # (e.g., square.area()) are named after the class (e.g., Square.area)
+    objects: Dict[str, str] = {}
+    for child in children:
+        if (
+            isinstance(child, ast.Assign)
+            and len(child.targets) == 1
+            and isinstance(child.targets[0], ast.Name)
+            and isinstance(child.value, ast.Call)
+        ):
+            class_name = get_call_name(child.value.func)
+            if class_name is not None:
+                objects[child.targets[0].id] = class_name
+    calls: Dict[str, None] = {}
+    for child in children:
+        if isinstance(child, ast.Call):
+            call_name = get_call_name(child.func)
+            if call_name is not None:
+                head, _, rest = call_name.partition(".")
+                if head in objects and rest:
+                    call_name = f"{objects[head]}.{rest}"
+                calls[call_name] = None
+    return list(calls)
+
+
+def find_imports(tree: ast.Module) -> Dict[str, str]:
+    """Find the qualified name of each name that the module imports."""
+    imports: Dict[str, str] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                # note that import a.b binds the name a to the package a
+                if alias.asname is not None:
+                    imports[alias.asname] = alias.name
+                else:
+                    name = alias.name.split(".", 1)[0]
+                    imports[name] = name
+        elif isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            for alias in node.names:
+                qualified_name = (
+                    f"{module}{alias.name}"
+                    if module.endswith(".") or not module
+                    else f"{module}.{alias.name}"
+                )
+                imports[alias.asname or alias.name] = qualified_name
+    return imports
+
+
+def index_functions(
+    body: List[ast.stmt],
+    class_name: Optional[str] = None,
+    functions: Optional[Dict[str, FunctionSource]] = None,
+) -> Dict[str, FunctionSource]:
+    """Index the functions and the methods of the classes in the statements."""
+    if functions is None:
+        functions = {}
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            # the source of a function starts at its first decorator and
+            # a later function with the same name replaces the earlier one,
+            # which is the function that pytest collected and thus ran
+            start = min(
+                [node.lineno]
+                + [decorator.lineno for decorator in node.decorator_list]
+            )
+            qualified_name = (
+                node.name
+                if class_name is None
+                else f"{class_name}.{node.name}"
+            )
+            functions[qualified_name] = FunctionSource(
+                node.name,
+                class_name,
+                start,
+                node.end_lineno or node.lineno,
+                find_calls(node),
+            )
+        elif isinstance(node, ast.ClassDef):
+            # index the methods of the class, including nested classes
+            index_functions(
+                node.body,
+                node.name
+                if class_name is None
+                else f"{class_name}.{node.name}",
+                functions,
+            )
+    return functions
+
+
+def parse_file(path: Path) -> ParsedFile:
+    """Parse the file unless it was already parsed since it was last modified."""
+    modified = path.stat().st_mtime_ns
+    parsed_file = parsed_files.get(path)
+    if parsed_file is not None and parsed_file.modified == modified:
+        return parsed_file
+    # read the lines of the file through the cache of lines
+    # after discarding its lines if the file changed
+    linecache.checkcache(str(path))
+    lines = linecache.getlines(str(path))
+    text = "".join(lines)
+    # a file that was modified without changing its contents
+    # (e.g., by checking it out again) is not parsed again
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    if parsed_file is not None and parsed_file.digest == digest:
+        parsed_file.modified = modified
+        return parsed_file
+    tree = ast.parse(text, filename=str(path))
+    parsed_file = ParsedFile(
+        modified, digest, lines, index_functions(tree.body), find_imports(tree)
+    )
+    parsed_files[path] = parsed_file
+    return parsed_file
+
+
+def find_function(
+    parsed_file: ParsedFile, name: str
+) -> Optional[FunctionSource]:
+    """Find the function with the qualified name or, if there is not one, the method with the name."""
+    # remove the parameters of a parametrized test (e.g., test_add[1-2])
+    name = name.split("[", 1)[0]
+    function = parsed_file.functions.get(name)
+    if function is not None:
+        return function
+    for function in parsed_file.functions.values():
+        if function.name == name:
+            return function
+    return None
+
+
+def parse_file_if_possible(path: Path) -> Optional[ParsedFile]:
+    """Parse the file, if it exists and it is valid Python source code."""
+    # note that the file might have changed since the tests ran
+    # and thus a file that cannot be parsed does not have functions
+    try:
+        return parse_file(path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+def extract_function_source(path: Union[Path, str], name: str) -> str:
+    """Extract the source code of the function, including its decorators, from the file."""
+    # note that a function that the file no longer defines
+    # does not have any source code
+    path = Path(path)
+    parsed_file = parse_file_if_possible(path)
+    if parsed_file is None:
+        return ""
+    function = find_function(parsed_file, name)
+    if function is None:
+        return ""
+    return get_function_source(path, parsed_file, function)
+
+
+def get_function_source(
+    path: Path, parsed_file: ParsedFile, function: FunctionSource
+) -> str:
+    """Get the source code of the function in the parsed file, with a header."""
+    # create a header that names the file, the class of a method,
+    # and the first line of the function before its source code
+    header = f"# File: {path}"
+    if function.class_name is not None:
+        header += f" Class: {function.class_name}"
+    header += f" Line: {function.start}\n"
+    return header + "".join(
+        parsed_file.lines[function.start - 1 : function.end]
+    )
+
+
+@dataclass(slots=True)
+class LineIndex:
+    """The contents of a file with the offset at which each one of its lines starts."""
+
+    modified: int
+    data: bytes
+    offsets: List[int]
+
+    @property
+    def line_count(self) -> int:
+        """Count the lines of the file."""
+        # note that the offset after the newline at the end of
+        # the file is not the start of another line
+        if self.data.endswith(b"\n"):
+            return len(self.offsets) - 1
+        return len(self.offsets)
+
+    def get_lines(self, start: int, end: int) -> List[str]:
+        """Get the lines from the start line to the end line, numbered from one."""
+        start = max(start, 1)
+        end = min(end, self.line_count)
+        if start > end:
+            return []
+        # decode only the bytes of the requested lines and split them only
+        # at the newlines that the offsets count; note that splitlines would
+        # also split at other separators (e.g., a form feed) and thus shift
+        # the numbers of the lines that follow them
+        end_offset = (
+            self.offsets[end] if end < len(self.offsets) else len(self.data)
+        )
+        lines = (
+            self.data[self.offsets[start - 1] : end_offset]
+            .decode("utf-8", errors="replace")
+            .split("\n")
+        )
+        # the last requested line usually ends with a newline
+        if lines[-1] == "":
+            lines.pop()
+        return [line.rstrip("\r") for line in lines]
+
+
+# the line index of each file keyed by its path; note that the file is read
+# and indexed again only when the time at which it was modified changes and
+# thus many crash sites in the same file only read and index it once
+line_indexes: Dict[Path, LineIndex] = {}
+
+
+def index_lines(path: Path) -> LineIndex:
+    """Index the lines of the file unless they were already indexed since it was last modified."""
+    modified = path.stat().st_mtime_ns
+    line_index = line_indexes.get(path)
+    if line_index is not None and line_index.modified == modified:
+        return line_index
+    data = path.read_bytes()
+    line_index = LineIndex(
+        modified,
+        data,
+        [0] + [match.end() for match in re.finditer(b"\n", data)],
+    )
+    line_indexes[path] = line_index
+    return line_index
+
+
+def get_context_lines(
+    path: Path, lineno: int, context_lines: int
+) -> List[Tuple[int, str]]:
+    """Get the numbered lines of the file that surround the line, if it can be read."""
+    try:
+        line_index = index_lines(path)
+    except OSError:
+        return []
+    start = max(lineno - context_lines, 1)
+    return list(
+        enumerate(
+            line_index.get_lines(start, lineno + context_lines), start=start
+        )
+    )
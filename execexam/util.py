@@ -1,7 +1,68 @@
 """Utility functions for the execexam package."""
 
+import os
+from pathlib import Path
+from typing import List, Optional
+
 import pytest
 
+from . import enumerations
+
+
+def is_report_requested(
+    report_types: Optional[List[enumerations.ReportType]],
+    *display_report_types: enumerations.ReportType,
+) -> bool:
+    """Determine if any of the report types was requested, either directly or through all."""
+    if report_types is None:
+        return False
+    if enumerations.ReportType.all in report_types:
+        return True
+    return any(
+        display_report_type in report_types
+        for display_report_type in display_report_types
+    )
+
+
+def make_pytest_arguments(  # noqa: PLR0913
+    tests: Path,
+    maxfail: int,
+    mark: Optional[str] = None,
+    test_timeout: Optional[float] = None,
+    cpu_limit: Optional[int] = None,
+    memory_limit: Optional[int] = None,
+) -> List[str]:
+    """Make the arguments that run pytest for the tests without any output."""
+    pytest_arguments = [
+        "-q",
+        "-ra",
+        "-s",
+        "-p",
+        "no:logging",
+        "-p",
+        "no:warnings",
+        "--tb=no",
+        f"--maxfail={maxfail}",
+    ]
+    # there were test marks on the command-line and
+    # thus they should be run for the specified tests
+    # (note that marks can control which tests are run)
+    if mark:
+        pytest_arguments.extend(["-m", mark])
+    # the limits on the resources of each test are options of the execexam
+    # plugin, which fails a test that exceeds one of the limits
+    if test_timeout:
+        pytest_arguments.append(f"--execexam-timeout={test_timeout}")
+    if cpu_limit:
+        pytest_arguments.append(f"--execexam-cpu-limit={cpu_limit}")
+    if memory_limit:
+        pytest_arguments.append(f"--execexam-memory-limit={memory_limit}")
+    # note that when there were no test marks specified on the
+    # command-line all of the tests should be run based on the specified
+    # test file or test directory, which this provides to pytest
+    pytest_arguments.append(os.path.join(tests))
+    return pytest_arguments
+
 
 def determine_execexam_return_code(pytest_return_code: int) -> int:
     """Determine the return code for the execexam command by pytest code."""
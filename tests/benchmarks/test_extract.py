@@ -0,0 +1,105 @@
+"""Benchmarks for the functions in the extract.py file."""
+
+import gc
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from execexam import extract
+from execexam.pytest_plugin import ResultRecord
+
+# the numbers of lines of the synthetic outputs that are extracted
+line_counts = [10**3, 10**4, 10**5, 10**6]
+
+# the number of lines of the details of each test or each failing test
+lines_per_test = 4
+
+
+def make_output(line_count: int) -> str:
+    """Make the output of a test run where every tenth line reports a failure."""
+    return "".join(
+        f"FAILED test_exam.py::test_{index} - assert {index} == 0\n"
+        if index % 10 == 0
+        else f"test_exam.py::test_{index} PASSED\n"
+        for index in range(line_count)
+    )
+
+
+def make_test_reports(line_count: int) -> List[Dict[str, Any]]:
+    """Make the reports of the tests, each with a failing and a passing assertion."""
+    return [
+        {
+            "nodeid": f"tests/test_exam.py::test_{index}",
+            "assertions": [
+                {"Status": "Failed", "Line": "4", "Code": "value == 1"},
+            ],
+        }
+        for index in range(line_count // lines_per_test)
+    ]
+
+
+def make_results(line_count: int) -> Dict[str, Any]:
+    """Make the results of a test run where every test failed."""
+    tests = [
+        ResultRecord(
+            f"test_exam.py::test_{index}", "failed", 4, "assert 1 == 0"
+        )
+        for index in range(line_count // lines_per_test)
+    ]
+    return {
+        "root": "/project",
+        "summary": Counter({"failed": len(tests)}),
+        "tests": tests,
+    }
+
+
+def time_extraction(extraction: Callable[[], Any]) -> float:
+    """Time the extraction, taking the best of several repetitions."""
+    timings = []
+    for _ in range(3):
+        # disable garbage collection so that it does not
+        # add noise to the timing of the extraction
+        gc.disable()
+        start = time.perf_counter()
+        extraction()
+        timings.append(time.perf_counter() - start)
+        gc.enable()
+    return min(timings)
+
+
+@pytest.mark.benchmark
+def test_extraction_scales_linearly_with_the_lines():
+    """Confirm that the per-line cost of the extraction does not grow with the lines."""
+    per_line_costs: Dict[str, List[float]] = {}
+    for line_count in line_counts:
+        output = make_output(line_count)
+        test_reports = make_test_reports(line_count)
+        results = make_results(line_count)
+        extractions = {
+            "output": lambda: extract.extract_test_output("FAILED", output),
+            "output labels": lambda: (
+                extract.extract_test_output_multiple_labels(
+                    ["FAILED", "ERROR"], output
+                )
+            ),
+            "assertions": lambda: extract.extract_test_assertions_details(
+                test_reports
+            ),
+            "failing tests": lambda: extract.extract_failing_test_details(
+                results
+            ),
+        }
+        for label, extraction in extractions.items():
+            elapsed = time_extraction(extraction)
+            per_line_costs.setdefault(label, []).append(elapsed / line_count)
+            print(  # noqa: T201
+                f"\n{label:>14} {line_count:>8} lines:"
+                f" {elapsed * 1000:9.2f} ms total,"
+                f" {elapsed / line_count * 1e9:7.1f} ns per line"
+            )
+    # adding each line to a growing string would make the per-line
+    # cost grow with the number of lines in the worst case
+    for costs in per_line_costs.values():
+        assert costs[-1] < costs[0] * 3
@@ -0,0 +1,146 @@
+"""Benchmarks for running an executable examination through main."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+from typer.testing import CliRunner
+
+from execexam import main, pytest_plugin
+
+runner = CliRunner()
+
+# the number of tests in the generated examination, which are
+# spread across several test files, and the number of passing
+# assertions that each one of the tests runs
+test_count = 2000
+test_files = 20
+assertions_per_test = 5
+
+# the most time, in milliseconds, that displaying the TLDR summary
+# may take, which includes starting Python and importing execexam
+startup_budget_milliseconds = 1000
+
+# the modules that are slow to import and that the TLDR summary does not need
+deferred_modules = ["pytest", "openai", "litellm", "coverage", "validators"]
+
+# the combinations of reports for which the examination is timed;
+# note that the advice report is not included because it needs an LLM
+report_combinations = [
+    ["status"],
+    ["trace"],
+    ["failure"],
+    ["code"],
+    ["trace", "failure", "code"],
+]
+
+
+def create_examination(directory: Path) -> Path:
+    """Create an examination with many passing tests and return its test directory."""
+    tests = directory / "tests"
+    tests.mkdir()
+    # enable the hook for passing assertions so that the
+    # benchmark measures the cost of the hook when it is active
+    (directory / "pytest.ini").write_text(
+        "[pytest]\nenable_assertion_pass_hook = true\n"
+    )
+    tests_per_file = test_count // test_files
+    for file_index in range(test_files):
+        lines = ["def value():", "    return 1", ""]
+        for index in range(tests_per_file):
+            lines.append(f"def test_value_{index}():")
+            lines.append(f"    for _ in range({assertions_per_test}):")
+            lines.append("        assert value() == 1")
+            lines.append("")
+        test_file = tests / f"test_benchmark_exam_{file_index}.py"
+        test_file.write_text("\n".join(lines))
+    return tests
+
+
+def time_examination(
+    project: Path, tests: Path, report_types: List[str]
+) -> float:
+    """Time a run of the examination that produces the report types."""
+    # make sure that the test modules are imported again and that
+    # the plugin does not contain reports from an earlier run
+    for test_file in tests.glob("*.py"):
+        sys.modules.pop(test_file.stem, None)
+    pytest_plugin.reports.clear()
+    arguments = ["run", str(project), str(tests), "--no-fancy"]
+    for report_type in report_types:
+        arguments.extend(["--report", report_type])
+    start = time.perf_counter()
+    result = runner.invoke(main.cli, arguments)
+    elapsed = time.perf_counter() - start
+    assert result.exit_code == 0
+    return elapsed
+
+
+@pytest.mark.benchmark
+def test_examination_time_for_report_combinations(tmp_path):
+    """Compare the time to run an examination for each combination of reports."""
+    tests = create_examination(tmp_path)
+    # run the examination once before timing it so that every
+    # combination of reports uses the cached rewritten test modules
+    time_examination(tmp_path, tests, ["status"])
+    timings = {}
+    for report_types in report_combinations:
+        timings["+".join(report_types)] = time_examination(
+            tmp_path, tests, report_types
+        )
+    pytest_plugin.reports.clear()
+    for label, elapsed in timings.items():
+        print(f"\n{label:>20}: {elapsed:6.2f} s")  # noqa: T201
+    # the status report does not need any of the recording hooks
+    # and thus it should never be slower than the trace report
+    assert timings["status"] < timings["trace"]
+
+
+def parse_import_times(import_time_output: str) -> Dict[str, int]:
+    """Parse the output of python -X importtime into the cumulative microseconds of each module."""
+    import_times = {}
+    for line in import_time_output.splitlines():
+        # each line is "import time: self [us] | cumulative | module"
+        # and the first line is the header of these columns
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        import_times[module.strip()] = int(cumulative)
+    return import_times
+
+
+@pytest.mark.benchmark
+def test_tldr_startup_time_is_within_budget():
+    """Confirm that displaying the TLDR summary is fast and avoids the slow imports."""
+    command = [
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        "from execexam.main import cli; cli()",
+        "run",
+        "--tldr",
+    ]
+    # take the best of several repetitions to reduce noise
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        process = subprocess.run(
+            command, capture_output=True, text=True, check=True
+        )
+        timings.append(time.perf_counter() - start)
+    elapsed_milliseconds = min(timings) * 1000
+    import_times = parse_import_times(process.stderr)
+    slowest_imports = sorted(
+        import_times.items(), key=lambda item: item[1], reverse=True
+    )[:10]
+    print(f"\ntldr startup: {elapsed_milliseconds:8.2f} ms")  # noqa: T201
+    for module, cumulative in slowest_imports:
+        print(f"{module:>40}: {cumulative / 1000:8.2f} ms")  # noqa: T201
+    assert not [
+        module for module in deferred_modules if module in import_times
+    ]
+    assert elapsed_milliseconds < startup_budget_milliseconds
@@ -0,0 +1,54 @@
+"""Benchmarks for the hooks in the pytest_plugin.py file."""
+
+import gc
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from execexam import pytest_plugin
+
+# the numbers of tests for which the hook overhead is measured;
+# note that each test runs the same number of passing assertions
+test_counts = [500, 1000, 2000, 4000]
+assertions_per_test = 5
+
+
+def time_plugin_hooks(test_count: int) -> float:
+    """Time the plugin hooks for a run with the specified number of tests."""
+    pytest_plugin.reports.clear()
+    items = [
+        SimpleNamespace(nodeid=f"test_exam.py::test_{index}")
+        for index in range(test_count)
+    ]
+    # disable garbage collection so that it does not
+    # add noise to the timing of the plugin's hooks
+    gc.disable()
+    start = time.perf_counter()
+    for item in items:
+        pytest_plugin.record_test_run(item)
+        for lineno in range(assertions_per_test):
+            pytest_plugin.record_assertion_pass(
+                item, lineno, "value == 1", "assert 1 == 1"
+            )
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    pytest_plugin.reports.clear()
+    return elapsed
+
+
+@pytest.mark.benchmark
+def test_plugin_hook_overhead_scales_linearly():
+    """Confirm that the per-test cost of the plugin hooks does not grow with the test count."""
+    per_test_costs = []
+    for test_count in test_counts:
+        # take the best of several repetitions to reduce noise
+        elapsed = min(time_plugin_hooks(test_count) for _ in range(3))
+        per_test_costs.append(elapsed / test_count)
+        print(  # noqa: T201
+            f"\n{test_count:>6} tests: {elapsed * 1000:8.2f} ms total,"
+            f" {elapsed / test_count * 1e6:6.2f} µs per test"
+        )
+    # a linear scan for the report would make the per-test
+    # cost grow by a factor of eight across these test counts
+    assert per_test_costs[-1] < per_test_costs[0] * 3
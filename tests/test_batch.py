@@ -0,0 +1,203 @@
+"""Test cases for the batch.py file."""
+
+import csv
+import io
+import json
+import sys
+from pathlib import Path
+
+from execexam import batch
+from execexam import pytest_plugin as execexam_plugin
+from execexam.enumerations import OutputFormat
+
+OUTCOMES = [
+    {
+        "project": "submissions/alpha",
+        "status": "passed",
+        "exit_code": 0,
+        "duration": 1.5,
+        "summary": {"passed": 2, "total": 2, "collected": 2},
+        "failures": [],
+        "tests": [],
+    },
+    {
+        "project": "submissions/beta",
+        "status": "failed",
+        "exit_code": 1,
+        "duration": 2.25,
+        "summary": {"passed": 1, "failed": 1, "total": 2, "collected": 2},
+        "failures": [
+            {
+                "nodeid": "tests/test_q.py::test_q",
+                "outcome": "failed",
+                "lineno": 3,
+                "message": "assert 1 == 2",
+            }
+        ],
+        "tests": [],
+    },
+]
+
+
+def create_project(directory, passing=True, crashing=False):
+    """Create a project with a question and a test for the question."""
+    (directory / "tests").mkdir(parents=True)
+    answer = 2 if passing else 3
+    (directory / "tests" / "test_batch_question.py").write_text(
+        "import os\n"
+        "def test_answer():\n"
+        + ("    os._exit(1)\n" if crashing else "")
+        + f"    assert 1 + 1 == {answer}\n"
+    )
+
+
+def test_find_projects_with_glob(tmp_path):
+    """Confirm that the project directories that match the glob are found."""
+    for name in ["beta", "alpha"]:
+        (tmp_path / name).mkdir()
+    (tmp_path / "notes.txt").write_text("not a project\n")
+    assert batch.find_projects(str(tmp_path / "*")) == [
+        tmp_path / "alpha",
+        tmp_path / "beta",
+    ]
+
+
+def test_find_projects_with_manifest(tmp_path):
+    """Confirm that the projects in a manifest are relative to the manifest."""
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# the students\nalpha\n\n  beta  \n/absolute\n")
+    assert batch.find_projects(str(manifest)) == [
+        tmp_path / "alpha",
+        tmp_path / "beta",
+        Path("/absolute"),
+    ]
+
+
+def test_resolve_tests():
+    """Confirm that only absolute tests are shared by all of the projects."""
+    project = Path("submissions/alpha")
+    assert batch.resolve_tests(project, Path("tests")) == project / "tests"
+    assert batch.resolve_tests(project, Path("/exam/tests")) == Path(
+        "/exam/tests"
+    )
+
+
+def test_format_outcomes_as_json():
+    """Confirm that the outcomes are formatted as JSON with a summary."""
+    formatted = json.loads(batch.format_outcomes(OUTCOMES, OutputFormat.json))
+    assert formatted["summary"] == {
+        "projects": 2,
+        "passed": 1,
+        "failed": 1,
+        "error": 0,
+    }
+    assert formatted["projects"] == OUTCOMES
+
+
+def test_format_outcomes_as_csv():
+    """Confirm that the outcomes are formatted as a row for each project."""
+    rows = list(
+        csv.DictReader(
+            io.StringIO(batch.format_outcomes(OUTCOMES, OutputFormat.csv))
+        )
+    )
+    assert rows[1] == {
+        "project": "submissions/beta",
+        "status": "failed",
+        "exit_code": "1",
+        "passed": "1",
+        "failed": "1",
+        "error": "0",
+        "skipped": "0",
+        "total": "2",
+        "duration": "2.2500",
+        "failures": "tests/test_q.py::test_q",
+    }
+
+
+def test_grade_projects_isolates_a_crashing_project(tmp_path):
+    """Confirm that a project that crashes its worker does not affect others."""
+    create_project(tmp_path / "alpha")
+    create_project(tmp_path / "beta", passing=False)
+    create_project(tmp_path / "gamma", crashing=True)
+    outcomes = batch.grade_projects(
+        [tmp_path / "alpha", tmp_path / "beta", tmp_path / "gamma"],
+        Path("tests"),
+        10,
+        None,
+        2,
+    )
+    assert [outcome["status"] for outcome in outcomes] == [
+        "passed",
+        "failed",
+        "error",
+    ]
+    assert outcomes[1]["failures"][0]["nodeid"] == (
+        "test_batch_question.py::test_answer"
+    )
+    assert outcomes[1]["summary"]["failed"] == 1
+    assert "output" not in outcomes[0]
+
+
+def test_grade_projects_that_cannot_run_are_errors(tmp_path):
+    """Confirm that projects whose tests cannot run are errors instead of failures."""
+    # a test file that imports a missing module cannot be collected
+    (tmp_path / "broken" / "tests").mkdir(parents=True)
+    (tmp_path / "broken" / "tests" / "test_batch_broken.py").write_text(
+        "import batch_missing_question\ndef test_answer():\n    pass\n"
+    )
+    # a project without its tests and a project without any tests
+    (tmp_path / "missing").mkdir()
+    (tmp_path / "empty" / "tests").mkdir(parents=True)
+    outcomes = batch.grade_projects(
+        [tmp_path / "broken", tmp_path / "missing", tmp_path / "empty"],
+        Path("tests"),
+        10,
+        None,
+        2,
+    )
+    assert [outcome["status"] for outcome in outcomes] == ["error"] * 3
+    assert [outcome["exit_code"] for outcome in outcomes] == [2, 4, 5]
+    assert "INTERRUPTED" in outcomes[0]["message"]
+    # the test file that could not be collected is the failure
+    assert outcomes[0]["failures"] == [
+        {
+            "nodeid": "test_batch_broken.py",
+            "outcome": "error",
+            "lineno": None,
+            "message": "ModuleNotFoundError: No module named"
+            " 'batch_missing_question'",
+        }
+    ]
+
+
+def test_grade_projects_with_fork_server(tmp_path):
+    """Confirm that forked processes grade the projects and isolate a crash."""
+    create_project(tmp_path / "alpha")
+    create_project(tmp_path / "beta", passing=False)
+    create_project(tmp_path / "gamma", crashing=True)
+    outcomes = batch.grade_projects(
+        [tmp_path / "alpha", tmp_path / "beta", tmp_path / "gamma"],
+        Path("tests"),
+        10,
+        None,
+        2,
+        fork_server=True,
+    )
+    assert [outcome["status"] for outcome in outcomes] == [
+        "passed",
+        "failed",
+        "error",
+    ]
+    assert outcomes[1]["summary"]["failed"] == 1
+    assert "exited with code" in outcomes[2]["message"]
+
+
+def test_warm_fork_server_leaves_no_state():
+    """Confirm that warming the fork server does not leave its test behind."""
+    saved_path = list(sys.path)
+    batch.warm_fork_server(["-q", "-p", "no:cacheprovider", "tests"])
+    assert "execexam.main" in sys.modules
+    assert "test_execexam_warm" not in sys.modules
+    assert sys.path == saved_path
+    assert execexam_plugin.reports == {}
@@ -0,0 +1,113 @@
+"""Test cases for the cache.py file."""
+
+import os
+from collections import Counter
+
+from execexam import cache
+from execexam.pytest_plugin import ResultRecord
+
+
+def create_project(tmp_path):
+    """Create a small project with a question and a test file."""
+    (tmp_path / "questions").mkdir()
+    (tmp_path / "questions" / "question.py").write_text("x = 1\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_question.py").write_text(
+        "def test_one():\n    assert True\n"
+    )
+    return tmp_path
+
+
+def test_find_source_files_skips_hidden_and_virtual_environments(tmp_path):
+    """Confirm that only the project's own source files are found."""
+    project = create_project(tmp_path)
+    (project / "notes.txt").write_text("not a source file\n")
+    (project / "pytest.ini").write_text("[pytest]\n")
+    (project / ".venv").mkdir()
+    (project / ".venv" / "site.py").write_text("y = 2\n")
+    (project / "venv").mkdir()
+    (project / "venv" / "site.py").write_text("y = 2\n")
+    found = [
+        path.relative_to(project).as_posix()
+        for path in cache.find_source_files(project)
+    ]
+    assert found == [
+        "pytest.ini",
+        "questions/question.py",
+        "tests/test_question.py",
+    ]
+
+
+def test_compute_cache_key_changes_with_sources_and_options(tmp_path):
+    """Confirm that the key changes when the sources or the options change."""
+    project = create_project(tmp_path)
+    tests = project / "tests"
+    key = cache.compute_cache_key(project, tests, ["-q"], None)
+    # the same inputs always produce the same key
+    assert key == cache.compute_cache_key(project, tests, ["-q"], None)
+    # the arguments given to pytest (e.g., a mark expression) are in the key
+    assert key != cache.compute_cache_key(
+        project, tests, ["-q", "-m", "first"], None
+    )
+    # the requested reports are in the key
+    assert key != cache.compute_cache_key(project, tests, ["-q"], ["trace"])
+    # the contents of the project's source code are in the key
+    (project / "questions" / "question.py").write_text("x = 2\n")
+    assert key != cache.compute_cache_key(project, tests, ["-q"], None)
+
+
+def test_store_and_load_round_trip(tmp_path):
+    """Confirm that a stored cache entry is loaded with its records."""
+    results = {
+        "root": str(tmp_path),
+        "summary": Counter({"passed": 1, "total": 1, "collected": 1}),
+        "tests": [ResultRecord("test_a.py::test_a", call=0.5)],
+    }
+    reports = {"test_a.py::test_a": {"nodeid": "test_a.py::test_a"}}
+    cache.store(tmp_path, "key", 0, "output", reports, results)
+    entry = cache.load(tmp_path, "key")
+    assert entry is not None
+    assert entry["exit_code"] == 0
+    assert entry["output"] == "output"
+    assert entry["reports"] == reports
+    assert entry["results"]["summary"] == results["summary"]
+    assert entry["results"]["tests"] == results["tests"]
+    # version control ignores the contents of the cache directory
+    cache_directory = tmp_path / cache.CACHE_DIRECTORY
+    assert (cache_directory / ".gitignore").read_text() == "*\n"
+
+
+def test_load_missing_entry(tmp_path):
+    """Confirm that loading an entry that is not in the cache is a miss."""
+    assert cache.load(tmp_path, "missing") is None
+
+
+def test_store_skips_a_cache_that_cannot_be_written(tmp_path):
+    """Confirm that an entry is not stored when the cache directory cannot be created."""
+    (tmp_path / cache.CACHE_DIRECTORY).write_text("not a directory\n")
+    cache.store(tmp_path, "key", 0, "output", {}, None)
+    assert cache.load(tmp_path, "key") is None
+
+
+def test_store_evicts_least_recently_used_entries(tmp_path):
+    """Confirm that the least recently used entries are evicted first."""
+    cache_directory = tmp_path / cache.CACHE_DIRECTORY
+    for timestamp, key in enumerate(["first", "second"]):
+        cache.store(tmp_path, key, 0, "", {}, None, max_entries=2)
+        os.utime(cache_directory / f"{key}.json", (timestamp, timestamp))
+    # using the first entry makes the second one the least recently used
+    assert cache.load(tmp_path, "first") is not None
+    cache.store(tmp_path, "third", 0, "", {}, None, max_entries=2)
+    assert sorted(path.stem for path in cache_directory.glob("*.json")) == [
+        "first",
+        "third",
+    ]
+
+
+def test_store_evicts_entries_beyond_the_size_limit(tmp_path):
+    """Confirm that entries are evicted when the cache is too large."""
+    cache.store(tmp_path, "old", 0, "x" * 100, {}, None)
+    os.utime(tmp_path / cache.CACHE_DIRECTORY / "old.json", (0, 0))
+    cache.store(tmp_path, "new", 0, "x" * 100, {}, None, max_bytes=300)
+    assert cache.load(tmp_path, "old") is None
+    assert cache.load(tmp_path, "new") is not None
@@ -0,0 +1,141 @@
+"""Test cases for the callgraph.py file."""
+
+import pytest
+
+from execexam import callgraph, source
+
+
+@pytest.fixture(autouse=True)
+def clear_parsed_files():
+    """Fixture to remove the parsed files before each test."""
+    source.parsed_files.clear()
+
+
+@pytest.fixture
+def project(tmp_path):
+    """Create a project with a package, a module, and a test file."""
+    project = tmp_path / "project"
+    (project / "shapes").mkdir(parents=True)
+    (project / "shapes" / "__init__.py").write_text(
+        "from .area import compute_area\n"
+    )
+    (project / "shapes" / "area.py").write_text(
+        "from . import helpers\n"
+        "\n"
+        "\n"
+        "def compute_area(width, height):\n"
+        "    return helpers.multiply(width, height)\n"
+        "\n"
+        "\n"
+        "class Square:\n"
+        "    def __init__(self):\n"
+        "        self.size = 2\n"
+        "\n"
+        "    def area(self):\n"
+        "        return self.side() ** 2\n"
+        "\n"
+        "    def side(self):\n"
+        "        return 2\n"
+    )
+    (project / "shapes" / "helpers.py").write_text(
+        "def multiply(first, second):\n"
+        "    if second == 0:\n"
+        "        return 0\n"
+        "    return first + multiply(first, second - 1)\n"
+    )
+    (project / "questions.py").write_text(
+        "def question_one():\n    return 1\n\n\ndef unused():\n    return 0\n"
+    )
+    (project / "tests").mkdir()
+    (project / "tests" / "test_exam.py").write_text(
+        "import questions as q\n"
+        "from shapes import compute_area\n"
+        "from shapes.area import Square\n"
+        "\n"
+        "\n"
+        "def test_area():\n"
+        "    assert compute_area(2, 3) == q.question_one()\n"
+        "    assert len([1]) == 1\n"
+        "\n"
+        "\n"
+        "def test_square():\n"
+        "    square = Square()\n"
+        "    assert square.area() == Square().area()\n"
+    )
+    return project
+
+
+def test_call_graph_indexes_the_modules_of_the_project(project):
+    """Confirm that each source file of the project is a module."""
+    call_graph = callgraph.CallGraph(project)
+    assert set(call_graph.modules) == {
+        "questions",
+        "shapes",
+        "shapes.area",
+        "shapes.helpers",
+        "tests.test_exam",
+    }
+    # the files are only parsed when a call is resolved to them
+    assert source.parsed_files == {}
+
+
+def test_resolve_relative_name(project):
+    """Confirm that the relative imports are relative to the package."""
+    call_graph = callgraph.CallGraph(project)
+    assert call_graph.resolve_relative_name("shapes", ".area.f") == (
+        "shapes.area.f"
+    )
+    assert call_graph.resolve_relative_name("shapes.area", ".helpers") == (
+        "shapes.helpers"
+    )
+    assert call_graph.resolve_relative_name("shapes.area", "..questions") == (
+        "questions"
+    )
+    assert call_graph.resolve_relative_name("shapes.area", "os.path") == (
+        "os.path"
+    )
+
+
+def test_find_called_functions_through_imports(project):
+    """Confirm that the calls resolve through the imports and the packages."""
+    call_graph = callgraph.CallGraph(project)
+    called_functions = call_graph.find_called_functions(
+        project / "tests" / "test_exam.py", "test_area"
+    )
+    # the functions are found in the order in which they are called and
+    # the recursive function and the functions outside of the project
+    # (e.g., len) are only found once or not found at all
+    assert [
+        (path.name, function.name) for path, _, function in called_functions
+    ] == [
+        ("area.py", "compute_area"),
+        ("questions.py", "question_one"),
+        ("helpers.py", "multiply"),
+    ]
+
+
+def test_extract_called_function_sources_of_methods(project):
+    """Confirm that the source code of the methods of an object and of the methods they call is extracted."""
+    call_graph = callgraph.CallGraph(project)
+    area_file = project / "shapes" / "area.py"
+    assert call_graph.extract_called_function_sources(
+        project / "tests" / "test_exam.py", "test_square"
+    ) == [
+        f"# File: {area_file} Class: Square Line: 9\n"
+        "    def __init__(self):\n"
+        "        self.size = 2\n",
+        f"# File: {area_file} Class: Square Line: 12\n"
+        "    def area(self):\n"
+        "        return self.side() ** 2\n",
+        f"# File: {area_file} Class: Square Line: 15\n"
+        "    def side(self):\n"
+        "        return 2\n",
+    ]
+
+
+def test_find_called_functions_without_test(project):
+    """Confirm that a missing test or file does not call any functions."""
+    call_graph = callgraph.CallGraph(project)
+    test_file = project / "tests" / "test_exam.py"
+    assert call_graph.find_called_functions(test_file, "test_missing") == []
+    assert call_graph.find_called_functions(project / "missing.py", "f") == []
@@ -0,0 +1,86 @@
+"""Test cases for the capture.py file."""
+
+from execexam.capture import CaptureBuffer
+from execexam.extract import extract_test_output_multiple_labels
+
+
+def test_capture_buffer_keeps_small_output():
+    """Confirm that output below the limits is captured without any changes."""
+    captured_output = CaptureBuffer()
+    captured_output.write("first line\n")
+    captured_output.write("second line\n")
+    assert captured_output.getvalue() == "first line\nsecond line\n"
+    assert list(captured_output.iter_lines()) == ["first line", "second line"]
+    assert captured_output.total_bytes == len("first line\nsecond line\n")
+    assert captured_output.truncated_bytes == 0
+    captured_output.close()
+
+
+def test_capture_buffer_spills_to_disk():
+    """Confirm that output beyond the memory limit is kept in a temporary file."""
+    captured_output = CaptureBuffer(memory_bytes=16)
+    lines = [f"line {index}" for index in range(100)]
+    for line in lines:
+        captured_output.write(line + "\n")
+    assert list(captured_output.iter_lines()) == lines
+    assert captured_output.file._rolled  # type: ignore
+    captured_output.close()
+
+
+def test_capture_buffer_truncates_runaway_output():
+    """Confirm that the middle of runaway output is dropped and counted."""
+    captured_output = CaptureBuffer(max_bytes=20, tail_bytes=10)
+    captured_output.write("start of the output\n")
+    for _ in range(1000):
+        captured_output.write("runaway\n")
+    captured_output.write("FAILED x\n")
+    lines = list(captured_output.iter_lines())
+    assert captured_output.total_bytes == 20 + 8000 + 9
+    assert captured_output.truncated_bytes == 8000 + 9 - 10
+    assert lines[0] == "start of the output"
+    assert lines[1].startswith("WARNING: execexam truncated 7999 of the")
+    assert lines[-1] == "FAILED x"
+    # the lines that are streamed from the buffer match its value
+    assert captured_output.getvalue().splitlines() == lines
+    captured_output.close()
+
+
+def test_capture_buffer_keeps_line_across_head_and_tail():
+    """Confirm that a line that the limit of the start of the output cuts is kept whole."""
+    captured_output = CaptureBuffer(max_bytes=10, tail_bytes=100)
+    captured_output.write("start FAILED x\nnext line\n")
+    lines = list(captured_output.iter_lines())
+    assert lines == ["start FAILED x", "next line"]
+    assert captured_output.getvalue().splitlines() == lines
+    # the label of the line that is cut is still found
+    assert (
+        extract_test_output_multiple_labels(["FAILED"], lines)
+        == "start FAILED x\n"
+    )
+    captured_output.close()
+
+
+def test_filter_streamed_lines_of_capture_buffer():
+    """Confirm that the labels filter the lines that are streamed from the buffer."""
+    captured_output = CaptureBuffer(memory_bytes=8)
+    captured_output.write("This is a test output\nAnother line\nMore output\n")
+    assert (
+        extract_test_output_multiple_labels(
+            ["test", "More"], captured_output.iter_lines()
+        )
+        == "This is a test output\nMore output\n"
+    )
+    captured_output.close()
+
+
+def test_capture_buffer_streams_lines_across_chunks(monkeypatch):
+    """Confirm that lines and characters that span read chunks are kept whole."""
+    monkeypatch.setattr("execexam.capture.READ_CHUNK_BYTES", 3)
+    captured_output = CaptureBuffer()
+    captured_output.write("caf\u00e9 \u2714\r\nsecond line\nlast")
+    assert list(captured_output.iter_lines()) == [
+        "caf\u00e9 \u2714",
+        "second line",
+        "last",
+    ]
+    captured_output.close()
@@ -0,0 +1,48 @@
+"""Test cases for the config.py file."""
+
+from execexam import config
+
+DEFAULT_LABELS = ["FAILED", "ERROR"]
+
+
+def test_load_configuration(tmp_path):
+    """Confirm that the execexam table of the configuration file is loaded."""
+    (tmp_path / "pyproject.toml").write_text(
+        '[project]\nname = "exam"\n\n'
+        '[tool.execexam]\ntrace-labels = ["FAILED", "PASSED"]\n'
+    )
+    assert config.load_configuration(tmp_path) == {
+        "trace-labels": ["FAILED", "PASSED"]
+    }
+
+
+def test_load_configuration_without_table(tmp_path):
+    """Confirm that a missing or an invalid configuration file has no configuration."""
+    assert config.load_configuration(tmp_path) == {}
+    (tmp_path / "pyproject.toml").write_text('[project]\nname = "exam"\n')
+    assert config.load_configuration(tmp_path) == {}
+    (tmp_path / "pyproject.toml").write_text("[tool.execexam\n")
+    assert config.load_configuration(tmp_path) == {}
+
+
+def test_get_trace_labels():
+    """Confirm that the command-line labels replace the configured labels and the defaults."""
+    configuration = {"trace-labels": ["PASSED"]}
+    assert config.get_trace_labels(
+        ["SKIPPED"], configuration, DEFAULT_LABELS
+    ) == ["SKIPPED"]
+    assert config.get_trace_labels(None, configuration, DEFAULT_LABELS) == [
+        "PASSED"
+    ]
+    assert config.get_trace_labels([], {}, DEFAULT_LABELS) == DEFAULT_LABELS
+    # the labels in the configuration must be a list of strings
+    assert (
+        config.get_trace_labels(
+            None, {"trace-labels": "PASSED"}, DEFAULT_LABELS
+        )
+        == DEFAULT_LABELS
+    )
+    assert (
+        config.get_trace_labels(None, {"trace-labels": [1]}, DEFAULT_LABELS)
+        == DEFAULT_LABELS
+    )
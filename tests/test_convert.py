@@ -2,7 +2,12 @@
 
 from pathlib import Path
 
-from execexam.convert import path_to_string
+from execexam.convert import (
+    bitmap_to_lines,
+    lines_to_bitmap,
+    lines_to_ranges,
+    path_to_string,
+)
 
 
 def test_path_to_string():
@@ -19,3 +24,19 @@ def test_path_to_string():
     path = Path("/home/user/documents")
     result = path_to_string(path)
     assert result == "/home/user/documents"
+
+
+def test_lines_to_bitmap_and_back():
+    """Confirm that the line numbers survive a round trip through a bitmap."""
+    assert lines_to_bitmap([]) == 0
+    assert lines_to_bitmap([1, 3]) == 0b1010  # noqa: PLR2004
+    assert bitmap_to_lines(0b1010) == [1, 3]
+    lines = [2, 3, 4, 10, 500]
+    assert bitmap_to_lines(lines_to_bitmap(lines)) == lines
+
+
+def test_lines_to_ranges():
+    """Confirm that consecutive line numbers are displayed as ranges."""
+    assert lines_to_ranges([]) == ""
+    assert lines_to_ranges([7]) == "7"
+    assert lines_to_ranges([1, 2, 3, 7, 9, 10]) == "1-3, 7, 9-10"
@@ -0,0 +1,163 @@
+"""Test cases for the daemon.py file."""
+
+import io
+import os
+import socketserver
+import sys
+import threading
+import types
+
+import click
+import pytest
+import typer
+from rich.console import Console
+
+from execexam import daemon, main, source
+from execexam import debug as debugger
+from execexam import pytest_plugin as execexam_plugin
+
+
+def make_context(arguments):
+    """Make the context of the run command for the command-line arguments."""
+    run_command = typer.main.get_command(main.cli).commands["run"]  # type: ignore
+    return run_command.make_context("run", arguments)
+
+
+def test_make_run_arguments_repeats_the_parameters():
+    """Confirm that the arguments repeat the parameters of the run command."""
+    context = make_context(
+        [
+            "project",
+            "tests",
+            "--report",
+            "trace",
+            "--report",
+            "status",
+            "--no-fancy",
+            "--mark",
+            "first",
+            "--via-daemon",
+        ]
+    )
+    arguments = daemon.make_run_arguments(context)
+    assert arguments[:2] == ["project", "tests"]
+    assert arguments.count("--report") == 2  # noqa: PLR2004
+    assert ["--report", "trace"] == arguments[2:4]
+    assert ["--mark", "first"] == arguments[6:8]
+    assert "--no-fancy" in arguments
+    # the options that only the client uses are not forwarded
+    assert "--via-daemon" not in arguments
+    assert "--daemon-socket" not in arguments
+    # the forwarded arguments produce the same parameters
+    forwarded_context = make_context(arguments)
+    for name, value in context.params.items():
+        if name not in daemon.CLIENT_PARAMETERS:
+            assert forwarded_context.params[name] == value
+
+
+def test_get_default_socket_in_a_private_directory(tmp_path, monkeypatch):
+    """Confirm that the default socket is in a directory that only the user can access."""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert daemon.get_default_socket() == tmp_path / daemon.SOCKET_NAME
+    # without a runtime directory, the socket is in a private temporary directory
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+    socket_directory = daemon.get_socket_directory()
+    assert socket_directory == tmp_path / f"execexam-{os.getuid()}"
+    assert socket_directory.stat().st_mode & 0o777 == 0o700  # noqa: PLR2004
+    # a directory that other users can access is not used
+    socket_directory.chmod(0o755)
+    with pytest.raises(click.ClickException):
+        daemon.get_socket_directory()
+
+
+def test_reset_state_removes_the_project_modules(tmp_path, monkeypatch):
+    """Confirm that the state of a request does not leak into the next one."""
+    saved_path = list(sys.path)
+    saved_modules = set(sys.modules)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    # simulate a request that imported a module from the project
+    # and that recorded details about the tests and debugging messages
+    sys.path.append(str(tmp_path))
+    question = types.ModuleType("daemon_question")
+    question.__file__ = str(tmp_path / "daemon_question.py")
+    monkeypatch.setitem(sys.modules, "daemon_question", question)
+    execexam_plugin.reports["test_q.py::test_q"] = {"nodeid": "test_q.py"}
+    execexam_plugin.coverage_maps["test_q.py::test_q"] = {}
+    debugger.messages.append("message")
+    (tmp_path / "lines.py").write_text("line\n")
+    source.index_lines(tmp_path / "lines.py")
+    daemon.reset_state(saved_path, saved_modules, tmp_path / "elsewhere")
+    assert "daemon_question" not in sys.modules
+    assert sys.path == saved_path
+    assert execexam_plugin.reports == {}
+    assert execexam_plugin.coverage_maps == {}
+    assert debugger.messages == []
+    assert source.line_indexes == {}
+    assert source.parsed_files == {}
+
+
+def test_run_request_uses_the_environment_of_the_client(tmp_path):
+    """Confirm that the tests of a request run in the client's environment."""
+    (tmp_path / "test_daemon_environment.py").write_text(
+        "import os\n"
+        "def test_environment():\n"
+        "    assert os.environ['EXECEXAM_DAEMON_VALUE'] == 'client'\n"
+    )
+    request = {
+        "arguments": [
+            str(tmp_path),
+            str(tmp_path / "test_daemon_environment.py"),
+            "--report",
+            "status",
+            "--no-fancy",
+        ],
+        "directory": str(tmp_path),
+        "environment": {**os.environ, "EXECEXAM_DAEMON_VALUE": "client"},
+        "terminal": False,
+        "color_system": None,
+        "width": 80,
+    }
+    stream = io.BytesIO()
+    assert daemon.run_request(request, stream) == 0
+    assert b"All checks passed" in stream.getvalue()
+    # the environment of the daemon is restored after the request
+    assert "EXECEXAM_DAEMON_VALUE" not in os.environ
+
+
+def test_request_run_streams_the_output(tmp_path):
+    """Confirm that the daemon runs a request and streams its output."""
+    (tmp_path / "daemon_answer.py").write_text("ANSWER = 42\n")
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_daemon_answer.py").write_text(
+        "from daemon_answer import ANSWER\n"
+        "def test_answer():\n"
+        "    assert ANSWER == 42\n"
+    )
+    socket_path = tmp_path / "execexam.sock"
+    server = socketserver.UnixStreamServer(
+        str(socket_path), daemon.RunRequestHandler
+    )
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    try:
+        output = io.StringIO()
+        exit_code = daemon.request_run(
+            socket_path,
+            [
+                str(tmp_path),
+                str(tmp_path / "tests"),
+                "--report",
+                "status",
+                "--no-fancy",
+            ],
+            Console(file=output, width=80),
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+    assert exit_code == 0
+    assert "All checks passed" in output.getvalue()
+    # the module of the project is imported again by the next request
+    assert "daemon_answer" not in sys.modules
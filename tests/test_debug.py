@@ -1,7 +1,11 @@
 """Test cases for the debug.py file."""
 
+import json
+import threading
+
 import pytest
 
+from execexam import debug as debugger
 from execexam.debug import (
     Debug,
     debug,
@@ -13,8 +17,10 @@ from execexam.debug import (
 
 @pytest.fixture(autouse=True)
 def clear_messages():
-    """Fixture to clear messages before each test."""
-    messages.clear()
+    """Fixture to clear messages and events and stop recording before each test."""
+    debugger.reset()
+    yield
+    debugger.reset()
 
 
 def test_enum_values():
@@ -75,3 +81,64 @@ def test_get_debugging_messages():
     assert get_debugging_messages() == ""
     messages.append("Test message")
     assert get_debugging_messages() == "\nTest message\n"
+
+
+def test_events_only_recorded_when_recording():
+    """Test that spans and messages are only events when recording."""
+    with debugger.span("not recorded"):
+        pass
+    debug(True, Debug.started_litellm_thread.value)
+    assert debugger.events == []
+    assert messages == [Debug.started_litellm_thread.value]
+
+
+def test_span_records_event_with_fields():
+    """Test that a span records its duration, thread, and fields."""
+    debugger.start_recording()
+    with debugger.span("run tests", workers=2) as fields:
+        fields["tests"] = 3
+    debug(False, Debug.started_litellm_thread.value, model="model")
+    span_event, message_event = debugger.events
+    assert span_event.name == "run tests"
+    assert span_event.duration > 0
+    assert span_event.thread_name == threading.current_thread().name
+    assert span_event.fields == {"workers": 2, "tests": 3}
+    # a message is an instant event named after the message, even
+    # when the message itself was not added to the messages
+    assert message_event.name == "started_litellm_thread"
+    assert message_event.duration == 0.0
+    assert message_event.fields == {"model": "model"}
+    assert messages == []
+
+
+def test_write_chrome_trace_with_threads(tmp_path):
+    """Test that the trace has complete, instant, and thread name events."""
+    debugger.start_recording()
+
+    def load():
+        with debugger.span("load litellm"):
+            pass
+
+    thread = threading.Thread(target=load, name="litellm-loader")
+    thread.start()
+    thread.join()
+    debug(True, Debug.stopped_litellm_thread.value)
+    trace_file = tmp_path / "trace.json"
+    debugger.write_chrome_trace(trace_file)
+    trace = json.loads(trace_file.read_text())
+    trace_events = trace["traceEvents"]
+    thread_names = {
+        event["args"]["name"] for event in trace_events if event["ph"] == "M"
+    }
+    assert thread_names == {"litellm-loader", threading.current_thread().name}
+    load_event, message_event = [
+        event for event in trace_events if event["ph"] != "M"
+    ]
+    assert load_event["name"] == "load litellm"
+    assert load_event["ph"] == "X"
+    assert load_event["dur"] > 0
+    assert message_event["name"] == "stopped_litellm_thread"
+    assert message_event["ph"] == "i"
+    assert message_event["tid"] != load_event["tid"]
+    # the timestamps of the format are in microseconds
+    assert message_event["ts"] >= load_event["ts"] + load_event["dur"]
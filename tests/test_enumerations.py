@@ -51,6 +51,9 @@ def test_report_type_enum_values():
     assert ReportType.testtrace.value == "trace"
     assert ReportType.testadvice.value == "advice"
     assert ReportType.setup.value == "setup"
+    assert ReportType.timing.value == "timing"
+    assert ReportType.coverage.value == "coverage"
+    assert ReportType.context.value == "context"
 
 
 def test_report_type_enum_access_by_name():
@@ -63,6 +66,9 @@ def test_report_type_enum_access_by_name():
     assert ReportType["testtrace"] == ReportType.testtrace
     assert ReportType["testadvice"] == ReportType.testadvice
     assert ReportType["setup"] == ReportType.setup
+    assert ReportType["timing"] == ReportType.timing
+    assert ReportType["coverage"] == ReportType.coverage
+    assert ReportType["context"] == ReportType.context
 
 
 def test_report_type_enum_invalid_name():
@@ -6,17 +6,29 @@ import pytest
 from hypothesis import given, settings
 from hypothesis.strategies import dictionaries, text
 
+from execexam.convert import path_to_string
 from execexam.extract import (
+    LabelMatcher,
+    extract_crash_context_details,
     extract_details,
     extract_failing_test_details,
+    extract_phase_timing_details,
     extract_test_assertion_details,
     extract_test_assertion_details_list,
+    extract_test_assertion_summary,
     extract_test_assertions_details,
+    extract_test_coverage_details,
     extract_test_output,
     extract_test_output_multiple_labels,
     extract_test_run_details,
+    extract_test_timing_details,
     is_failing_test_details_empty,
+    iter_failing_tests,
+    iter_test_assertions_details,
+    iter_test_output_multiple_labels,
+    select_context_frames,
 )
+from execexam.pytest_plugin import ResultRecord
 
 
 def test_extract_details():
@@ -102,6 +114,48 @@ def test_extract_test_assertion_details_list():
     )
 
 
+def test_extract_test_assertion_summary():
+    """Confirm that an aggregated assertion is summarized on a single line."""
+    test_details = {
+        "Status": "Passed",
+        "Line": "12",
+        "Code": "square(x) == x * x",
+        "Count": 1000,
+        "First": "assert 0 == 0",
+        "Last": "assert 81 == 81",
+    }
+    expected_output = (
+        "  - Passed: Line 12 (1000x), Code: square(x) == x * x,"
+        " First: assert 0 == 0, Last: assert 81 == 81\n"
+    )
+    assert extract_test_assertion_summary(test_details) == expected_output
+
+
+def test_extract_test_assertion_details_list_with_aggregated_assertion():
+    """Confirm that aggregated and individual assertions are both extracted."""
+    test_details_list = [
+        {
+            "Status": "Passed",
+            "Line": "3",
+            "Code": "x == 1",
+            "Count": 2,
+            "First": "assert 1 == 1",
+            "Last": "assert 1 == 1",
+        },
+        {"Status": "Failed", "Line": "4"},
+    ]
+    expected_output = (
+        "  - Passed: Line 3 (2x), Code: x == 1,"
+        " First: assert 1 == 1, Last: assert 1 == 1\n"
+        "  - Status: Failed\n"
+        "    Line: 4\n"
+    )
+    assert (
+        extract_test_assertion_details_list(test_details_list)
+        == expected_output
+    )
+
+
 def test_extract_test_assertions_details():
     """Confirm that extracting details about test assertions works."""
     test_reports = [
@@ -135,22 +189,100 @@ def test_extract_test_assertions_details():
     assert extract_test_assertions_details(test_reports) == expected_output
 
 
+def test_label_matcher_counts_the_lines_of_each_label():
+    """Confirm that the matcher finds the lines with any label and counts them."""
+    matcher = LabelMatcher(["ERROR", "COLLECTERROR", "a.b"], count=True)
+    lines = [
+        "COLLECTERROR tests/test_a.py",
+        "ERROR and COLLECTERROR",
+        "PASSED a.b",
+        "PASSED axb",
+    ]
+    assert [line for line in lines if matcher.matches(line)] == lines[:3]
+    # a line counts for every label inside of it, even when one of the
+    # labels contains another, and the labels are literal text
+    assert matcher.counts == {"ERROR": 2, "COLLECTERROR": 2, "a.b": 1}
+
+
+def test_label_matcher_counts_nested_labels():
+    """Confirm that a line with a label inside of another label counts for both."""
+    matcher = LabelMatcher(["COLLECTERROR", "ERROR"], count=True)
+    output = "ERROR x\nCOLLECTERROR y\nERROR z\nPASSED w\n"
+    assert (
+        extract_test_output_multiple_labels(matcher, output)
+        == "ERROR x\nCOLLECTERROR y\nERROR z\n"
+    )
+    assert matcher.counts == {"ERROR": 3, "COLLECTERROR": 1}
+
+
+def test_label_matcher_without_labels_or_counts():
+    """Confirm that no line matches without labels and that counting is optional."""
+    assert not LabelMatcher([]).matches("FAILED test_a.py::test_one")
+    matcher = LabelMatcher(["FAILED"])
+    assert (
+        extract_test_output_multiple_labels(
+            matcher, ["FAILED one", "PASSED two"]
+        )
+        == "FAILED one\n"
+    )
+    assert matcher.counts == {"FAILED": 0}
+
+
+def test_iter_failing_tests():
+    """Confirm that iterating through the failing tests yields their records."""
+    details = {
+        "root": "/project",
+        "tests": [
+            ResultRecord("tests/test_a.py::test_pass"),
+            ResultRecord("tests/test_a.py::test_one", "failed", 3, "one"),
+            ResultRecord(
+                "tests/test_a.py::TestB::test_two", "failed", 8, None
+            ),
+        ],
+    }
+    failing_tests = list(iter_failing_tests(details))
+    assert [
+        (test.nodeid, test.test_name, test.lineno, test.message)
+        for test in failing_tests
+    ] == [
+        ("tests/test_a.py::test_one", "test_one", 3, "one"),
+        ("tests/test_a.py::TestB::test_two", "test_two", 8, None),
+    ]
+    # the tests in the same file share the path of the file
+    assert failing_tests[0].test_path == Path("/project/tests/test_a.py")
+    assert failing_tests[0].test_path is failing_tests[1].test_path
+
+
+def test_iter_test_output_and_assertions_are_lazy():
+    """Confirm that the generators only consume the input that they need."""
+    lines = iter(["PASSED one", "FAILED two", "FAILED three"])
+    filtered_lines = iter_test_output_multiple_labels(["FAILED"], lines)
+    assert next(filtered_lines) == "FAILED two"
+    assert list(lines) == ["FAILED three"]
+    test_reports = iter([{"nodeid": "tests/test_a.py::test_one"}, {}])
+    assertions_details = iter_test_assertions_details(test_reports)
+    assert next(assertions_details) == "\ntest_a.py::test_one\n"
+    assert list(test_reports) == [{}]
+
+
 def test_extract_failing_test_details():
     """Confirm that extracting details about the failing tests works."""
     # define a dictionary that contains details about failing tests
     failing_test_details = {
         "root": "/home/user/project",
         "tests": [
-            {
-                "outcome": "failed",
-                "nodeid": "test_module.py::test_function",
-                "call": {"crash": {"lineno": 10, "message": "AssertionError"}},
-            },
-            {
-                "outcome": "passed",
-                "nodeid": "test_module.py::test_function2",
-                "call": {"crash": {"lineno": 20, "message": "AssertionError"}},
-            },
+            ResultRecord(
+                "test_module.py::test_function",
+                "failed",
+                10,
+                "AssertionError",
+            ),
+            ResultRecord(
+                "test_module.py::test_function2",
+                "passed",
+                20,
+                "AssertionError",
+            ),
         ],
     }
     # call the function with the failing test details
@@ -168,6 +300,129 @@ def test_extract_failing_test_details():
     )
 
 
+def test_select_context_frames(tmp_path):
+    """Confirm that the test, the failing project frame, and the crash site are selected."""
+    project = tmp_path / "project"
+    test_file = str(project / "tests" / "test_exam.py")
+    project_file = str(project / "questions.py")
+    library_file = str(tmp_path / "library.py")
+    frames = [
+        (test_file, 5),
+        (project_file, 2),
+        (project_file, 8),
+        (library_file, 20),
+    ]
+    assert select_context_frames(frames, project) == [
+        ("Test", test_file, 5),
+        ("Project", project_file, 8),
+        ("Crash site", library_file, 20),
+    ]
+    # the crash site in the project has both roles and there
+    # is no failing project frame without a project
+    assert select_context_frames(frames[:2], project) == [
+        ("Test", test_file, 5),
+        ("Project and crash site", project_file, 2),
+    ]
+    assert select_context_frames(frames[:1], None) == [
+        ("Test and crash site", test_file, 5)
+    ]
+    assert select_context_frames([], project) == []
+
+
+def test_extract_crash_context_details(tmp_path):
+    """Confirm that extracting the lines around the crash sites works."""
+    test_file = tmp_path / "test_exam.py"
+    test_file.write_text(
+        "def test_pass():\n"
+        "    assert True\n"
+        "def test_fail():\n"
+        "    values = [1]\n"
+        "    assert values[0] == 2\n"
+    )
+    details = {
+        "tests": [
+            ResultRecord("test_exam.py::test_pass"),
+            ResultRecord(
+                "test_exam.py::test_fail",
+                "failed",
+                5,
+                frames=[(str(test_file), 5)],
+            ),
+        ]
+    }
+    result = extract_crash_context_details(details, tmp_path, 1)
+    assert result == (
+        "\n"
+        "  Name: test_exam.py::test_fail\n"
+        f"  Test and crash site: {path_to_string(test_file, 4)}:5\n"
+        "    4 |     values = [1]\n"
+        "  > 5 |     assert values[0] == 2\n"
+    )
+
+
+def test_extract_phase_timing_details():
+    """Confirm that extracting the table of the phases of a run works."""
+    run_phases = [
+        {"name": "import modules", "start": 0.0, "duration": 0.25},
+        {"name": "run pytest", "start": 0.25, "duration": 1.5},
+    ]
+    result = extract_phase_timing_details(run_phases)
+    assert result == (
+        "\n"
+        "  Phase                             Start   Duration\n"
+        "  import modules                  0.0000s    0.2500s\n"
+        "  run pytest                      0.2500s    1.5000s\n"
+    )
+
+
+def test_extract_test_timing_details():
+    """Confirm that extracting the slowest tests and the phase totals works."""
+    timing_details = {
+        "tests": [
+            ResultRecord("test_module.py::test_fast", "passed", setup=0.5),
+            ResultRecord(
+                "test_module.py::test_slow",
+                "failed",
+                3,
+                "AssertionError",
+                setup=0.25,
+                call=2.0,
+                teardown=0.25,
+            ),
+            ResultRecord("test_module.py::test_medium", call=1.0),
+        ],
+    }
+    result = extract_test_timing_details(timing_details, slowest=2)
+    assert result == (
+        "\n"
+        "  Slowest 2 test(s) (setup + call + teardown):\n"
+        "  - 2.5000s test_module.py::test_slow (0.2500s + 2.0000s + 0.2500s)\n"
+        "  - 1.0000s test_module.py::test_medium (0.0000s + 1.0000s + 0.0000s)\n"
+        "  Total time per phase:\n"
+        "  - setup: 0.7500s\n"
+        "  - call: 3.0000s\n"
+        "  - teardown: 0.2500s\n"
+        "  - total: 4.0000s\n"
+    )
+
+
+def test_extract_test_coverage_details():
+    """Confirm that extracting the lines covered by each test works."""
+    coverage_maps = {
+        "tests/test_module.py::test_one": {
+            "questions/question.py": 0b10001110,
+            "tests/test_module.py": 0b100,
+        },
+        "tests/test_module.py::test_two": {},
+    }
+    assert extract_test_coverage_details(coverage_maps) == (
+        "\ntest_module.py::test_one\n"
+        "  - questions/question.py: 1-3, 7\n"
+        "  - tests/test_module.py: 2\n"
+        "\ntest_module.py::test_two\n"
+    )
+
+
 def test_extract_test_output_with_label():
     """Confirm correct filtering out of the lines that contain the label."""
     # define a string that contains the label
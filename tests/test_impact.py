@@ -0,0 +1,163 @@
+"""Test cases for the impact.py file."""
+
+from execexam import cache, impact
+from execexam.convert import bitmap_to_lines, lines_to_bitmap
+from execexam.pytest_plugin import ResultRecord
+
+QUESTION = (
+    "LIMIT = 3\n"
+    "\n"
+    "\n"
+    "@staticmethod\n"
+    "def double(x):\n"
+    "    return x * 2\n"
+    "\n"
+    "\n"
+    "def square(x):\n"
+    "    result = x * x\n"
+    "    return result\n"
+)
+
+
+def create_snapshot(sources):
+    """Create a snapshot where one test covered each of the functions."""
+    return {
+        "sources": sources,
+        "coverage": {
+            "test_q.py::test_double": {"q.py": lines_to_bitmap([6])},
+            "test_q.py::test_square": {"q.py": lines_to_bitmap([10, 11])},
+            "test_q.py::test_failing": {"q.py": lines_to_bitmap([6])},
+        },
+        "outcomes": {
+            "test_q.py::test_double": "passed",
+            "test_q.py::test_square": "passed",
+            "test_q.py::test_failing": "failed",
+        },
+    }
+
+
+def test_find_module_level_lines():
+    """Confirm that only the lines that run on import are module level."""
+    assert bitmap_to_lines(impact.find_module_level_lines(QUESTION)) == [
+        1,
+        4,
+        5,
+        9,
+    ]
+    # a module that cannot be parsed has all of its lines at the module level
+    assert impact.find_module_level_lines("def broken(:\n") == -1
+
+
+def test_compare_sources():
+    """Confirm that the changed, inserted, and unchanged lines are found."""
+    new_text = QUESTION.replace("    return x * 2\n", "    return x + x\n")
+    new_text = new_text.replace(
+        "    return result\n", "    result += 0\n    return result\n"
+    )
+    source_change = impact.compare_sources(QUESTION, new_text)
+    assert bitmap_to_lines(source_change.changed) == [6]
+    assert bitmap_to_lines(source_change.inserted) == [6, 11]
+    assert bitmap_to_lines(source_change.neighbours) == [10, 11]
+    assert source_change.line_map[10] == 10  # noqa: PLR2004
+    assert source_change.line_map[11] == 12  # noqa: PLR2004
+
+
+def test_find_source_changes_for_function_bodies():
+    """Confirm that a change inside of a function only changes its lines."""
+    new_text = QUESTION.replace("x * x", "x ** 2")
+    source_changes = impact.find_source_changes(
+        {"q.py": QUESTION, "test_q.py": "x = 1\n"},
+        {"q.py": new_text, "test_q.py": "x = 1\n", "new.py": "y = 2\n"},
+    )
+    assert source_changes is not None
+    assert list(source_changes) == ["q.py"]
+    assert bitmap_to_lines(source_changes["q.py"].changed) == [10]
+
+
+def test_find_source_changes_that_affect_every_test():
+    """Confirm that some changes affect all of the tests."""
+    sources = {"q.py": QUESTION, "pytest.ini": "[pytest]\n"}
+    # a change to the lines that run when the module is imported
+    changed = {**sources, "q.py": QUESTION.replace("LIMIT = 3", "LIMIT = 4")}
+    assert impact.find_source_changes(sources, changed) is None
+    # a change to the signature of a function
+    changed = {**sources, "q.py": QUESTION.replace("(x)", "(y)")}
+    assert impact.find_source_changes(sources, changed) is None
+    # a change to a configuration file
+    changed = {**sources, "pytest.ini": "[pytest]\naddopts = -x\n"}
+    assert impact.find_source_changes(sources, changed) is None
+    # the deletion of a source file
+    assert impact.find_source_changes(sources, {"pytest.ini": "x"}) is None
+
+
+def test_find_unaffected_tests():
+    """Confirm that the passing tests that did not cover changes are unaffected."""
+    new_text = QUESTION.replace("x * x", "x ** 2")
+    snapshot = create_snapshot({"q.py": QUESTION})
+    source_changes = impact.find_source_changes(
+        snapshot["sources"], {"q.py": new_text}
+    )
+    assert source_changes is not None
+    # note that the failing test is never unaffected
+    assert impact.find_unaffected_tests(snapshot, source_changes) == {
+        "test_q.py::test_double"
+    }
+
+
+def test_update_snapshot_moves_the_lines_of_unaffected_tests():
+    """Confirm that the lines of the tests that did not run are moved."""
+    new_text = "# a new first line\n" + QUESTION.replace("x * x", "x ** 2")
+    snapshot = create_snapshot({"q.py": QUESTION})
+    source_changes = impact.find_source_changes(
+        snapshot["sources"], {"q.py": new_text}
+    )
+    assert source_changes is not None
+    unaffected_tests = impact.find_unaffected_tests(snapshot, source_changes)
+    coverage_maps = {"test_q.py::test_square": {"q.py": lines_to_bitmap([11])}}
+    results = {"tests": [ResultRecord("test_q.py::test_square")]}
+    new_snapshot = impact.update_snapshot(
+        snapshot,
+        source_changes,
+        {"q.py": new_text},
+        unaffected_tests,
+        coverage_maps,
+        results,
+    )
+    assert new_snapshot == {
+        "sources": {"q.py": new_text},
+        "coverage": {
+            "test_q.py::test_double": {"q.py": lines_to_bitmap([7])},
+            "test_q.py::test_square": {"q.py": lines_to_bitmap([11])},
+        },
+        "outcomes": {
+            "test_q.py::test_double": "passed",
+            "test_q.py::test_square": "passed",
+        },
+    }
+
+
+def test_save_and_load_snapshot(tmp_path):
+    """Confirm that a saved snapshot is loaded again."""
+    assert impact.load_snapshot(tmp_path) is None
+    snapshot = create_snapshot({"q.py": QUESTION})
+    impact.save_snapshot(tmp_path, snapshot)
+    assert impact.load_snapshot(tmp_path) == snapshot
+
+
+def test_save_snapshot_that_cannot_be_written(tmp_path):
+    """Confirm that a snapshot that cannot be written is skipped."""
+    (tmp_path / cache.CACHE_DIRECTORY).write_text("not a directory\n")
+    impact.save_snapshot(tmp_path, create_snapshot({"q.py": QUESTION}))
+    assert impact.load_snapshot(tmp_path) is None
+
+
+def test_read_sources(tmp_path):
+    """Confirm that the sources are named relative to the project."""
+    (tmp_path / "questions").mkdir()
+    (tmp_path / "questions" / "q.py").write_text(QUESTION)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_q.py").write_text("x = 1\n")
+    assert impact.read_sources(tmp_path, tmp_path / "tests") == {
+        "questions/q.py": QUESTION,
+        "tests/test_q.py": "x = 1\n",
+    }
@@ -0,0 +1,166 @@
+"""Test cases for the parallel.py file."""
+
+import pytest
+
+from execexam import parallel
+from execexam import pytest_plugin as execexam_plugin
+from execexam.enumerations import ReportType
+from execexam.pytest_plugin import ResultRecord
+
+
+def test_merge_exit_codes_all_passed():
+    """Confirm that workers that all passed produce a passing exit code."""
+    assert parallel.merge_exit_codes([0, 0]) == 0
+
+
+def test_merge_exit_codes_ignores_workers_without_tests():
+    """Confirm that a worker without any tests does not change the exit code."""
+    assert parallel.merge_exit_codes([0, 5]) == 0
+    assert parallel.merge_exit_codes([1, 5]) == 1
+    assert parallel.merge_exit_codes([5, 5]) == 5  # noqa: PLR2004
+
+
+def test_merge_exit_codes_uses_most_severe():
+    """Confirm that the most severe exit code of the workers is used."""
+    assert parallel.merge_exit_codes([1, 0, 3]) == 3  # noqa: PLR2004
+
+
+def test_merge_result_reports_in_original_order():
+    """Confirm that the results of the workers are merged in the original order."""
+    result_reports = [
+        {
+            "root": "/exam",
+            "summary": {
+                "passed": 1,
+                "total": 1,
+                "collected": 2,
+                "deselected": 1,
+            },
+            "tests": [ResultRecord("test_b.py::test_one")],
+        },
+        {
+            "root": "/exam",
+            "summary": {
+                "failed": 2,
+                "total": 2,
+                "collected": 3,
+                "deselected": 1,
+            },
+            "tests": [
+                ResultRecord("test_a.py::test_two", "failed"),
+                ResultRecord("test_a.py::test_one", "failed"),
+            ],
+        },
+    ]
+    order = {
+        "test_a.py::test_one": 0,
+        "test_b.py::test_one": 1,
+        "test_a.py::test_two": 2,
+    }
+    merged = parallel.merge_result_reports(result_reports, order)
+    assert merged["root"] == "/exam"
+    assert [test.nodeid for test in merged["tests"]] == [
+        "test_a.py::test_one",
+        "test_b.py::test_one",
+        "test_a.py::test_two",
+    ]
+    assert merged["summary"] == {
+        "failed": 2,
+        "passed": 1,
+        "total": 3,
+        "collected": 4,
+        "deselected": 1,
+    }
+
+
+def test_run_workers_matches_single_process(tmp_path):
+    """Confirm that running the tests with workers merges their results."""
+    for name in ["first", "second", "third"]:
+        (tmp_path / f"test_parallel_{name}.py").write_text(
+            "import pytest\n"
+            "def test_one():\n"
+            f"    assert '{name}' != 'second'\n"
+            "@pytest.mark.order(1)\n"
+            "def test_two():\n"
+            "    assert True\n"
+        )
+    execexam_plugin.reports.clear()
+    result_collector = execexam_plugin.ResultCollector()
+    exit_code, output = parallel.run_workers(
+        2,
+        [
+            "-q",
+            "-ra",
+            "-s",
+            "-p",
+            "no:cacheprovider",
+            "-p",
+            "no:randomly",
+            str(tmp_path),
+        ],
+        tmp_path,
+        [ReportType.testtrace, ReportType.testfailures],
+        result_collector,
+        None,
+    )
+    assert exit_code == pytest.ExitCode.TESTS_FAILED
+    assert "test_parallel_second.py::test_one" in output
+    # the tests with the order mark run first in every file
+    expected_order = [
+        "test_parallel_first.py::test_two",
+        "test_parallel_second.py::test_two",
+        "test_parallel_third.py::test_two",
+        "test_parallel_first.py::test_one",
+        "test_parallel_second.py::test_one",
+        "test_parallel_third.py::test_one",
+    ]
+    assert list(execexam_plugin.reports) == expected_order
+    assert result_collector.report is not None
+    assert [test.nodeid for test in result_collector.report["tests"]] == (
+        expected_order
+    )
+    assert result_collector.report["summary"] == {
+        "passed": 5,
+        "failed": 1,
+        "total": 6,
+        "collected": 6,
+    }
+    execexam_plugin.reports.clear()
+
+
+def test_run_workers_records_the_tests_of_a_crashed_worker(tmp_path):
+    """Confirm that the tests of a worker whose process exits are errors."""
+    (tmp_path / "test_parallel_exit.py").write_text(
+        "import os\n"
+        "def test_exit():\n"
+        "    os._exit(3)\n"
+        "def test_after_exit():\n"
+        "    assert True\n"
+    )
+    (tmp_path / "test_parallel_pass.py").write_text(
+        "def test_pass():\n    assert True\n"
+    )
+    execexam_plugin.reports.clear()
+    result_collector = execexam_plugin.ResultCollector()
+    exit_code, output = parallel.run_workers(
+        2,
+        ["-q", "-p", "no:cacheprovider", "-p", "no:randomly", str(tmp_path)],
+        tmp_path,
+        [ReportType.testtrace, ReportType.timing],
+        result_collector,
+        None,
+    )
+    assert exit_code == pytest.ExitCode.TESTS_FAILED
+    assert "ERROR test_parallel_exit.py::test_exit" in output
+    # the worker that did not crash still reports its passing test
+    assert result_collector.report is not None
+    assert [
+        (test.nodeid, test.outcome)
+        for test in result_collector.report["tests"]
+    ] == [
+        ("test_parallel_exit.py::test_exit", "error"),
+        ("test_parallel_exit.py::test_after_exit", "error"),
+        ("test_parallel_pass.py::test_pass", "passed"),
+    ]
+    assert result_collector.report["summary"]["collected"] == 3  # noqa: PLR2004
+    execexam_plugin.reports.clear()
@@ -0,0 +1,38 @@
+"""Test cases for the phases.py file."""
+
+import pytest
+
+from execexam import phases
+
+
+def test_phase_timer_records_the_phases_in_the_order_they_started():
+    """Confirm that the timer records nested phases in the order they started."""
+    timer = phases.PhaseTimer()
+    with timer.phase("outer"):
+        with timer.phase("inner"):
+            pass
+    with timer.phase("after"):
+        pass
+    run_phases = timer.to_list()
+    # note that the inner phase finished first but started second
+    assert [run_phase["name"] for run_phase in run_phases] == [
+        "outer",
+        "inner",
+        "after",
+    ]
+    outer, inner, after = run_phases
+    assert 0 <= outer["start"] <= inner["start"]
+    assert (
+        inner["start"] + inner["duration"]
+        <= outer["start"] + outer["duration"]
+    )
+    assert after["start"] >= outer["start"] + outer["duration"]
+
+
+def test_phase_timer_records_a_phase_that_fails():
+    """Confirm that the timer records a phase that raises an exception."""
+    timer = phases.PhaseTimer()
+    with pytest.raises(ValueError), timer.phase("fail"):
+        raise ValueError("failed")
+    assert [span.name for span in timer.spans] == ["fail"]
+    assert timer.spans[0].duration >= 0
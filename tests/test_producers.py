@@ -0,0 +1,133 @@
+"""Test cases for the producers.py file."""
+
+from collections import Counter
+
+from execexam import producers
+from execexam.capture import CaptureBuffer
+from execexam.pytest_plugin import ResultRecord
+
+
+def make_producer(
+    tmp_path,
+    outcome="failed",
+    test_source="def test_answer():\n    assert 1 == 2\n",
+    project=None,
+):
+    """Make a producer for a test run with a single test."""
+    test_file = tmp_path / "test_producer_exam.py"
+    test_file.write_text(test_source)
+    captured_output = CaptureBuffer()
+    captured_output.write(
+        "collected 1 item\nFAILED test_producer_exam.py::test_answer\n"
+    )
+    results = {
+        "root": str(tmp_path),
+        "summary": Counter({outcome: 1, "total": 1}),
+        "tests": [
+            ResultRecord(
+                "test_producer_exam.py::test_answer",
+                outcome=outcome,
+                lineno=2,
+                message="assert 1 == 2",
+            )
+        ],
+    }
+    return producers.ReportProducer(
+        captured_output,
+        results,
+        {"test_producer_exam.py::test_answer": {"nodeid": "test_answer"}},
+        {},
+        10,
+        ["FAILED"],
+        project,
+    )
+
+
+def test_report_producer_does_no_work_until_a_report_is_produced(
+    tmp_path, monkeypatch
+):
+    """Confirm that the producer does not extract anything when it is created."""
+    parsed_paths = []
+    monkeypatch.setattr(producers.source, "parse_file", parsed_paths.append)
+    producer = make_producer(tmp_path)
+    # note that a cached property is only in the dictionary of
+    # the producer once the content of its report was produced
+    assert not {
+        "assertion_details",
+        "filtered_output",
+        "failing_tests",
+        "call_graph",
+        "failing_test_sources",
+        "failing_test_codes",
+    } & set(vars(producer))
+    assert parsed_paths == []
+
+
+def test_report_producer_produces_trace_and_failures(tmp_path):
+    """Confirm that the producer produces the trace and the failing details."""
+    producer = make_producer(tmp_path)
+    assert producer.filtered_output == (
+        "\nFAILED test_producer_exam.py::test_answer\n"
+    )
+    assert producer.trace == producer.filtered_output + "\ntest_answer\n"
+    assert producer.has_failing_tests
+    assert "Name: test_producer_exam.py::test_answer" in (
+        producer.failing_details
+    )
+
+
+def test_report_producer_only_extracts_code_of_failing_tests(
+    tmp_path, monkeypatch
+):
+    """Confirm that the code of the tests is only extracted when a test failed."""
+    parsed_paths = []
+    parse_file = producers.source.parse_file
+
+    def record_parse_file(path):
+        parsed_paths.append(path)
+        return parse_file(path)
+
+    monkeypatch.setattr(producers.source, "parse_file", record_parse_file)
+    assert make_producer(tmp_path, "passed").failing_test_codes == []
+    assert parsed_paths == []
+    producer = make_producer(tmp_path)
+    test_file = tmp_path / "test_producer_exam.py"
+    failing_test_code = (
+        f"# File: {test_file} Line: 1\ndef test_answer():\n    assert 1 == 2\n"
+    )
+    assert producer.failing_test_codes == [failing_test_code]
+    assert producer.failing_test_code == failing_test_code
+    assert parsed_paths == [test_file]
+
+
+def test_report_producer_extracts_code_of_called_project_functions(tmp_path):
+    """Confirm that the code of the project functions that a failing test calls is extracted."""
+    project_file = tmp_path / "questions.py"
+    project_file.write_text("def answer():\n    return 1\n")
+    producer = make_producer(
+        tmp_path,
+        test_source=(
+            "from questions import answer\n"
+            "\n"
+            "\n"
+            "def test_answer():\n"
+            "    assert answer() == 2\n"
+        ),
+        project=tmp_path,
+    )
+    test_file = tmp_path / "test_producer_exam.py"
+    failing_test_code = (
+        f"# File: {test_file} Line: 4\n"
+        "def test_answer():\n"
+        "    assert answer() == 2\n"
+    )
+    called_function_code = (
+        f"# File: {project_file} Line: 1\ndef answer():\n    return 1\n"
+    )
+    # the code report displays the called functions after the test
+    # while the advice has the tests and the called functions apart
+    assert producer.failing_test_codes == [
+        failing_test_code + "\n" + called_function_code
+    ]
+    assert producer.failing_test_code == failing_test_code
+    assert producer.called_function_code == called_function_code
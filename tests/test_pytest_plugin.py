@@ -1,7 +1,16 @@
 """Test cases for the pytest_plugin.py file."""
 
+import json
+from types import SimpleNamespace
 from typing import Any, ClassVar, Dict, List
 
+import pytest
+
+from execexam import phases
+from execexam import pytest_plugin as execexam_plugin
+from execexam.enumerations import ReportType
+from execexam.extract import extract_test_assertions_details
+
 # Global list to store test reports
 reports: List[Dict[str, Any]] = []
 
@@ -126,3 +135,527 @@ def test_pytest_runtest_logreport_not_call():
     pytest_runtest_logreport(mock_report)
 
     assert len(reports) == 0
+
+
+def test_execexam_plugin_reports_keyed_by_nodeid_in_run_order():
+    """Confirm that the execexam plugin stores reports by nodeid in run order."""
+    execexam_plugin.reports.clear()
+    nodeids = [
+        "test_one.py::test_b",
+        "test_one.py::test_a",
+        "test_two.py::test_c",
+    ]
+    for nodeid in nodeids:
+        execexam_plugin.record_test_run(SimpleNamespace(nodeid=nodeid))
+    assert list(execexam_plugin.reports) == nodeids
+    assert [
+        report["nodeid"] for report in execexam_plugin.reports.values()
+    ] == nodeids
+    execexam_plugin.reports.clear()
+
+
+def test_execexam_plugin_assertion_pass_finds_report_by_nodeid():
+    """Confirm that passing assertions are added to the matching report."""
+    execexam_plugin.reports.clear()
+    for nodeid in ["test_one.py::test_a", "test_one.py::test_b"]:
+        execexam_plugin.record_test_run(SimpleNamespace(nodeid=nodeid))
+    item = SimpleNamespace(nodeid="test_one.py::test_b")
+    execexam_plugin.record_assertion_pass(item, 3, "x == 1", "assert 1 == 1")
+    execexam_plugin.record_assertion_pass(
+        item, 4, "y == 2", "assert 2 == 2\nmore"
+    )
+    assert "assertions" not in execexam_plugin.reports["test_one.py::test_a"]
+    assert execexam_plugin.reports["test_one.py::test_b"]["assertions"] == [
+        {
+            "Status": "Passed",
+            "Line": "3",
+            "Code": "x == 1",
+            "Exact": "assert 1 == 1",
+        },
+        {
+            "Status": "Passed",
+            "Line": "4",
+            "Code": "y == 2",
+            "Exact": "assert 2 == 2 ...",
+        },
+    ]
+    # the values of the reports plug directly into the extract module
+    output = extract_test_assertions_details(execexam_plugin.reports.values())
+    assert output.startswith("\ntest_one.py::test_a\n\ntest_one.py::test_b\n")
+    execexam_plugin.reports.clear()
+
+
+def test_execexam_plugin_assertion_pass_without_report():
+    """Confirm that a passing assertion for an unknown test is ignored."""
+    execexam_plugin.reports.clear()
+    item = SimpleNamespace(nodeid="test_one.py::test_a")
+    execexam_plugin.record_assertion_pass(item, 3, "x == 1", "assert 1 == 1")
+    assert execexam_plugin.reports == {}
+
+
+def test_execexam_plugin_exception_interact_creates_missing_report():
+    """Confirm that an exception for an unknown test creates a new report."""
+    execexam_plugin.reports.clear()
+    execexam_plugin.record_test_run(
+        SimpleNamespace(nodeid="test_one.py::test_a")
+    )
+
+    def fail():
+        raise ValueError("bad value")
+
+    call = pytest.CallInfo.from_call(fail, when="call")
+    node = SimpleNamespace(nodeid="test_one.py::test_b")
+    execexam_plugin.record_exception(node, call)  # type: ignore
+    assert list(execexam_plugin.reports) == [
+        "test_one.py::test_a",
+        "test_one.py::test_b",
+    ]
+    assertions = execexam_plugin.reports["test_one.py::test_b"]["assertions"]
+    assert assertions == [
+        {"Status": "Failed", "Message": "ValueError: bad value"}
+    ]
+    execexam_plugin.reports.clear()
+
+
+def test_execexam_plugin_aggregates_passing_assertions_per_line(monkeypatch):
+    """Confirm that passing assertions are aggregated per line of a test."""
+    execexam_plugin.reports.clear()
+    monkeypatch.setattr(execexam_plugin, "aggregate_assertions", True)
+    item = SimpleNamespace(nodeid="test_one.py::test_a")
+    execexam_plugin.record_test_run(item)
+    for value in range(1000):
+        execexam_plugin.record_assertion_pass(
+            item, 3, "x == x", f"assert {value} == {value}"
+        )
+    execexam_plugin.record_assertion_pass(item, 4, "y", "assert True")
+    assertions = execexam_plugin.reports["test_one.py::test_a"]["assertions"]
+    assert assertions == [
+        {
+            "Status": "Passed",
+            "Line": "3",
+            "Code": "x == x",
+            "Count": 1000,
+            "First": "assert 0 == 0",
+            "Last": "assert 999 == 999",
+        },
+        {
+            "Status": "Passed",
+            "Line": "4",
+            "Code": "y",
+            "Count": 1,
+            "First": "assert True",
+            "Last": "assert True",
+        },
+    ]
+    # running the same test again starts a new aggregation
+    execexam_plugin.record_test_run(item)
+    execexam_plugin.record_assertion_pass(item, 3, "x == x", "assert 5 == 5")
+    assertions = execexam_plugin.reports["test_one.py::test_a"]["assertions"]
+    assert [assertion["Count"] for assertion in assertions] == [1]
+    execexam_plugin.reports.clear()
+
+
+def test_execexam_plugin_select_plugins_for_status_report():
+    """Confirm that no recording hooks are selected for the status report."""
+    assert (
+        execexam_plugin.select_plugins(
+            [ReportType.exitcode], execexam_plugin.ResultCollector()
+        )
+        == []
+    )
+    assert (
+        execexam_plugin.select_plugins(None, execexam_plugin.ResultCollector())
+        == []
+    )
+
+
+def test_execexam_plugin_select_plugins_for_trace_report():
+    """Confirm that the trace report selects the exception and assertion hooks."""
+    for report_types in [[ReportType.testtrace], [ReportType.all]]:
+        plugins = execexam_plugin.select_plugins(
+            report_types, execexam_plugin.ResultCollector()
+        )
+        assert execexam_plugin.TraceRecorder in map(type, plugins)
+        assert execexam_plugin.AssertionPassRecorder in map(type, plugins)
+
+
+def test_execexam_plugin_select_plugins_for_advice_report():
+    """Confirm that the advice report does not select the assertion pass hook."""
+    result_collector = execexam_plugin.ResultCollector()
+    plugins = execexam_plugin.select_plugins(
+        [ReportType.testadvice], result_collector
+    )
+    assert plugins == [result_collector, plugins[1]]
+    assert isinstance(plugins[1], execexam_plugin.TraceRecorder)
+
+
+def test_execexam_plugin_select_plugins_for_failure_report():
+    """Confirm that the failure and timing reports only select the result collector."""
+    for report_types in [[ReportType.testfailures], [ReportType.timing]]:
+        result_collector = execexam_plugin.ResultCollector()
+        plugins = execexam_plugin.select_plugins(
+            report_types, result_collector
+        )
+        assert plugins == [result_collector]
+
+
+def test_execexam_plugin_select_plugins_for_coverage_report(tmp_path):
+    """Confirm that the coverage report needs the project to select its hook."""
+    result_collector = execexam_plugin.ResultCollector()
+    assert (
+        execexam_plugin.select_plugins([ReportType.coverage], result_collector)
+        == []
+    )
+    plugins = execexam_plugin.select_plugins(
+        [ReportType.coverage], result_collector, tmp_path
+    )
+    assert len(plugins) == 1
+    assert isinstance(plugins[0], execexam_plugin.CoverageRecorder)
+
+
+def test_execexam_plugin_select_plugins_for_affected_tests(tmp_path):
+    """Confirm that selecting the affected tests needs results and coverage."""
+    result_collector = execexam_plugin.ResultCollector()
+    plugins = execexam_plugin.select_plugins(
+        [ReportType.exitcode], result_collector, tmp_path, affected=True
+    )
+    assert plugins == [result_collector, plugins[1]]
+    assert isinstance(plugins[1], execexam_plugin.CoverageRecorder)
+
+
+def test_execexam_plugin_affected_selector(tmp_path):
+    """Confirm that the affected selector deselects the unaffected tests."""
+    test_file = tmp_path / "test_affected_selector_exam.py"
+    test_file.write_text(
+        "def test_unaffected():\n"
+        "    assert True\n"
+        "def test_affected():\n"
+        "    assert True\n"
+    )
+    result_collector = execexam_plugin.ResultCollector()
+    affected_selector = execexam_plugin.AffectedSelector(
+        {"test_affected_selector_exam.py::test_unaffected"}
+    )
+    pytest.main(
+        ["-q", "-p", "no:cacheprovider", "-p", "no:randomly", str(test_file)],
+        plugins=[result_collector, affected_selector],
+    )
+    report = result_collector.report
+    assert report is not None
+    assert [test.nodeid for test in report["tests"]] == [
+        "test_affected_selector_exam.py::test_affected"
+    ]
+    assert report["summary"]["deselected"] == 1
+
+
+def test_execexam_plugin_phase_recorder(tmp_path):
+    """Confirm that the phase recorder times the collection and the run of the tests."""
+    test_file = tmp_path / "test_phase_recorder_exam.py"
+    test_file.write_text("def test_pass():\n    assert True\n")
+    timer = phases.PhaseTimer()
+    pytest.main(
+        ["-q", "-p", "no:cacheprovider", "-p", "no:randomly", str(test_file)],
+        plugins=[execexam_plugin.PhaseRecorder(timer)],
+    )
+    run_phases = timer.to_list()
+    assert [run_phase["name"] for run_phase in run_phases] == [
+        "collect tests",
+        "run tests",
+    ]
+    # the tests run after they were collected
+    assert run_phases[1]["start"] >= (
+        run_phases[0]["start"] + run_phases[0]["duration"]
+    )
+
+
+def test_coverage_recorder_uses_the_project_configuration(tmp_path):
+    """Confirm that the coverage recorder uses the project's configuration of coverage.py."""
+    assert execexam_plugin.find_coverage_configuration(tmp_path) is False
+    # a configuration file without settings for coverage.py is skipped
+    (tmp_path / "setup.cfg").write_text("[metadata]\nname = exam\n")
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.coverage.run]\nbranch = true\n"
+    )
+    assert execexam_plugin.find_coverage_configuration(tmp_path) == str(
+        tmp_path / "pyproject.toml"
+    )
+    recorder = execexam_plugin.CoverageRecorder(tmp_path)
+    assert recorder.coverage.get_option("run:branch") is True
+    # the recorder still measures only the project's own code
+    assert recorder.coverage.get_option("run:source") == [
+        str(tmp_path.resolve())
+    ]
+
+
+def test_execexam_plugin_coverage_recorder(tmp_path, monkeypatch):
+    """Confirm that the coverage recorder records the lines of each test."""
+    monkeypatch.setattr(execexam_plugin, "coverage_maps", {})
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "coverage_question.py").write_text(
+        "def grade(score):\n"
+        "    if score > 50:\n"
+        "        return 'pass'\n"
+        "    return 'fail'\n"
+    )
+    test_file = tmp_path / "test_coverage_recorder_exam.py"
+    test_file.write_text(
+        "from coverage_question import grade\n"
+        "def test_pass():\n"
+        "    assert grade(90) == 'pass'\n"
+        "def test_fail():\n"
+        "    assert grade(10) == 'fail'\n"
+    )
+    pytest.main(
+        ["-q", "-p", "no:cacheprovider", "-p", "no:randomly", str(test_file)],
+        plugins=[execexam_plugin.CoverageRecorder(tmp_path)],
+    )
+    # note that the lines that ran when the modules were
+    # imported are not attributed to any of the tests
+    assert execexam_plugin.coverage_maps == {
+        "test_coverage_recorder_exam.py::test_pass": {
+            "coverage_question.py": 0b1100,
+            "test_coverage_recorder_exam.py": 0b1000,
+        },
+        "test_coverage_recorder_exam.py::test_fail": {
+            "coverage_question.py": 0b10100,
+            "test_coverage_recorder_exam.py": 0b100000,
+        },
+    }
+
+
+def test_execexam_plugin_resource_limiter(tmp_path, monkeypatch):
+    """Confirm that tests that exceed their limits fail and the next tests run."""
+    monkeypatch.setattr(execexam_plugin, "reports", {})
+    test_file = tmp_path / "test_resource_limiter_exam.py"
+    test_file.write_text(
+        "import time\n"
+        "import pytest\n"
+        "def test_loop():\n"
+        "    while True: pass\n"
+        "@pytest.mark.timeout(0.1)\n"
+        "def test_sleep():\n"
+        "    time.sleep(5)\n"
+        "def test_memory():\n"
+        "    data = bytearray(1024 * 1024 * 1024)\n"
+        "    assert data\n"
+        "def test_pass():\n"
+        "    assert True\n"
+    )
+    result_collector = execexam_plugin.ResultCollector()
+    pytest.main(
+        [
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            "-p",
+            "no:randomly",
+            "--execexam-timeout=0.5",
+            "--execexam-memory-limit=100",
+            str(test_file),
+        ],
+        plugins=[
+            execexam_plugin,
+            result_collector,
+            execexam_plugin.TraceRecorder(),
+        ],
+    )
+    report = result_collector.report
+    assert report is not None
+    assert [test.outcome for test in report["tests"]] == [
+        "failed",
+        "failed",
+        "failed",
+        "passed",
+    ]
+    assert [test.lineno for test in report["tests"][:3]] == [4, 7, 9]
+    # the reports show which limit each test exceeded and where
+    assert [
+        (
+            test_report["assertions"][0]["Status"],
+            test_report["assertions"][0]["Line"],
+        )
+        for test_report in execexam_plugin.reports.values()
+        if "assertions" in test_report
+    ] == [("Timeout", "4"), ("Timeout", "7"), ("MemoryLimit", "9")]
+
+
+def test_execexam_plugin_resource_limiter_broad_except(tmp_path, monkeypatch):
+    """Confirm that a test that catches every Exception still stops at its timeout."""
+    monkeypatch.setattr(execexam_plugin, "reports", {})
+    test_file = tmp_path / "test_resource_limiter_except_exam.py"
+    test_file.write_text(
+        "import time\n"
+        "def test_retry():\n"
+        "    while True:\n"
+        "        try:\n"
+        "            time.sleep(0.1)\n"
+        "        except Exception:\n"
+        "            pass\n"
+        "def test_pass():\n"
+        "    assert True\n"
+    )
+    result_collector = execexam_plugin.ResultCollector()
+    pytest.main(
+        [
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            "-p",
+            "no:randomly",
+            "--execexam-timeout=0.3",
+            str(test_file),
+        ],
+        plugins=[
+            execexam_plugin,
+            result_collector,
+            execexam_plugin.TraceRecorder(),
+        ],
+    )
+    report = result_collector.report
+    assert report is not None
+    assert [test.outcome for test in report["tests"]] == ["failed", "passed"]
+    # the report still records that the test exceeded its timeout
+    assert [
+        test_report["assertions"][0]["Status"]
+        for test_report in execexam_plugin.reports.values()
+        if "assertions" in test_report
+    ] == ["Timeout"]
+
+
+def test_execexam_plugin_memory_limit_with_another_thread(tmp_path):
+    """Confirm that the memory limit does not apply while another thread runs."""
+    test_file = tmp_path / "test_resource_limiter_thread_exam.py"
+    test_file.write_text(
+        "import threading\n"
+        "event = threading.Event()\n"
+        "thread = threading.Thread(target=event.wait)\n"
+        "thread.start()\n"
+        "def test_memory():\n"
+        "    try:\n"
+        "        data = bytearray(200 * 1024 * 1024)\n"
+        "    finally:\n"
+        "        event.set()\n"
+        "        thread.join()\n"
+        "    assert data\n"
+    )
+    exit_code = pytest.main(
+        [
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            "-p",
+            "no:randomly",
+            "--execexam-memory-limit=100",
+            str(test_file),
+        ],
+        plugins=[execexam_plugin],
+    )
+    assert exit_code == pytest.ExitCode.OK
+
+
+def test_execexam_plugin_result_collector(tmp_path):
+    """Confirm that the result collector records the outcomes of the tests."""
+    test_file = tmp_path / "test_result_collector_exam.py"
+    test_file.write_text(
+        "import pytest\n"
+        "def test_pass():\n"
+        "    assert True\n"
+        "def test_fail():\n"
+        "    assert 1 == 2, 'not equal'\n"
+        "@pytest.mark.skip\n"
+        "def test_skip():\n"
+        "    pass\n"
+    )
+    result_collector = execexam_plugin.ResultCollector()
+    pytest.main(
+        ["-q", "-p", "no:cacheprovider", "-p", "no:randomly", str(test_file)],
+        plugins=[result_collector],
+    )
+    report = result_collector.report
+    assert report is not None
+    assert report["root"] == str(tmp_path)
+    assert report["summary"] == {
+        "passed": 1,
+        "failed": 1,
+        "skipped": 1,
+        "total": 3,
+        "collected": 3,
+    }
+    failing_test = report["tests"][1]
+    assert failing_test.nodeid == "test_result_collector_exam.py::test_fail"
+    assert failing_test.outcome == "failed"
+    assert failing_test.lineno == 5  # noqa: PLR2004
+    assert failing_test.message == "AssertionError: not equal\nassert 1 == 2"
+    # the frames of the crash start at the test and not inside of pytest
+    assert failing_test.frames == [(str(test_file), 5)]
+    assert report["tests"][0].frames == []
+    # the duration of each phase of the test was recorded
+    assert failing_test.call > 0
+    assert failing_test.duration == (
+        failing_test.setup + failing_test.call + failing_test.teardown
+    )
+
+
+def test_execexam_plugin_event_sink(tmp_path):
+    """Confirm that the event sink streams the events of a test run."""
+    test_file = tmp_path / "test_event_sink_exam.py"
+    test_file.write_text(
+        "def test_pass():\n"
+        "    assert True\n"
+        "def test_fail():\n"
+        "    assert 1 == 2\n"
+    )
+    events_file = tmp_path / "events.ndjson"
+    pytest.main(
+        ["-q", "-p", "no:cacheprovider", "-p", "no:randomly", str(test_file)],
+        plugins=[execexam_plugin.EventSink(events_file, batch_size=2)],
+    )
+    events = [
+        json.loads(line) for line in events_file.read_text().splitlines()
+    ]
+    assert [event["event"] for event in events] == [
+        "session-start",
+        "test-start",
+        "test-finish",
+        "test-start",
+        "failure",
+        "test-finish",
+        "session-finish",
+    ]
+    assert events[2]["outcome"] == "passed"
+    assert events[4]["nodeid"] == "test_event_sink_exam.py::test_fail"
+    assert events[4]["line"] == 4  # noqa: PLR2004
+    assert events[5]["outcome"] == "failed"
+    assert events[6]["exitstatus"] == 1
+
+
+def test_execexam_plugin_event_sink_flushes_in_batches(tmp_path):
+    """Confirm that the event sink only writes complete batches of events."""
+    events_file = tmp_path / "events.ndjson"
+    event_sink = execexam_plugin.EventSink(events_file, batch_size=3)
+    event_sink.file = events_file.open("w")
+    event_sink.emit("test-start", nodeid="a")
+    event_sink.emit("test-finish", nodeid="a")
+    assert events_file.read_text() == ""
+    event_sink.emit("test-start", nodeid="b")
+    assert len(events_file.read_text().splitlines()) == 3  # noqa: PLR2004
+    assert event_sink.buffer == []
+    event_sink.file.close()
+
+
+def test_execexam_plugin_assign_dependency_groups():
+    """Confirm that the tests in the same file are assigned to the same worker."""
+    nodeids = [
+        "test_a.py::test_one",
+        "test_b.py::test_one",
+        "test_a.py::test_two",
+        "test_c.py::test_one",
+        "test_a.py::test_three",
+    ]
+    assignment = execexam_plugin.assign_dependency_groups(nodeids, 2)
+    assert assignment == {"test_a.py": 0, "test_b.py": 1, "test_c.py": 1}
+    # the assignment does not depend on the order of the tests
+    assert (
+        execexam_plugin.assign_dependency_groups(nodeids[::-1], 2)
+        == assignment
+    )
@@ -0,0 +1,104 @@
+"""Test cases for the results.py file."""
+
+import io
+import json
+from collections import Counter
+from pathlib import Path
+
+from execexam import results
+from execexam.enumerations import ReportType
+from execexam.pytest_plugin import ResultRecord
+
+
+def make_test_results():
+    """Make the results of a test run with a passing and a failing test."""
+    return {
+        "root": "/project",
+        "summary": Counter({"passed": 1, "failed": 1, "total": 2}),
+        "tests": [
+            ResultRecord("test_a.py::test_pass", call=0.5),
+            ResultRecord(
+                "test_a.py::test_fail",
+                outcome="failed",
+                lineno=4,
+                message="AssertionError",
+                setup=0.25,
+                call=1.0,
+            ),
+        ],
+    }
+
+
+def make_document(report_types):
+    """Make the results document for the report types."""
+    return results.make_results_document(
+        Path("project"),
+        Path("project/tests"),
+        report_types,
+        1,
+        1,
+        2.5,
+        make_test_results(),
+        {"test_a.py::test_fail": {"nodeid": "test_a.py::test_fail"}},
+        {"test_a.py::test_pass": {"question.py": 0b1110}},
+        "FAILED test_a.py::test_fail\n",
+        [{"name": "run pytest", "start": 0.5, "duration": 2.0}],
+        {"FAILED": 1, "ERROR": 0},
+    )
+
+
+def test_results_document_only_contains_requested_reports():
+    """Confirm that the document has the summary but no unrequested reports."""
+    document = make_document([ReportType.exitcode])
+    assert document == {
+        "schema_version": results.SCHEMA_VERSION,
+        "project": "project",
+        "tests": "project/tests",
+        "return_code": 1,
+        "pytest_exit_code": 1,
+        "duration": 2.5,
+        "summary": {"passed": 1, "failed": 1, "total": 2},
+    }
+    assert set(document) == set(results.RESULTS_SCHEMA["required"])
+
+
+def test_results_document_with_all_reports():
+    """Confirm that the document has the results of every report for all reports."""
+    document = make_document([ReportType.all])
+    assert set(document) == set(results.RESULTS_SCHEMA["properties"])
+    assert document["failures"] == [
+        {
+            "nodeid": "test_a.py::test_fail",
+            "outcome": "failed",
+            "lineno": 4,
+            "message": "AssertionError",
+        }
+    ]
+    assert document["timing"]["phases"] == {
+        "setup": 0.25,
+        "call": 1.5,
+        "teardown": 0.0,
+        "duration": 1.75,
+    }
+    assert document["timing"]["run_phases"] == [
+        {"name": "run pytest", "start": 0.5, "duration": 2.0}
+    ]
+    assert document["coverage"] == {
+        "test_a.py::test_pass": {"question.py": "1-3"}
+    }
+    assert document["trace"] == {
+        "output": ["FAILED test_a.py::test_fail"],
+        "label_counts": {"FAILED": 1, "ERROR": 0},
+        "reports": [{"nodeid": "test_a.py::test_fail"}],
+    }
+
+
+def test_write_results_document(tmp_path):
+    """Confirm that the document is written to the file or else to the stream."""
+    document = make_document([ReportType.testfailures])
+    stream = io.StringIO()
+    results.write_results_document(document, None, stream)
+    assert json.loads(stream.getvalue()) == document
+    output_file = tmp_path / "results.json"
+    results.write_results_document(document, output_file, stream)
+    assert json.loads(output_file.read_text()) == document
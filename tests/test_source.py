@@ -0,0 +1,157 @@
+"""Test cases for the source.py file."""
+
+import os
+
+import pytest
+
+from execexam import source
+
+TEST_FILE_SOURCE = (
+    "import pytest\n"
+    "\n"
+    "\n"
+    "@pytest.mark.parametrize('value', [1, 2])\n"
+    "@pytest.mark.slow\n"
+    "def test_value(value):\n"
+    '    """Check the value."""\n'
+    "    assert value > 0\n"
+    "\n"
+    "\n"
+    "class TestAnswer:\n"
+    "    async def test_method(self):\n"
+    "        assert True\n"
+    "\n"
+    "    class TestNested:\n"
+    "        def test_nested(self):\n"
+    "            pass\n"
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_parsed_files():
+    """Fixture to remove the parsed files and the line indexes before each test."""
+    source.parsed_files.clear()
+    source.line_indexes.clear()
+
+
+def test_extract_function_source_with_decorators(tmp_path):
+    """Confirm that the source of a function starts at its first decorator."""
+    test_file = tmp_path / "test_exam.py"
+    test_file.write_text(TEST_FILE_SOURCE)
+    assert source.extract_function_source(test_file, "test_value[1]") == (
+        f"# File: {test_file} Line: 4\n"
+        "@pytest.mark.parametrize('value', [1, 2])\n"
+        "@pytest.mark.slow\n"
+        "def test_value(value):\n"
+        '    """Check the value."""\n'
+        "    assert value > 0\n"
+    )
+
+
+def test_extract_function_source_of_methods(tmp_path):
+    """Confirm that the source of a method names its class."""
+    test_file = tmp_path / "test_exam.py"
+    test_file.write_text(TEST_FILE_SOURCE)
+    assert source.extract_function_source(test_file, "test_method") == (
+        f"# File: {test_file} Class: TestAnswer Line: 12\n"
+        "    async def test_method(self):\n"
+        "        assert True\n"
+    )
+    assert source.extract_function_source(
+        str(test_file), "TestAnswer.TestNested.test_nested"
+    ) == (
+        f"# File: {test_file} Class: TestAnswer.TestNested Line: 16\n"
+        "        def test_nested(self):\n"
+        "            pass\n"
+    )
+
+
+def test_extract_function_source_without_function(tmp_path):
+    """Confirm that there is no source for a missing function or file."""
+    test_file = tmp_path / "test_exam.py"
+    test_file.write_text("def test_broken(:\n")
+    assert source.extract_function_source(test_file, "test_broken") == ""
+    test_file.write_text(TEST_FILE_SOURCE)
+    assert source.extract_function_source(test_file, "test_missing") == ""
+    assert source.extract_function_source(tmp_path / "missing.py", "f") == ""
+
+
+def test_parse_file_only_parses_again_after_a_change(tmp_path):
+    """Confirm that a file is parsed again only when it was modified."""
+    test_file = tmp_path / "test_exam.py"
+    test_file.write_text("def test_first():\n    pass\n")
+    parsed_file = source.parse_file(test_file)
+    assert source.parse_file(test_file) is parsed_file
+    test_file.write_text("def test_second():\n    pass\n")
+    # set the time of the change since it can be the same as the
+    # time of the first version of the file on a coarse clock
+    modified = parsed_file.modified + 1_000_000_000
+    os.utime(test_file, ns=(modified, modified))
+    assert list(source.parse_file(test_file).functions) == ["test_second"]
+    assert source.extract_function_source(test_file, "test_second") == (
+        f"# File: {test_file} Line: 1\ndef test_second():\n    pass\n"
+    )
+
+
+def test_line_index_gets_lines(tmp_path):
+    """Confirm that the line index gets the lines between two line numbers."""
+    text_file = tmp_path / "lines.py"
+    text_file.write_text("one\ntwo\nthree\n")
+    line_index = source.index_lines(text_file)
+    assert line_index.offsets == [0, 4, 8, 14]
+    assert line_index.line_count == 3  # noqa: PLR2004
+    assert line_index.get_lines(2, 3) == ["two", "three"]
+    assert line_index.get_lines(0, 10) == ["one", "two", "three"]
+    assert line_index.get_lines(4, 5) == []
+    # the last line does not need to end with a newline
+    text_file.write_text("one\ntwo")
+    modified = line_index.modified + 1_000_000_000
+    os.utime(text_file, ns=(modified, modified))
+    assert source.index_lines(text_file).get_lines(2, 2) == ["two"]
+
+
+def test_index_lines_only_reads_the_file_once(tmp_path, monkeypatch):
+    """Confirm that the lines of a file are only indexed once while it does not change."""
+    text_file = tmp_path / "lines.py"
+    text_file.write_text("one\ntwo\n")
+    line_index = source.index_lines(text_file)
+    monkeypatch.setattr(
+        type(text_file),
+        "read_bytes",
+        lambda _: pytest.fail("the file was read again"),
+    )
+    assert source.index_lines(text_file) is line_index
+
+
+def test_get_context_lines(tmp_path):
+    """Confirm that the context of a line is numbered and stops at the start and the end."""
+    text_file = tmp_path / "lines.py"
+    text_file.write_text(
+        "".join(f"line {number}\n" for number in range(1, 11))
+    )
+    assert source.get_context_lines(text_file, 2, 2) == [
+        (1, "line 1"),
+        (2, "line 2"),
+        (3, "line 3"),
+        (4, "line 4"),
+    ]
+    assert source.get_context_lines(text_file, 10, 1) == [
+        (9, "line 9"),
+        (10, "line 10"),
+    ]
+    assert source.get_context_lines(tmp_path / "missing.py", 1, 1) == []
+
+
+def test_get_context_lines_with_other_line_separators(tmp_path):
+    """Confirm that only newlines separate the lines of the context."""
+    text_file = tmp_path / "lines.py"
+    text_file.write_bytes(
+        "one\r\n\x0c\ntwo \u2028 three\nfour\x85\nfive\n".encode()
+    )
+    assert source.get_context_lines(text_file, 3, 2) == [
+        (1, "one"),
+        (2, "\x0c"),
+        (3, "two \u2028 three"),
+        (4, "four\x85"),
+        (5, "five"),
+    ]
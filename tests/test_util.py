@@ -1,8 +1,15 @@
 """Test cases for the util.py file."""
 
+from pathlib import Path
+
 import pytest
 
-from execexam.util import determine_execexam_return_code
+from execexam.enumerations import ReportType
+from execexam.util import (
+    determine_execexam_return_code,
+    is_report_requested,
+    make_pytest_arguments,
+)
 
 
 def test_determine_execexam_return_code_tests_failed():
@@ -35,3 +42,41 @@ def test_determine_execexam_return_code_no_tests_collected():
 def test_determine_execexam_return_code_other():
     """Confirm a correct exit code."""
     assert determine_execexam_return_code(0) == 0
+
+
+def test_is_report_requested_directly():
+    """Confirm that a directly requested report type is detected."""
+    report_types = [ReportType.exitcode, ReportType.testtrace]
+    assert is_report_requested(report_types, ReportType.testtrace)
+    assert is_report_requested(
+        report_types, ReportType.testcodes, ReportType.exitcode
+    )
+    assert not is_report_requested(report_types, ReportType.testcodes)
+
+
+def test_is_report_requested_through_all():
+    """Confirm that every report type is requested through all."""
+    assert is_report_requested([ReportType.all], ReportType.testadvice)
+
+
+def test_is_report_requested_without_reports():
+    """Confirm that no report type is requested without any reports."""
+    assert not is_report_requested(None, ReportType.testtrace)
+    assert not is_report_requested([], ReportType.testtrace)
+
+
+def test_make_pytest_arguments():
+    """Confirm that the arguments for pytest include the marks and the tests."""
+    arguments = make_pytest_arguments(Path("tests"), 3)
+    assert "--maxfail=3" in arguments
+    assert "-m" not in arguments
+    assert arguments[-1] == "tests"
+    arguments = make_pytest_arguments(Path("tests"), 3, "first")
+    assert arguments[-3:] == ["-m", "first", "tests"]
+    arguments = make_pytest_arguments(Path("tests"), 3, None, 2.5, 4, 256)
+    assert arguments[-4:] == [
+        "--execexam-timeout=2.5",
+        "--execexam-cpu-limit=4",
+        "--execexam-memory-limit=256",
+        "tests",
+    ]